@@ -7,7 +7,8 @@ from typing import Dict, Any, List
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from agents.base_agent import BaseAgent
 from modules.financial_analyzer import FinancialAnalyzer
-from tools.data_transformer import NumpyEncoder, convert_numpy_types
+from tools.prompt_payload import PromptPayload
+from config import PROMPT_TOKEN_BUDGET
 
 class AnalysisAgent(BaseAgent):
     """Agent responsible for analyzing financial data and generating insights."""
@@ -42,15 +43,16 @@ class AnalysisAgent(BaseAgent):
         sector = company_info.get("sector", "")
         industry = company_info.get("industry", "")
         
-        # Ensure analysis_results doesn't have any NumPy types before serializing
-        safe_analysis_results = convert_numpy_types(analysis_results)
+        # The analyzer returns native types, so the payload skips a second conversion pass
+        payload = PromptPayload(analysis_results, converted=True)
+        safe_analysis_results = payload.data
         
-        # Enhance analysis with LLM insights using our custom JSON encoder
+        # Enhance analysis with LLM insights; the payload is compacted to the prompt token budget
         prompt = f"""
         I need you to analyze the financial data for {company_name}, a company in the {sector} sector and {industry} industry.
         
         Here are the key analysis results:
-        {json.dumps(safe_analysis_results, cls=NumpyEncoder, indent=2)}
+        {payload.for_prompt()}
         
         Based on these analysis results and your knowledge of financial analysis:
         
@@ -86,24 +88,29 @@ class AnalysisAgent(BaseAgent):
         Integrate market research with financial analysis.
         
         Args:
-            analysis_results (dict): Financial analysis results.
-            research_results (dict): Market research results.
+            analysis_results (dict or PromptPayload): Financial analysis results.
+            research_results (dict or PromptPayload): Market research results.
             
         Returns:
             dict: Integrated analysis.
         """
-        # Convert any NumPy types to native Python types before serialization
-        safe_analysis = convert_numpy_types(analysis_results)
-        safe_research = convert_numpy_types(research_results)
+        # Convert any NumPy types to native Python types once; payloads passed in are reused as is
+        analysis = PromptPayload.of(analysis_results)
+        research = PromptPayload.of(research_results)
+        safe_analysis = analysis.data
+        safe_research = research.data
+        
+        # Both payloads share one prompt, so each gets half the token budget
+        budget = PROMPT_TOKEN_BUDGET // 2
         
         prompt = f"""
         I have both financial analysis data and market research for a company. Help me integrate these insights.
         
         Financial Analysis:
-        {json.dumps(safe_analysis, cls=NumpyEncoder, indent=2)}
+        {analysis.for_prompt(max_tokens=budget)}
         
         Market Research:
-        {json.dumps(safe_research, cls=NumpyEncoder, indent=2)}
+        {research.for_prompt(max_tokens=budget)}
         
         Please create a comprehensive integrated analysis that:
         
@@ -155,8 +162,8 @@ class AnalysisAgent(BaseAgent):
         # Analyze financial data
         analysis_results = self.analyze_financial_data(financial_data, research_plan)
         
-        # Integrate with market research if available
+        # Integrate with market research if available; the analysis is already converted
         if research_results:
-            return self.integrate_market_research(analysis_results, research_results)
+            return self.integrate_market_research(PromptPayload(analysis_results, converted=True), research_results)
         
         return {"financial_analysis": analysis_results}
@@ -1,20 +1,43 @@
 import sys
 import os
 import json
-from typing import List, Dict, Any, Optional, Type, TypeVar, Generic
-from openai import OpenAI
+from typing import List, Dict, Any, Iterator, Optional, Type, TypeVar, Generic
+from urllib.parse import urlparse
+import openai
 import logging
 from pydantic import BaseModel
-import instructor
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_MAX_TOKENS, AGENT_MEMORY_LIMIT
+from config import (
+    OPENAI_BASE_URL, OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_MAX_TOKENS, AGENT_MEMORY_LIMIT,
+    LLM_CACHE_AGENTS, LLM_CACHE_TTL
+)
+from utils.concurrency import llm_semaphore
+from utils.llm_cache import get_llm_cache, llm_cache_key
+from utils.cassette import CassetteMissError, is_recording
+from utils.llm_clients import get_async_llm_clients, get_llm_clients
+from utils.resilience import (
+    RETRY_STATUSES, async_call_with_retry, call_with_retry, get_circuit_breaker, parse_retry_after
+)
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=BaseModel)
 
+def _classify_llm_error(result: Any, error: Optional[BaseException]):
+    """Retry connection errors, timeouts, rate limits and transient 5xx responses from the LLM API."""
+    if error is None:
+        return False, None, False
+    if isinstance(error, openai.APIConnectionError):
+        # A replay miss will not start matching on a retry
+        if isinstance(error.__cause__, CassetteMissError):
+            return False, None, False
+        return True, None, True
+    if isinstance(error, openai.APIStatusError) and error.status_code in RETRY_STATUSES:
+        return True, parse_retry_after(error.response.headers), error.status_code != 429
+    return False, None, False
+
 class BaseAgent:
     """Base class for all agents in the system."""
     
@@ -28,11 +51,14 @@ class BaseAgent:
             base_url (str, optional): OpenAI API base URL
             model_name (str, optional): OpenAI model name to use
         """
-        # Create standard client for regular completions
-        self.standard_client = OpenAI(api_key=OPENAI_API_KEY, base_url=base_url) if base_url else OpenAI(api_key=OPENAI_API_KEY)
+        # Agents on the same endpoint share one pooled client pair (see utils/llm_clients.py)
+        self.llm_base_url = base_url
+        clients = get_llm_clients(base_url)
+        self.standard_client = clients.standard
+        self.instructor_client = clients.instructor
         
-        # Create instructor-patched client for structured outputs
-        self.instructor_client = instructor.from_openai(OpenAI(api_key=OPENAI_API_KEY, base_url=base_url) if base_url else OpenAI(api_key=OPENAI_API_KEY))
+        # One circuit breaker per LLM endpoint, shared by every agent using it
+        self.llm_breaker = get_circuit_breaker(f"llm:{urlparse(base_url or OPENAI_BASE_URL).netloc}")
         
         self.role = role
         self.name = name
@@ -45,6 +71,72 @@ class BaseAgent:
             {"role": "system", "content": f"You are {name}, {role}. Always respond with JSON when appropriate."}
         ]
         
+        # Agents listed in LLM_CACHE_AGENTS reuse responses to identical requests
+        self.llm_cache = None
+        if "*" in LLM_CACHE_AGENTS or type(self).__name__ in LLM_CACHE_AGENTS:
+            self.enable_llm_cache()
+        
+    def enable_llm_cache(self, cache=None):
+        """
+        Opt this agent into the LLM response cache.
+        
+        Args:
+            cache (optional): Cache object with get/set, defaults to the shared memory + SQLite cache
+        """
+        self.llm_cache = cache if cache is not None else get_llm_cache()
+    
+    def disable_llm_cache(self):
+        """Stop reading and writing cached LLM responses for this agent."""
+        self.llm_cache = None
+        
+    def _complete(self, client, **request):
+        """Create a chat completion under the retry policy and the endpoint's circuit breaker."""
+        messages = request.pop("messages")
+        # instructor appends re-ask messages to the list it is given, so every attempt gets a fresh copy
+        return call_with_retry(
+            lambda: client.chat.completions.create(messages=list(messages), **request),
+            _classify_llm_error,
+            breaker=self.llm_breaker
+        )
+        
+    def _text_messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": f"You are {self.role}."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _structured_messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": f"You are {self.role}. Respond with structured data."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _cache_lookup(self, messages: List[Dict[str, str]], response_model: Optional[Type[BaseModel]] = None):
+        """
+        Look up a cached response for a request, if this agent uses the LLM cache.
+        
+        Args:
+            messages: The request messages
+            response_model: Pydantic model of a structured request
+            
+        Returns:
+            tuple: ``(cache_key, cached)``; the key is None when caching is off (or a
+            cassette is recording) and ``cached`` is None on a miss
+        """
+        # A cassette being recorded must see every call, not just the uncached ones
+        if self.llm_cache is None or is_recording():
+            return None, None
+        cache_key = llm_cache_key(self.model_name, messages, self.temperature, self.max_tokens, response_model)
+        cached = self.llm_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"{self.name}: {'structured ' if response_model is not None else ''}LLM cache hit")
+        return cache_key, cached
+    
+    def _cache_store(self, cache_key: Optional[str], value: Any) -> None:
+        """Cache a response under a key from ``_cache_lookup``; no-op without a key or value."""
+        if cache_key is not None and value is not None:
+            self.llm_cache.set(cache_key, value, LLM_CACHE_TTL)
+    
     def _call_llm(self, prompt: str):
         """
         Call LLM with prompt and return the raw text response.
@@ -55,20 +147,67 @@ class BaseAgent:
         Returns:
             str: The LLM response
         """
-        messages = [
-            {"role": "system", "content": f"You are {self.role}."},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self._text_messages(prompt)
+        
+        cache_key, cached = self._cache_lookup(messages)
+        if cached is not None:
+            return cached
         
         # Use the standard client (not patched with instructor) for regular text responses
-        response = self.standard_client.chat.completions.create(
+        response = self._complete(
+            self.standard_client,
             model=self.model_name,
             messages=messages,
             temperature=self.temperature,
             max_tokens=self.max_tokens
         )
         
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
+        self._cache_store(cache_key, content)
+        
+        return content
+    
+    def _stream_llm(self, prompt: str) -> Iterator[str]:
+        """
+        Call LLM with prompt and yield the text response as it is generated.
+        
+        Opening the stream is retried like ``_call_llm``; once text has been
+        yielded an error is raised to the caller, since a partial response
+        cannot be replayed. Cached responses are yielded as a single chunk.
+        
+        Args:
+            prompt: The prompt to send to the LLM
+        
+        Yields:
+            str: Successive pieces of the response text
+        """
+        messages = self._text_messages(prompt)
+        
+        cache_key, cached = self._cache_lookup(messages)
+        if cached is not None:
+            yield cached
+            return
+        
+        stream = self._complete(
+            self.standard_client,
+            model=self.model_name,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        
+        parts = []
+        with stream:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        
+        self._cache_store(cache_key, "".join(parts))
     
     def _call_structured_llm(self, prompt: str, response_model: Type[T]) -> T:
         """
@@ -81,20 +220,25 @@ class BaseAgent:
         Returns:
             T: Structured response data as a Pydantic model instance
         """
-        messages = [
-            {"role": "system", "content": f"You are {self.role}. Respond with structured data."},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self._structured_messages(prompt)
+        
+        cache_key, cached = self._cache_lookup(messages, response_model)
+        if cached is not None:
+            # Cached entries hold the validated model as JSON
+            return response_model.model_validate(cached)
         
         try:
             # Use the instructor-patched client for structured responses
-            response = self.instructor_client.chat.completions.create(
+            response = self._complete(
+                self.instructor_client,
                 model=self.model_name,
                 messages=messages,
                 response_model=response_model,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens
             )
+            if isinstance(response, BaseModel):
+                self._cache_store(cache_key, response.model_dump(mode="json"))
             return response
         except Exception as e:
             logger.error(f"Error in structured LLM call: {str(e)}")
@@ -104,6 +248,93 @@ class BaseAgent:
             except:
                 raise e
     
+    def _async_clients(self):
+        """Return the shared async standard and instructor clients for the running event loop."""
+        return get_async_llm_clients(self.llm_base_url)
+    
+    async def _acomplete(self, client, **request):
+        """
+        Await a chat completion under the retry policy, the endpoint's circuit
+        breaker and the shared in-flight limit (LLM_MAX_CONCURRENCY).
+        
+        The semaphore is held per attempt, so backoff waits do not occupy a slot.
+        """
+        messages = request.pop("messages")
+        semaphore = llm_semaphore()
+        
+        async def attempt():
+            async with semaphore:
+                return await client.chat.completions.create(messages=list(messages), **request)
+        
+        return await async_call_with_retry(attempt, _classify_llm_error, breaker=self.llm_breaker)
+    
+    async def _acall_llm(self, prompt: str):
+        """
+        Async counterpart of ``_call_llm``.
+        
+        Args:
+            prompt: The prompt to send to the LLM
+            
+        Returns:
+            str: The LLM response
+        """
+        messages = self._text_messages(prompt)
+        
+        cache_key, cached = self._cache_lookup(messages)
+        if cached is not None:
+            return cached
+        
+        client, _ = self._async_clients()
+        response = await self._acomplete(
+            client,
+            model=self.model_name,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
+        )
+        
+        content = response.choices[0].message.content
+        self._cache_store(cache_key, content)
+        
+        return content
+    
+    async def _acall_structured_llm(self, prompt: str, response_model: Type[T]) -> T:
+        """
+        Async counterpart of ``_call_structured_llm``.
+        
+        Args:
+            prompt: The prompt to send to the LLM
+            response_model: Pydantic model for the expected response structure
+            
+        Returns:
+            T: Structured response data as a Pydantic model instance
+        """
+        messages = self._structured_messages(prompt)
+        
+        cache_key, cached = self._cache_lookup(messages, response_model)
+        if cached is not None:
+            return response_model.model_validate(cached)
+        
+        try:
+            _, client = self._async_clients()
+            response = await self._acomplete(
+                client,
+                model=self.model_name,
+                messages=messages,
+                response_model=response_model,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens
+            )
+            if isinstance(response, BaseModel):
+                self._cache_store(cache_key, response.model_dump(mode="json"))
+            return response
+        except Exception as e:
+            logger.error(f"Error in structured LLM call: {str(e)}")
+            try:
+                return response_model()
+            except:
+                raise e
+    
     def process(self, input_data: Any) -> Any:
         """
         Process input data according to the agent's role.
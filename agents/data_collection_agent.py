@@ -2,14 +2,22 @@ import sys
 import os
 import json
 import requests
+from functools import partial
 from typing import Dict, Any, List, Optional
 import logging
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from agents.base_agent import BaseAgent
-from config import FMP_API_KEY, FMP_BASE_URL, DEFAULT_PERIOD, DEFAULT_LIMIT, TECHNICAL_INDICATORS
+from config import (
+    FMP_API_KEY, FMP_BASE_URL, DEFAULT_PERIOD, DEFAULT_LIMIT, TECHNICAL_INDICATORS,
+    TECHNICAL_INDICATOR_SOURCE, DATA_COLLECTION_MAX_WORKERS, PRICE_HISTORY_DAYS
+)
 from tools.data_transformer import clean_and_convert_numeric, convert_numpy_types
+from utils.concurrency import run_concurrently
+from tools.fmp_client import fmp_get
+from tools.price_store import get_price_store
+from tools import technical_indicators
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +30,12 @@ class DataCollectionAgent(BaseAgent):
         super().__init__(role, "Data Collector", base_url=base_url, model_name=model_name)
         self.api_key = FMP_API_KEY
         self.base_url = FMP_BASE_URL
+        self.max_workers = DATA_COLLECTION_MAX_WORKERS
+        self.indicator_source = TECHNICAL_INDICATOR_SOURCE
+    
+    def _fetch(self, endpoint: str, params: Dict[str, Any] = None) -> Any:
+        """Fetch an FMP endpoint through the shared cached client; raises on request errors."""
+        return fmp_get(endpoint, params, api_key=self.api_key, base_url=self.base_url)
     
     def get_company_profile(self, ticker: str) -> Dict[str, Any]:
         """
@@ -34,10 +48,7 @@ class DataCollectionAgent(BaseAgent):
             dict: Company profile data
         """
         try:
-            url = f"{self.base_url}/profile/{ticker}?apikey={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            profile_data = response.json()
+            profile_data = self._fetch(f"profile/{ticker}")
             
             if not profile_data or not isinstance(profile_data, list) or len(profile_data) == 0:
                 logger.warning(f"No profile data found for {ticker}")
@@ -51,10 +62,7 @@ class DataCollectionAgent(BaseAgent):
     def get_income_statement(self, ticker: str, period: str = DEFAULT_PERIOD, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
         """Get income statement data."""
         try:
-            url = f"{self.base_url}/income-statement/{ticker}?period={period}&limit={limit}&apikey={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch(f"income-statement/{ticker}", {"period": period, "limit": limit})
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching income statement for {ticker}: {str(e)}")
             return [{"error": f"Failed to fetch income statement: {str(e)}"}]
@@ -62,10 +70,7 @@ class DataCollectionAgent(BaseAgent):
     def get_balance_sheet(self, ticker: str, period: str = DEFAULT_PERIOD, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
         """Get balance sheet data."""
         try:
-            url = f"{self.base_url}/balance-sheet-statement/{ticker}?period={period}&limit={limit}&apikey={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch(f"balance-sheet-statement/{ticker}", {"period": period, "limit": limit})
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching balance sheet for {ticker}: {str(e)}")
             return [{"error": f"Failed to fetch balance sheet: {str(e)}"}]
@@ -73,60 +78,83 @@ class DataCollectionAgent(BaseAgent):
     def get_cash_flow(self, ticker: str, period: str = DEFAULT_PERIOD, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
         """Get cash flow statement data."""
         try:
-            url = f"{self.base_url}/cash-flow-statement/{ticker}?period={period}&limit={limit}&apikey={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch(f"cash-flow-statement/{ticker}", {"period": period, "limit": limit})
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching cash flow statement for {ticker}: {str(e)}")
             return [{"error": f"Failed to fetch cash flow statement: {str(e)}"}]
     
-    def get_technical_indicators(self, ticker: str, indicator_name: str = None, time_period: int = 14) -> Dict[str, Any]:
+    def get_technical_indicators(self, ticker: str, indicator_name: str = None, time_period: int = 14,
+                                 price_data: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Get technical indicators data.
         
+        Indicators supported by ``tools.technical_indicators`` are computed locally
+        from the ticker's daily bars in the price store (or a single
+        ``historical-price-full`` download when the store is disabled); anything else (or every
+        indicator when ``TECHNICAL_INDICATOR_SOURCE`` is "fmp") is fetched from FMP.
+        
         Args:
             ticker (str): The ticker symbol
             indicator_name (str, optional): Specific indicator to fetch
             time_period (int, optional): Time period for the indicator
+            price_data (dict, optional): Already downloaded ``get_stock_price`` result
             
         Returns:
             dict: Technical indicators data
         """
-        indicators = {}
-        
         # If a specific indicator is requested
         if indicator_name:
-            try:
-                # Fix the URL format for technical indicators
-                url = f"{self.base_url}/technical_indicator/daily/{ticker}?type={indicator_name}&period={time_period}&apikey={self.api_key}"
-                response = requests.get(url)
-                response.raise_for_status()
-                data = response.json()
-                # Add debug logging
-                logger.debug(f"Response for {indicator_name}: {data}")
-                return {"historical": data}
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching {indicator_name} for {ticker}: {str(e)}")
-                return {"error": f"Failed to fetch {indicator_name}: {str(e)}"}
+            return self._get_technical_indicator(ticker, indicator_name, time_period, price_data)
         
         # If no specific indicator, fetch all from config
+        if self._computes_locally(TECHNICAL_INDICATORS) and price_data is None:
+            price_data = self.get_stock_price(ticker)
+        
+        indicators = {}
         for indicator in TECHNICAL_INDICATORS:
-            try:
-                # Fix the URL format for technical indicators
-                url = f"{self.base_url}/technical_indicator/daily/{ticker}?type={indicator}&period={time_period}&apikey={self.api_key}"
-                response = requests.get(url)
-                response.raise_for_status()
-                data = response.json()
-                # Add debug logging
-                logger.debug(f"Response for {indicator}: {data}")
-                indicators[indicator] = {"historical": data}
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching {indicator} for {ticker}: {str(e)}")
-                indicators[indicator] = {"error": f"Failed to fetch {indicator}: {str(e)}"}
+            indicators[indicator] = self._get_technical_indicator(ticker, indicator, time_period, price_data)
         
         return indicators
     
+    def _computes_locally(self, indicator_names: List[str]) -> bool:
+        """Check whether any of the indicators will be computed from local price history."""
+        return self.indicator_source == "local" and any(technical_indicators.is_supported(name) for name in indicator_names)
+    
+    def _price_frame(self, ticker: str, price_data: Dict[str, Any]):
+        """OHLCV frame for indicator maths, mapped from the price store when it holds the ticker."""
+        store = get_price_store()
+        series = store.view(ticker) if store is not None else None
+        if series is not None and len(series):
+            return series.to_frame()
+        return technical_indicators.historical_to_frame(price_data.get("historical", []))
+    
+    def _get_technical_indicator(self, ticker: str, indicator_name: str, time_period: int,
+                                 price_data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Compute one indicator locally when possible, otherwise fetch it from FMP."""
+        if self.indicator_source == "local" and technical_indicators.is_supported(indicator_name):
+            if price_data is None:
+                price_data = self.get_stock_price(ticker)
+            if "error" in price_data:
+                return {"error": f"Failed to compute {indicator_name}: {price_data['error']}"}
+            
+            try:
+                values = technical_indicators.compute_indicator_frame(
+                    self._price_frame(ticker, price_data), indicator_name, time_period
+                )
+                return {"historical": technical_indicators.indicator_frame_to_records(values)}
+            except (KeyError, ValueError) as e:
+                logger.error(f"Error computing {indicator_name} for {ticker}: {str(e)}")
+                return {"error": f"Failed to compute {indicator_name}: {str(e)}"}
+        
+        try:
+            data = self._fetch(f"technical_indicator/daily/{ticker}", {"type": indicator_name, "period": time_period})
+            # Add debug logging
+            logger.debug(f"Response for {indicator_name}: {data}")
+            return {"historical": data}
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching {indicator_name} for {ticker}: {str(e)}")
+            return {"error": f"Failed to fetch {indicator_name}: {str(e)}"}
+    
     def collect_financial_data(self, ticker: str) -> Dict[str, Any]:
         """Collect comprehensive financial data for a company."""
         company_profile = self.get_company_profile(ticker)
@@ -190,62 +218,79 @@ class DataCollectionAgent(BaseAgent):
             }
     
     def collect_company_data(self, ticker: str, data_plan: Dict[str, Any]) -> Dict[str, Any]:
-        """Collect data for a company based on the data collection plan."""
+        """
+        Collect data for a company based on the data collection plan.
+        
+        Every request in the plan is independent, so they are issued together on a
+        pool of up to ``self.max_workers`` threads and reassembled into the usual
+        ``collected_data`` layout once they have all returned.
+        """
         period = data_plan.get("statement_period", DEFAULT_PERIOD)
         limit = data_plan.get("statement_limit", DEFAULT_LIMIT)
         
-        collected_data = {
-            "ticker": ticker,
-            "company_profile": self.get_company_profile(ticker),
-            "stock_price": self.get_stock_price(ticker) if hasattr(self, 'get_stock_price') else None
+        # Each task is keyed by its path inside collected_data
+        tasks = {
+            ("company_profile",): partial(self.get_company_profile, ticker),
+            ("stock_price",): partial(self.get_stock_price, ticker)
         }
         
-        # Collect financial statements
+        # Financial statements
         statements = data_plan.get("financial_statements", ["income_statement", "balance_sheet", "cash_flow"])
         if "income_statement" in statements:
-            collected_data["income_statement"] = self.get_income_statement(ticker, period, limit)
+            tasks[("income_statement",)] = partial(self.get_income_statement, ticker, period, limit)
         if "balance_sheet" in statements:
-            collected_data["balance_sheet"] = self.get_balance_sheet(ticker, period, limit)
+            tasks[("balance_sheet",)] = partial(self.get_balance_sheet, ticker, period, limit)
         if "cash_flow" in statements:
-            collected_data["cash_flow"] = self.get_cash_flow(ticker, period, limit)
+            tasks[("cash_flow",)] = partial(self.get_cash_flow, ticker, period, limit)
             
-        # Collect ratios and metrics
+        # Ratios and metrics
         ratios_metrics = data_plan.get("ratios_and_metrics", [])
         if "key_metrics" in ratios_metrics:
-            collected_data["key_metrics"] = self.get_key_metrics(ticker, period, limit) if hasattr(self, 'get_key_metrics') else None
+            tasks[("key_metrics",)] = partial(self.get_key_metrics, ticker, period, limit)
         if "financial_ratios" in ratios_metrics:
-            collected_data["financial_ratios"] = self.get_financial_ratios(ticker, period, limit) if hasattr(self, 'get_financial_ratios') else None
+            tasks[("financial_ratios",)] = partial(self.get_financial_ratios, ticker, period, limit)
         if "analyst_estimates" in ratios_metrics:
-            collected_data["analyst_estimates"] = self.get_analyst_estimates(ticker) if hasattr(self, 'get_analyst_estimates') else None
+            tasks[("analyst_estimates",)] = partial(self.get_analyst_estimates, ticker)
             
-        # Collect technical indicators
-        technical_indicators = data_plan.get("technical_indicators", TECHNICAL_INDICATORS)
-        indicators_data = {}
-        for indicator in technical_indicators:
+        # Technical indicators; local ones are computed from stock_price once it arrives
+        indicator_plan = []
+        for indicator in data_plan.get("technical_indicators", TECHNICAL_INDICATORS):
             time_period = 14  # Default time period
             if isinstance(indicator, dict):
                 indicator_name = indicator.get("name")
                 time_period = indicator.get("time_period", 14)
             else:
                 indicator_name = indicator
-                
-            if hasattr(self, 'get_technical_indicators'):
-                indicators_data[indicator_name] = self.get_technical_indicators(
-                    ticker, indicator_name, time_period
+            indicator_plan.append((indicator_name, time_period))
+            if not self._computes_locally([indicator_name]):
+                tasks[("technical_indicators", indicator_name)] = partial(
+                    self.get_technical_indicators, ticker, indicator_name, time_period
                 )
-            
-        collected_data["technical_indicators"] = indicators_data
         
-        # Collect competitor data if specified
-        competitor_tickers = data_plan.get("competitor_tickers", [])
-        if competitor_tickers:
-            competitors_data = {}
-            for comp_ticker in competitor_tickers:
-                # Collect basic info for competitors
-                competitors_data[comp_ticker] = {
-                    "company_profile": self.get_company_profile(comp_ticker),
-                    "key_metrics": self.get_key_metrics(comp_ticker, period, limit) if hasattr(self, 'get_key_metrics') else None
-                }
+        # Basic info for competitors
+        for comp_ticker in data_plan.get("competitor_tickers", []):
+            tasks[("competitors", comp_ticker, "company_profile")] = partial(self.get_company_profile, comp_ticker)
+            tasks[("competitors", comp_ticker, "key_metrics")] = partial(self.get_key_metrics, comp_ticker, period, limit)
+        
+        results = run_concurrently(tasks, self.max_workers)
+        
+        collected_data = {"ticker": ticker}
+        for path, value in results.items():
+            target = collected_data
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+        
+        # Rebuild indicators in plan order, filling in the locally computed ones
+        fetched_indicators = collected_data.pop("technical_indicators", {})
+        competitors_data = collected_data.pop("competitors", None)
+        collected_data["technical_indicators"] = {
+            name: fetched_indicators[name] if name in fetched_indicators else self.get_technical_indicators(
+                ticker, name, time_period, price_data=collected_data["stock_price"]
+            )
+            for name, time_period in indicator_plan
+        }
+        if competitors_data is not None:
             collected_data["competitors"] = competitors_data
             
         return collected_data
@@ -269,12 +314,18 @@ class DataCollectionAgent(BaseAgent):
         data_plan = self.determine_data_needs(ticker, research_plan)
         return self.collect_company_data(ticker, data_plan)
     def get_stock_price(self, ticker: str) -> Dict[str, Any]:
-        """Get historical stock price data."""
+        """
+        Get historical stock price data, synced incrementally into the local price store.
+        
+        With the store enabled only the newest PRICE_HISTORY_DAYS bars are returned as
+        rows; local indicators map the full history from the store instead.
+        """
         try:
-            url = f"{self.base_url}/historical-price-full/{ticker}?apikey={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
+            store = get_price_store()
+            if store is None:
+                return self._fetch(f"historical-price-full/{ticker}")
+            series = store.sync(ticker, api_key=self.api_key, base_url=self.base_url)
+            return {"symbol": ticker, "historical": series.tail(PRICE_HISTORY_DAYS).to_historical()}
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching stock price data for {ticker}: {str(e)}")
             return {"error": f"Failed to fetch stock price data: {str(e)}"}
@@ -282,10 +333,7 @@ class DataCollectionAgent(BaseAgent):
     def get_key_metrics(self, ticker: str, period: str = DEFAULT_PERIOD, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
         """Get key company metrics."""
         try:
-            url = f"{self.base_url}/key-metrics/{ticker}?period={period}&limit={limit}&apikey={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch(f"key-metrics/{ticker}", {"period": period, "limit": limit})
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching key metrics for {ticker}: {str(e)}")
             return [{"error": f"Failed to fetch key metrics: {str(e)}"}]
@@ -293,10 +341,7 @@ class DataCollectionAgent(BaseAgent):
     def get_financial_ratios(self, ticker: str, period: str = DEFAULT_PERIOD, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
         """Get financial ratios."""
         try:
-            url = f"{self.base_url}/ratios/{ticker}?period={period}&limit={limit}&apikey={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch(f"ratios/{ticker}", {"period": period, "limit": limit})
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching financial ratios for {ticker}: {str(e)}")
             return [{"error": f"Failed to fetch financial ratios: {str(e)}"}]
@@ -304,10 +349,7 @@ class DataCollectionAgent(BaseAgent):
     def get_analyst_estimates(self, ticker: str) -> List[Dict[str, Any]]:
         """Get analyst estimates."""
         try:
-            url = f"{self.base_url}/analyst-estimates/{ticker}?apikey={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch(f"analyst-estimates/{ticker}")
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching analyst estimates for {ticker}: {str(e)}")
             return [{"error": f"Failed to fetch analyst estimates: {str(e)}"}]
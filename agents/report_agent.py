@@ -1,13 +1,12 @@
 import sys
 import os
-import json
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterator, List, Optional
 import re
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from agents.base_agent import BaseAgent
-from tools.data_transformer import prepare_data_for_report
+from tools.prompt_payload import PromptPayload
 
 class ReportAgent(BaseAgent):
     """Agent responsible for generating financial reports in markdown format."""
@@ -16,25 +15,13 @@ class ReportAgent(BaseAgent):
         role = "a financial report writer that creates clear, properly formatted markdown reports"
         super().__init__(role, "Report Writer", base_url=base_url, model_name=model_name)
         
-    def generate_report(self, analysis_results: Dict[str, Any], ticker: str) -> str:
-        """
-        Generate a financial analysis report in markdown format.
-        
-        Args:
-            analysis_results (dict): The analysis results to include in the report.
-            ticker (str): The stock ticker symbol.
-            
-        Returns:
-            str: The markdown report.
-        """
-        # Prepare data for the report
-        report_data = prepare_data_for_report(analysis_results)
-        
+    def _report_prompt(self, analysis_results: Dict[str, Any], ticker: str) -> str:
+        """Build the prompt asking for the markdown report."""
         # Generate report structure with LLM
         prompt = f"""
         Create a comprehensive financial analysis report for {ticker} based on the following analysis data:
         
-        {json.dumps(report_data, indent=2)}
+        {PromptPayload.of(analysis_results).for_prompt()}
         
         The report should include:
         1. An executive summary
@@ -50,6 +37,43 @@ class ReportAgent(BaseAgent):
         - Make sure all tables are properly formatted with | and - characters
         - Include proper spacing between sections
         """
+        return prompt
+    
+    def _fact_check_prompt(self, report: str, analysis_results: Dict[str, Any]) -> str:
+        """Build the prompt asking for a fact-checked version of the report."""
+        prompt = f"""
+        You are reviewing a financial analysis report for factual accuracy.
+        
+        Here's the report:
+        ---
+        {report}
+        ---
+        
+        Here's the analysis data that should be reflected in the report:
+        {PromptPayload.of(analysis_results).for_prompt()}
+        
+        Please verify that all facts, figures, and financial data in the report accurately match the analysis data.
+        If you find any discrepancies or factual errors:
+        1. Correct the errors
+        2. Make sure your corrections maintain proper markdown formatting
+        3. Do NOT use markdown code blocks in your response
+        
+        Return the corrected report as clean markdown text.
+        """
+        return prompt
+    
+    def generate_report(self, analysis_results: Dict[str, Any], ticker: str) -> str:
+        """
+        Generate a financial analysis report in markdown format.
+        
+        Args:
+            analysis_results (dict or PromptPayload): The analysis results to include in the report.
+            ticker (str): The stock ticker symbol.
+            
+        Returns:
+            str: The markdown report.
+        """
+        prompt = self._report_prompt(analysis_results, ticker)
         
         # Get the raw markdown content
         markdown_content = self._call_llm(prompt)
@@ -96,38 +120,102 @@ class ReportAgent(BaseAgent):
         
         Args:
             report (str): The generated report.
-            analysis_results (dict): The analysis results.
+            analysis_results (dict or PromptPayload): The analysis results.
             
         Returns:
             str: The fact-checked report with corrections if needed.
         """
-        # Prepare data for fact checking
-        fact_check_data = prepare_data_for_report(analysis_results)
+        prompt = self._fact_check_prompt(report, analysis_results)
         
-        prompt = f"""
-        You are reviewing a financial analysis report for factual accuracy.
+        corrected_report = self._call_llm(prompt)
         
-        Here's the report:
-        ---
-        {report}
-        ---
+        # Clean up the corrected report
+        return self._clean_markdown(corrected_report)
+    
+    def stream_report(self, analysis_results: Dict[str, Any], ticker: str) -> Iterator[str]:
+        """
+        Generate the report like ``generate_report``, yielding raw markdown as it is written.
         
-        Here's the analysis data that should be reflected in the report:
-        {json.dumps(fact_check_data, indent=2)}
+        Args:
+            analysis_results (dict or PromptPayload): The analysis results to include in the report.
+            ticker (str): The stock ticker symbol.
+            
+        Yields:
+            str: Successive pieces of the uncleaned markdown.
+        """
+        return self._stream_llm(self._report_prompt(analysis_results, ticker))
+    
+    def stream_fact_check(self, report: str, analysis_results: Dict[str, Any]) -> Iterator[str]:
+        """
+        Fact check the report like ``fact_check_report``, yielding raw markdown as it is written.
         
-        Please verify that all facts, figures, and financial data in the report accurately match the analysis data.
-        If you find any discrepancies or factual errors:
-        1. Correct the errors
-        2. Make sure your corrections maintain proper markdown formatting
-        3. Do NOT use markdown code blocks in your response
+        Args:
+            report (str): The generated report.
+            analysis_results (dict or PromptPayload): The analysis results.
+            
+        Yields:
+            str: Successive pieces of the uncleaned, corrected markdown.
+        """
+        return self._stream_llm(self._fact_check_prompt(report, analysis_results))
+    
+    def write_report(self, ticker: str, analysis_results: Dict[str, Any], path: str,
+                     on_progress: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
+        """
+        Generate, fact check and write the report, streaming it to disk as it is produced.
         
-        Return the corrected report as clean markdown text.
+        The draft is streamed to ``path + ".draft"`` as tokens arrive, so it is on
+        disk within the first second or two, and once complete and cleaned it
+        atomically replaces ``path``. The fact-checked report is streamed to
+        ``path + ".part"`` and replaces the draft the same way. ``path`` only ever
+        holds a complete, cleaned report: if a stream fails, the partial files
+        are removed and the previous report is left in place.
+        
+        Args:
+            ticker (str): The stock ticker symbol.
+            analysis_results (dict or PromptPayload): The analysis results to include in the report.
+            path (str): Markdown file to write.
+            on_progress (callable, optional): Called as ``on_progress(stage, chunk)`` for
+                every piece of text, with stage "draft" or "fact_check".
+            
+        Returns:
+            dict: Process results including the final report, like ``process``.
         """
+        if not analysis_results:
+            return {"error": "No analysis results provided for report generation"}
         
-        corrected_report = self._call_llm(prompt)
+        analysis_results = PromptPayload.of(analysis_results)
+        
+        def stream_to(target: str, stage: str, chunks: Iterator[str]) -> str:
+            """Stream chunks into ``target``, then rewrite it cleaned and move it onto ``path``."""
+            parts = []
+            with open(target, 'w') as f:
+                for chunk in chunks:
+                    parts.append(chunk)
+                    f.write(chunk)
+                    f.flush()
+                    if on_progress is not None:
+                        on_progress(stage, chunk)
+            cleaned = self._clean_markdown("".join(parts))
+            with open(target, 'w') as f:
+                f.write(cleaned)
+            os.replace(target, path)
+            return cleaned
+        
+        draft_path, partial_path = f"{path}.draft", f"{path}.part"
+        try:
+            draft = stream_to(draft_path, "draft", self.stream_report(analysis_results, ticker))
+            report = stream_to(partial_path, "fact_check", self.stream_fact_check(draft, analysis_results))
+        except BaseException:
+            for leftover in (draft_path, partial_path):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            raise
         
-        # Clean up the corrected report
-        return self._clean_markdown(corrected_report)
+        return {
+            "ticker": ticker,
+            "report": report,
+            "report_file_path": path
+        }
     
     def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -145,6 +233,9 @@ class ReportAgent(BaseAgent):
         if not analysis_results:
             return {"error": "No analysis results provided for report generation"}
         
+        # Both prompts embed the same data; convert and serialize it once
+        analysis_results = PromptPayload.of(analysis_results)
+        
         # Generate initial report
         report = self.generate_report(analysis_results, ticker)
         
@@ -2,6 +2,7 @@ import sys
 import os
 import json
 import re
+from functools import partial
 from typing import Dict, Any, List
 import logging
 
@@ -9,10 +10,11 @@ import logging
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.base_agent import BaseAgent
-from config import MAX_SEARCH_RESULTS, MAX_RESEARCH_DEPTH, SERPAPI_API_KEY
+from config import MAX_SEARCH_RESULTS, MAX_RESEARCH_DEPTH, RESEARCH_MAX_WORKERS, SERPAPI_API_KEY
 from utils.llm_utils import parse_llm_json_response, parse_and_validate_llm_response, parse_list_response
 from models.research_models import ResearchPlan, ArticleContent, SearchResult, ResearchAnalysis, SearchResults
 from utils.observability import monitor_agent_method, StructuredLogger, AgentTracer
+from utils.concurrency import run_concurrently
 
 logger = logging.getLogger(__name__)
 structured_logger = StructuredLogger("ResearchAgent")
@@ -25,6 +27,7 @@ class ResearchAgent(BaseAgent):
         role = "a financial researcher that conducts market research and gathers information about companies and industries"
         super().__init__(role, "Market Researcher", base_url=base_url, model_name=model_name)
         self.tracer = AgentTracer("Market Researcher", structured_logger)
+        self.max_workers = RESEARCH_MAX_WORKERS
     
     @monitor_agent_method()
     def create_research_plan(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -158,6 +161,11 @@ class ResearchAgent(BaseAgent):
         """
         Conduct research based on the research plan.
         
+        All search queries run concurrently, then every selected article is
+        extracted concurrently, each phase bounded by ``self.max_workers``.
+        Findings are assembled in a fixed order so the result does not depend
+        on which call finishes first.
+        
         Args:
             research_plan (dict): Research plan with focus areas and questions
             depth (int): Maximum depth of research to conduct
@@ -167,6 +175,8 @@ class ResearchAgent(BaseAgent):
         """
         ticker = research_plan.get("ticker")
         company_name = research_plan.get("company_name", ticker)
+        industry = research_plan.get("industry", "")
+        competitors = research_plan.get("competitors", [])
         
         # Initialize research findings
         findings = {
@@ -178,45 +188,43 @@ class ResearchAgent(BaseAgent):
             "risk_factors": []
         }
         
-        # Get company overview
-        company_query = f"{company_name} {ticker} company overview financial"
-        company_results = self.search_web(company_query, 3)
-        if company_results and isinstance(company_results[0], dict) and "error" not in company_results[0]:
-            findings["company_overview"] = self.extract_article_content(company_results[0]["link"])
+        # Phase 1: every search query at once
+        searches = {
+            "company_overview": (f"{company_name} {ticker} company overview financial", 3),
+            "financial_insights": (f"{company_name} {ticker} recent financial performance quarterly results", 5),
+            "industry_analysis": (f"{industry} industry trends market analysis {company_name}", 3),
+            "news_and_events": (f"{company_name} {ticker} recent news events last 3 months", 5)
+        }
+        if competitors:
+            competitors_str = ", ".join(competitors)
+            searches["market_position"] = (f"{company_name} vs {competitors_str} market comparison", 2)
         
-        # Research recent financial performance
-        financial_query = f"{company_name} {ticker} recent financial performance quarterly results"
-        financial_results = self.search_web(financial_query, 5)
-        for result in financial_results[:depth]:
-            if isinstance(result, dict) and "link" in result:
-                article = self.extract_article_content(result["link"])
-                if "error" not in article:
-                    findings["financial_insights"].append(article)
+        search_results = run_concurrently(
+            {key: partial(self.search_web, query, num_results) for key, (query, num_results) in searches.items()},
+            self.max_workers
+        )
         
-        # Research industry trends
-        industry = research_plan.get("industry", "")
-        industry_query = f"{industry} industry trends market analysis {company_name}"
-        industry_results = self.search_web(industry_query, 3)
-        if industry_results and isinstance(industry_results[0], dict) and "link" in industry_results[0]:
-            findings["industry_analysis"] = self.extract_article_content(industry_results[0]["link"])
+        # Pick the articles to read: the top hit for single-article findings,
+        # up to `depth` hits for list findings
+        selected_links = {}
+        for key, results in search_results.items():
+            if key in ("financial_insights", "news_and_events"):
+                selected_links[key] = [r["link"] for r in results[:depth] if isinstance(r, dict) and "link" in r]
+            elif results and isinstance(results[0], dict) and "link" in results[0] and "error" not in results[0]:
+                selected_links[key] = [results[0]["link"]]
         
-        # Get recent news
-        news_query = f"{company_name} {ticker} recent news events last 3 months"
-        news_results = self.search_web(news_query, 5)
-        for result in news_results[:depth]:
-            if isinstance(result, dict) and "link" in result:
-                article = self.extract_article_content(result["link"])
-                if "error" not in article:
-                    findings["news_and_events"].append(article)
+        # Phase 2: every article extraction at once, each URL only once
+        unique_links = list(dict.fromkeys(link for links in selected_links.values() for link in links))
+        articles = run_concurrently(
+            {link: partial(self.extract_article_content, link) for link in unique_links},
+            self.max_workers
+        )
         
-        # Research competitors
-        competitors = research_plan.get("competitors", [])
-        if competitors:
-            competitors_str = ", ".join(competitors)
-            comp_query = f"{company_name} vs {competitors_str} market comparison"
-            comp_results = self.search_web(comp_query, 2)
-            if comp_results and isinstance(comp_results[0], dict) and "link" in comp_results[0]:
-                findings["market_position"] = self.extract_article_content(comp_results[0]["link"])
+        for key, links in selected_links.items():
+            if isinstance(findings[key], list):
+                findings[key] = [articles[link] for link in links if "error" not in articles[link]]
+            else:
+                findings[key] = articles[links[0]]
                 
         return findings
         
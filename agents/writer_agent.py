@@ -1,12 +1,16 @@
 import sys
 import os
 import json
-from typing import Dict, Any, List
+from functools import partial
+from typing import Dict, Any, Iterator, List
 from datetime import datetime
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from agents.base_agent import BaseAgent
+from config import WRITER_MAX_WORKERS
+from tools.prompt_payload import serialize_for_prompt
+from utils.concurrency import run_concurrently
 
 class WriterAgent(BaseAgent):
     """Agent responsible for writing financial research reports."""
@@ -14,6 +18,7 @@ class WriterAgent(BaseAgent):
     def __init__(self, base_url: str = None, model_name: str = None):
         role = "a professional financial writer that creates clear, insightful financial research reports"
         super().__init__(role, "Financial Writer", base_url=base_url, model_name=model_name)
+        self.max_workers = WRITER_MAX_WORKERS
     
     def generate_report_structure(self, ticker: str, company_info: Dict[str, Any], research_plan: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -96,19 +101,9 @@ class WriterAgent(BaseAgent):
                 }
             }
     
-    def write_report_section(self, section_name: str, section_template: Dict[str, Any], 
-                             analysis_data: Dict[str, Any]) -> str:
-        """
-        Write a specific section of the report.
-        
-        Args:
-            section_name (str): The name of the section.
-            section_template (dict): Template/structure for this section.
-            analysis_data (dict): Relevant analysis data for this section.
-            
-        Returns:
-            str: The written section content in Markdown format.
-        """
+    def _section_prompt(self, section_name: str, section_template: Dict[str, Any],
+                        analysis_data: Dict[str, Any]) -> str:
+        """Build the prompt asking for one report section."""
         title = section_template.get("title", section_name.replace("_", " ").title())
         key_points = section_template.get("key_points", [])
         
@@ -130,7 +125,7 @@ class WriterAgent(BaseAgent):
         {json.dumps(key_points, indent=2)}
         
         Relevant data:
-        {json.dumps(relevant_data, indent=2)}
+        {serialize_for_prompt(relevant_data)}
         
         Guidelines:
         - Write in a professional, analytical tone appropriate for financial analysis
@@ -149,6 +144,23 @@ class WriterAgent(BaseAgent):
         
         Do not preface the content with section labels. Write the section as if it's part of a complete report.
         """
+        return prompt
+    
+    def write_report_section(self, section_name: str, section_template: Dict[str, Any], 
+                             analysis_data: Dict[str, Any]) -> str:
+        """
+        Write a specific section of the report.
+        
+        Args:
+            section_name (str): The name of the section.
+            section_template (dict): Template/structure for this section.
+            analysis_data (dict): Relevant analysis data for this section.
+            
+        Returns:
+            str: The written section content in Markdown format.
+        """
+        title = section_template.get("title", section_name.replace("_", " ").title())
+        prompt = self._section_prompt(section_name, section_template, analysis_data)
         
         try:
             section_content = self._call_llm(prompt)
@@ -156,6 +168,21 @@ class WriterAgent(BaseAgent):
         except Exception as e:
             return f"Error generating {title} section: {str(e)}"
     
+    def stream_report_section(self, section_name: str, section_template: Dict[str, Any],
+                              analysis_data: Dict[str, Any]) -> Iterator[str]:
+        """
+        Write a section like ``write_report_section``, yielding Markdown as it is generated.
+        
+        Args:
+            section_name (str): The name of the section.
+            section_template (dict): Template/structure for this section.
+            analysis_data (dict): Relevant analysis data for this section.
+            
+        Yields:
+            str: Successive pieces of the section content.
+        """
+        return self._stream_llm(self._section_prompt(section_name, section_template, analysis_data))
+    
     def compile_full_report(self, report_template: Dict[str, Any], section_contents: Dict[str, str]) -> str:
         """
         Compile all sections into a complete report.
@@ -224,12 +251,11 @@ This report was generated with the assistance of AI and automated data analysis
         # Generate report structure
         report_template = self.generate_report_structure(ticker, company_info, research_plan)
         
-        # Write each section
-        section_contents = {}
-        for section_name, section_template in report_template.get("structure", {}).items():
-            section_contents[section_name] = self.write_report_section(
-                section_name, section_template, analysis_results
-            )
+        # Write every section concurrently; results keep template order
+        section_contents = run_concurrently({
+            section_name: partial(self.write_report_section, section_name, section_template, analysis_results)
+            for section_name, section_template in report_template.get("structure", {}).items()
+        }, self.max_workers)
         
         # Compile full report in Markdown format
         full_report = self.compile_full_report(report_template, section_contents)
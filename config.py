@@ -19,16 +19,93 @@ SERPAPI_API_KEY = os.getenv('SERPAPI_API_KEY')
 DEFAULT_PERIOD = "annual"  # or "quarter"
 DEFAULT_LIMIT = 5  # Number of periods to analyze
 TECHNICAL_INDICATORS = ["rsi", "macd", "sma", "ema"]
+TECHNICAL_INDICATOR_SOURCE = os.getenv('TECHNICAL_INDICATOR_SOURCE', 'local')  # "local" computes from price history, "fmp" calls the indicator endpoint
+DATA_COLLECTION_MAX_WORKERS = int(os.getenv('DATA_COLLECTION_MAX_WORKERS', 8))  # Concurrent FMP requests per collection; 1 = sequential
 
 # API Base URLs
-FMP_BASE_URL = "https://financialmodelingprep.com/api/v3"
+FMP_BASE_URL = os.getenv('FMP_BASE_URL', "https://financialmodelingprep.com/api/v3")  # Point at utils/mock_fmp_server.py for offline benchmarks
+
+# HTTP transport (shared pooled session for all outbound API clients)
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))  # Number of hosts kept in the pool
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 16))  # Keep-alive connections per host
+HTTP_POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', 'true').lower() == 'true'  # Wait for a free connection instead of exceeding the per-host limit
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))  # Seconds to establish a connection
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))  # Seconds to wait for response data
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 120))  # Seconds per LLM request
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 32))  # Async completions in flight per event loop
+LLM_POOL_MAXSIZE = int(os.getenv('LLM_POOL_MAXSIZE', 32))  # Keep-alive connections per LLM endpoint, shared by all agents
+
+# Retries and circuit breakers for external calls (HTTP APIs and the LLM)
+RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', 3))  # Attempts per call, including the first
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', 0.5))  # Backoff ceiling before the first retry, doubled per retry
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', 20))  # Longest single wait, also caps Retry-After
+RETRY_DEADLINE = float(os.getenv('RETRY_DEADLINE', 60))  # No retry starts after this many seconds
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))  # Consecutive failures that open a host's circuit
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', 30))  # Seconds an open circuit fails fast before probing
 
 # Directories
 REPORTS_DIR = os.path.join(os.path.dirname(__file__), "reports")
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(os.path.dirname(__file__), ".cache"))
+
+# FMP response cache
+FMP_CACHE_ENABLED = os.getenv('FMP_CACHE_ENABLED', 'true').lower() == 'true'
+FMP_CACHE_PATH = os.getenv('FMP_CACHE_PATH', os.path.join(CACHE_DIR, "fmp_responses.sqlite"))
+FMP_QUOTE_TTL = 15  # Seconds a real-time quote is reused
+FMP_PROFILE_TTL = 24 * 60 * 60  # Profiles and analyst estimates refresh daily
+FMP_STATEMENT_OVERDUE_TTL = 24 * 60 * 60  # Recheck interval once a statement filing is due
+FMP_SCOPE_MAX_ENTRIES = int(os.getenv('FMP_SCOPE_MAX_ENTRIES', 4096))  # Responses kept in memory for a run or batch
+FMP_STREAM_CHUNK_SIZE = int(os.getenv('FMP_STREAM_CHUNK_SIZE', 64 * 1024))  # Bytes read at a time when streaming large responses
+
+# Local daily price store (incrementally synced from FMP)
+PRICE_STORE_ENABLED = os.getenv('PRICE_STORE_ENABLED', 'true').lower() == 'true'
+PRICE_STORE_DIR = os.getenv('PRICE_STORE_DIR', os.path.join(CACHE_DIR, "prices"))
+PRICE_STORE_DTYPE = os.getenv('PRICE_STORE_DTYPE', 'float64')  # Column precision; float32 halves storage but rounds volumes above ~16M
+PRICE_HISTORY_DAYS = int(os.getenv('PRICE_HISTORY_DAYS', 365))  # Newest bars passed on as stock_price rows; indicators read the full store
+
+# FMP rate limit (shared by all threads and worker processes)
+FMP_RATE_LIMIT_ENABLED = os.getenv('FMP_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+FMP_CALLS_PER_MINUTE = float(os.getenv('FMP_CALLS_PER_MINUTE', 300))  # Sustained calls per minute allowed by the plan
+FMP_RATE_LIMIT_BURST = int(os.getenv('FMP_RATE_LIMIT_BURST', 10))  # Calls allowed back to back after an idle period
+FMP_DAILY_QUOTA = int(os.getenv('FMP_DAILY_QUOTA', 0))  # Calls per UTC day; 0 is unlimited
+FMP_RATE_LIMIT_MAX_WAIT = float(os.getenv('FMP_RATE_LIMIT_MAX_WAIT', 300))  # Longest a call blocks before failing
+FMP_RATE_LIMIT_PATH = os.getenv('FMP_RATE_LIMIT_PATH', os.path.join(CACHE_DIR, "rate_limits.sqlite"))
+
+# Record/replay of FMP, SerpAPI and OpenAI traffic
+CASSETTE_MODE = os.getenv('CASSETTE_MODE', 'off').lower()  # "off", "record" or "replay"
+CASSETTE_PATH = os.getenv('CASSETTE_PATH', os.path.join(CACHE_DIR, "cassettes", "default.json.gz"))
+CASSETTE_LATENCY = os.getenv('CASSETTE_LATENCY', '0')  # Replay delay in seconds, or "recorded" to reproduce recorded latencies
 
 # Agent Configuration
 AGENT_MEMORY_LIMIT = 10  # Number of recent messages to keep in agent memory
 
+# LLM response cache (per-agent opt-in)
+LLM_CACHE_AGENTS = [name.strip() for name in os.getenv('LLM_CACHE_AGENTS', '').split(',') if name.strip()]  # Agent class names, or "*" for all
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', 512))  # In-memory LRU tier size
+LLM_CACHE_PERSISTENT = os.getenv('LLM_CACHE_PERSISTENT', 'true').lower() == 'true'  # Also keep responses in SQLite across runs
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join(CACHE_DIR, "llm_responses.sqlite"))
+LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', 256 * 1024 * 1024))  # Persistent tier size before LRU eviction
+LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL')) if os.getenv('LLM_CACHE_TTL') else None  # Seconds; unset keeps entries until evicted
+
+# Prompt payloads (analysis data embedded in LLM prompts)
+PROMPT_COMPACT = os.getenv('PROMPT_COMPACT', 'true').lower() == 'true'  # Compact, tabular JSON; false sends the full pretty-printed data
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', 6000))  # Tokens per embedded payload before lists and text are trimmed; 0 = unlimited
+PROMPT_FLOAT_DECIMALS = int(os.getenv('PROMPT_FLOAT_DECIMALS', 2))  # Decimals kept for numbers >= 1; smaller numbers keep one more significant digit
+
+# Stage checkpoints (resumable runs)
+CHECKPOINT_ENABLED = os.getenv('CHECKPOINT_ENABLED', 'true').lower() == 'true'
+CHECKPOINT_DIR = os.getenv('CHECKPOINT_DIR', os.path.join(CACHE_DIR, "checkpoints"))
+CHECKPOINT_KEEP_COMPLETED = os.getenv('CHECKPOINT_KEEP_COMPLETED', 'false').lower() == 'true'  # Keep checkpoints of successful runs
+CHECKPOINT_RESUME_MAX_AGE = float(os.getenv('CHECKPOINT_RESUME_MAX_AGE', 24 * 60 * 60))  # Seconds; --resume without a run id ignores older runs
+
+# Batch Analysis
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))  # Tickers analyzed at once in batch mode
+BATCH_EXECUTOR = os.getenv('BATCH_EXECUTOR', 'thread')  # "thread" shares agents and caches; "process" runs one orchestrator per process
+
+# Report Writing
+WRITER_MAX_WORKERS = int(os.getenv('WRITER_MAX_WORKERS', 8))  # Report sections generated concurrently; 1 = sequential
+REPORT_STREAMING = os.getenv('REPORT_STREAMING', 'false').lower() == 'true'  # Stream the report to disk as the LLM writes it
+
 # Research Configuration
 MAX_SEARCH_RESULTS = 10
 MAX_RESEARCH_DEPTH = 3
+RESEARCH_MAX_WORKERS = int(os.getenv('RESEARCH_MAX_WORKERS', 6))  # Concurrent searches/extractions per research run; 1 = sequential
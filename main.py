@@ -4,6 +4,7 @@ import argparse
 import logging
 from datetime import datetime
 from orchestrator import FinancialAnalysisOrchestrator
+from config import BATCH_MAX_WORKERS, BATCH_EXECUTOR, CHECKPOINT_ENABLED
 
 # Configure logging
 logging.basicConfig(
@@ -16,23 +17,72 @@ logging.basicConfig(
 
 logger = logging.getLogger("Financial_Analysis_Main")
 
+def read_tickers_file(path):
+    """Read ticker symbols from a file, one per line or comma separated; '#' starts a comment."""
+    tickers = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            tickers.extend(t.strip() for t in line.split(",") if t.strip())
+    return tickers
+
+def run_batch(tickers, workers, executor, run_id=None, resume=False):
+    """Analyze several tickers on a worker pool and print the batch summary."""
+    logger.info(f"Starting batch analysis for {len(tickers)} tickers")
+    
+    orchestrator = FinancialAnalysisOrchestrator()
+    summary = orchestrator.analyze_companies(tickers, max_workers=workers, executor=executor,
+                                             run_id=run_id, resume=resume)
+    
+    print("\n" + "="*50)
+    print(f"Batch analysis finished in {summary['execution_time']:.1f}s: "
+          f"{summary['succeeded']} succeeded, {summary['failed']} failed")
+    for ticker, result in summary["results"].items():
+        if result["status"] == "success":
+            print(f"  {ticker:<8} ok     {result['execution_time']:.1f}s  {os.path.abspath(result['report_path'])}")
+        else:
+            print(f"  {ticker:<8} error  {result['error']}")
+    print(f"Batch summary saved to: {os.path.abspath(summary['summary_path'])}")
+    print("="*50 + "\n")
+
 def main():
     """Main function to run the financial analysis system."""
     parser = argparse.ArgumentParser(description="Financial Analysis System")
-    parser.add_argument("--ticker", type=str, required=True, help="Stock ticker symbol to analyze")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--ticker", type=str, help="Stock ticker symbol to analyze")
+    target.add_argument("--tickers", type=str, help="Comma-separated ticker symbols to analyze as a batch")
+    target.add_argument("--tickers-file", type=str, help="File of ticker symbols to analyze as a batch")
+    parser.add_argument("--workers", type=int, default=BATCH_MAX_WORKERS, help="Tickers analyzed at once in batch mode")
+    parser.add_argument("--executor", choices=["thread", "process"], default=BATCH_EXECUTOR,
+                        help="Worker pool used in batch mode")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume from checkpoints, skipping stages completed by a failed run")
+    parser.add_argument("--run-id", type=str, help="Run id to checkpoint to or resume (default: new run, or the latest recent run with --resume)")
     parser.add_argument("--output", type=str, default="reports", help="Output directory for reports")
     
     args = parser.parse_args()
+    
+    if args.tickers or args.tickers_file:
+        tickers = args.tickers.split(",") if args.tickers else read_tickers_file(args.tickers_file)
+        try:
+            run_batch(tickers, args.workers, args.executor, run_id=args.run_id, resume=args.resume)
+        except Exception as e:
+            logger.error(f"Error running batch analysis: {str(e)}")
+            print(f"\nError running batch analysis: {str(e)}\n")
+        return
+    
     ticker = args.ticker.upper()
     
     logger.info(f"Starting analysis for {ticker}")
     
     try:
         orchestrator = FinancialAnalysisOrchestrator()
-        result = orchestrator.analyze_company(ticker)
+        result = orchestrator.analyze_company(ticker, run_id=args.run_id, resume=args.resume)
         
         if "error" in result:
             print(f"\nError analyzing {ticker}: {result['error']}\n")
+            if CHECKPOINT_ENABLED:
+                print(f"Resume with: python main.py --ticker {ticker} --resume --run-id {result['run_id']}\n")
         else:
             print("\n" + "="*50)
             print(f"Analysis for {ticker} completed successfully!")
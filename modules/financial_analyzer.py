@@ -27,7 +27,8 @@ class FinancialAnalyzer:
     def _ensure_json_serializable(self, data):
         """
         Ensure all values in the data structure are JSON serializable.
-        Converts pandas Timestamp objects to ISO format strings.
+        Converts DataFrames to records, pandas Timestamp objects to ISO format
+        strings and NumPy values to native types, so callers need no second pass.
         
         Args:
             data: Data structure (dict, list, or DataFrame) to convert
@@ -43,10 +44,8 @@ class FinancialAnalyzer:
             # Convert DataFrame to dict first, then ensure all values are serializable
             df_dict = data.to_dict(orient='records')
             return self._ensure_json_serializable(df_dict)
-        elif isinstance(data, pd.Timestamp):
-            return data.isoformat()
         else:
-            return data
+            return convert_numpy_types(data)
             
     def analyze_income_statement(self, income_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -272,18 +271,18 @@ class FinancialAnalyzer:
                     print(f"Indicator data for {indicator}: {indicator_data[:2] if indicator_data else []}")
                     
                     if indicator_data and isinstance(indicator_data, list) and len(indicator_data) > 0:
-                        df = pd.DataFrame(indicator_data)
-                        df = clean_and_convert_numeric(df)
-                        
-                        # Get recent values
-                        recent_values = df.head()
+                        # Only the newest rows are needed as a table; long series are
+                        # averaged from the one value column instead of a full DataFrame
+                        recent_values = clean_and_convert_numeric(pd.DataFrame(indicator_data[:5]))
                         
                         # Calculate average - fix boolean context issues
                         # Find the value column (not date or symbol)
-                        value_cols = [col for col in df.columns if col not in ['date', 'symbol']]
+                        value_cols = [col for col in recent_values.columns if col not in ['date', 'symbol']]
                         if len(value_cols) > 0:
                             value_col = value_cols[0]
-                            avg_value = df[value_col].mean() if len(df) > 0 else None
+                            # Non-numeric entries (e.g. "N/A") count as missing, as in clean_and_convert_numeric
+                            values = pd.to_numeric(pd.Series([row.get(value_col) for row in indicator_data]), errors="coerce")
+                            avg_value = values.mean() if values.notna().any() else None
                             
                             # Ensure there are values to use
                             if len(recent_values) > 0:
@@ -358,9 +357,9 @@ class FinancialAnalyzer:
             else:
                 company_profile = financial_data["company_profile"]
                 
-        # Add company summary
+        # Add company summary; the other sections are already serializable
         if company_profile:
-            results["company_summary"] = {
+            results["company_summary"] = self._ensure_json_serializable({
                 "name": company_profile.get("companyName", ""),
                 "sector": company_profile.get("sector", ""),
                 "industry": company_profile.get("industry", ""),
@@ -368,6 +367,6 @@ class FinancialAnalyzer:
                 "beta": company_profile.get("beta", 0),
                 "price": company_profile.get("price", 0),
                 "description": company_profile.get("description", "")
-            }
+            })
             
-        return self._ensure_json_serializable(results)
\ No newline at end of file
+        return results
\ No newline at end of file
@@ -1,7 +1,8 @@
 import os
 import time
 import json
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Dict, Any, List, Optional
 import logging
 from datetime import datetime
 
@@ -10,68 +11,268 @@ from agents.analysis_agent import AnalysisAgent
 from agents.research_agent import ResearchAgent
 from agents.report_agent import ReportAgent
 from agents.data_collection_agent import DataCollectionAgent
+from utils.stage_graph import StageGraph
+from utils.http import reset_session
+from utils.llm_clients import reset_llm_clients
+from utils.checkpoint import CheckpointStore
+from tools.fmp_client import get_rate_limiter, request_scope
+from tools.prompt_payload import PromptPayload
+from config import (
+    BATCH_MAX_WORKERS, BATCH_EXECUTOR, CHECKPOINT_ENABLED, CHECKPOINT_DIR, CHECKPOINT_KEEP_COMPLETED,
+    CHECKPOINT_RESUME_MAX_AGE, REPORT_STREAMING
+)
 
 logger = logging.getLogger(__name__)
 
+# Orchestrator owned by each worker process in process-pool batch runs
+_worker_orchestrator = None
+
+def _init_batch_worker() -> None:
+    """Build one orchestrator per worker process, shared by every ticker it analyzes."""
+    global _worker_orchestrator
+    # Connections inherited through fork must not be shared with the parent
+    reset_session()
+    reset_llm_clients()
+    _worker_orchestrator = FinancialAnalysisOrchestrator()
+
+def _analyze_in_worker(ticker: str, run_id: Optional[str] = None, resume: bool = False) -> Dict[str, Any]:
+    """Analyze a ticker with the worker process's orchestrator."""
+    return _worker_orchestrator.analyze_company(ticker, run_id=run_id, resume=resume)
+
 class FinancialAnalysisOrchestrator:
     """Orchestrates the financial analysis workflow."""
     
-    def __init__(self):
-        """Initialize the orchestrator with required agents."""
+    def __init__(self, on_report_progress: Optional[Callable[[str, str], None]] = None):
+        """
+        Initialize the orchestrator with required agents.
+        
+        Args:
+            on_report_progress (callable, optional): With REPORT_STREAMING, called as
+                ``on_report_progress(stage, chunk)`` while the report is being written
+        """
         self.data_collector = DataCollectionAgent()
         self.researcher = ResearchAgent()
         self.analyst = AnalysisAgent()
         self.report_generator = ReportAgent()
+        self.checkpoints = CheckpointStore(CHECKPOINT_DIR) if CHECKPOINT_ENABLED else None
+        self.on_report_progress = on_report_progress
 
-    def analyze_company(self, ticker: str) -> Dict[str, Any]:
-        """Run complete analysis for a company."""
+    def analyze_company(self, ticker: str, run_id: Optional[str] = None, resume: bool = False) -> Dict[str, Any]:
+        """
+        Run complete analysis for a company.
+        
+        The workflow runs on a stage graph: financial data collection and
+        market research both depend only on the research plan, so they run
+        at the same time. Per-stage timings are returned in ``stage_timings``.
+        
+        Each finished stage is checkpointed under the run id. A failed run can
+        be resumed with ``resume=True``: stages already checkpointed for the
+        run are loaded instead of being executed again. Without a ``run_id`` the
+        latest run of the ticker is resumed, provided it was checkpointed within
+        CHECKPOINT_RESUME_MAX_AGE; otherwise a fresh run is started.
+        
+        Args:
+            ticker (str): Company ticker symbol
+            run_id (str, optional): Run to checkpoint to or resume
+            resume (bool): Skip stages completed by an earlier attempt of the run
+            
+        Returns:
+            dict: Run summary, or ``{"error": ..., "run_id": ...}`` on failure
+        """
         start_time = time.time()
         
+        graph = self._build_stage_graph(ticker)
+        completed = {}
+        if self.checkpoints is not None:
+            if resume and run_id is None:
+                run_id = self.checkpoints.latest_run(ticker, max_age=CHECKPOINT_RESUME_MAX_AGE)
+            if resume and run_id is not None:
+                # Stages downstream of one that has to run again are recomputed from its new result
+                completed = graph.prune_completed(self.checkpoints.load(ticker, run_id))
+                if completed:
+                    logger.info(f"Resuming {ticker} run {run_id}, skipping stages: {', '.join(completed)}")
+        run_id = run_id or CheckpointStore.new_run_id()
+        checkpointed = set(completed)
+        
+        def checkpoint(stage: str, result: Any) -> None:
+            # A stage built on an uncheckpointed input (e.g. a failed one) re-runs along with it on resume
+            if set(graph.stages[stage].inputs) <= checkpointed and self._checkpoint_stage(ticker, run_id, stage, result):
+                checkpointed.add(stage)
+        
         try:
-            # Initial company data
-            company_data = self._get_initial_company_data(ticker)
-            
-            # Create research plan
-            research_plan = self._create_research_plan({
-                "ticker": ticker,
-                "company_data": company_data
-            })
-            
-            # Collect financial data
-            financial_data = self._collect_financial_data({
-                "ticker": ticker,
-                "research_plan": research_plan
-            })
-            
-            # Conduct market research
-            research_results = self._conduct_market_research({
-                "ticker": ticker,
-                "company_data": company_data,
-                "research_plan": research_plan
-            })
-            
-            # Analyze data
-            analysis_results = self._analyze_data_and_research({
-                "financial_data": financial_data,
-                "research_results": research_results,
-                "research_plan": research_plan
-            })
-            
-            # Write results to files
-            self._write_output_files(ticker, analysis_results)
+            # Data fetched by one stage (e.g. the profile) is reused by the others
+            with request_scope():
+                graph.run(completed=completed, on_complete=checkpoint)
             
             execution_time = time.time() - start_time
             
+            if self.checkpoints is not None and not CHECKPOINT_KEEP_COMPLETED:
+                self.checkpoints.delete(ticker, run_id)
+            
             return {
                 "ticker": ticker,
+                "run_id": run_id,
                 "execution_time": execution_time,
+                "stage_timings": graph.timings,
+                "resumed_stages": list(completed),
                 "report_path": f"reports/{ticker}_analysis.md",
                 "results_path": f"reports/{ticker}_results.json"
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing {ticker}: {str(e)}")
-            return {"error": str(e)}
+            logger.error(f"Error analyzing {ticker} (run {run_id}): {str(e)}")
+            return {"error": str(e), "run_id": run_id}
+    
+    def _checkpoint_stage(self, ticker: str, run_id: str, stage: str, result: Any) -> bool:
+        """Checkpoint a finished stage unless it has nothing worth resuming from; True if saved."""
+        if self.checkpoints is None or result is None:
+            return False
+        # Agent failures come back as error dicts; leave them out so a resume retries the stage
+        if isinstance(result, dict) and "error" in result:
+            return False
+        return self.checkpoints.save(ticker, run_id, stage, result)
+
+    def analyze_companies(self, tickers: List[str], max_workers: Optional[int] = None,
+                          executor: Optional[str] = None, run_id: Optional[str] = None,
+                          resume: bool = False) -> Dict[str, Any]:
+        """
+        Analyze several companies on a worker pool.
+        
+        With the "thread" executor every ticker runs on this orchestrator, sharing its
+        agents, the pooled HTTP session and the in-process caches, and FMP responses
+        are reused across the whole batch. The "process"
+        executor builds one orchestrator per worker process instead; workers still
+        share the on-disk caches.
+        
+        Args:
+            tickers (list): Ticker symbols to analyze
+            max_workers (int, optional): Number of tickers analyzed at once, defaults to BATCH_MAX_WORKERS
+            executor (str, optional): "thread" or "process", defaults to BATCH_EXECUTOR
+            run_id (str, optional): Run id shared by every ticker in the batch; generated if not given
+            resume (bool): Resume each ticker from its checkpoints (see analyze_company)
+            
+        Returns:
+            dict: Batch summary with per-ticker status and timings
+        """
+        start_time = time.time()
+        max_workers = max_workers or BATCH_MAX_WORKERS
+        executor = executor or BATCH_EXECUTOR
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        if not resume:
+            run_id = run_id or CheckpointStore.new_run_id()
+        
+        if executor == "process":
+            pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker)
+            analyze = _analyze_in_worker
+        elif executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+            analyze = self.analyze_company
+        else:
+            raise ValueError(f"Unknown batch executor: {executor}")
+        
+        logger.info(f"Starting batch of {len(tickers)} tickers on {max_workers} {executor} workers")
+        
+        results = {}
+        # Thread workers share FMP responses across tickers, e.g. common competitors
+        with pool, request_scope():
+            futures = {ticker: pool.submit(analyze, ticker, run_id=run_id, resume=resume) for ticker in tickers}
+            for ticker, future in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Worker failed for {ticker}: {str(e)}")
+                    result = {"error": str(e)}
+                
+                if "error" in result:
+                    results[ticker] = {"status": "error", "error": result["error"], "run_id": result.get("run_id")}
+                else:
+                    results[ticker] = {
+                        "status": "success",
+                        "run_id": result.get("run_id"),
+                        "execution_time": result.get("execution_time"),
+                        "stage_timings": result.get("stage_timings", {}),
+                        "report_path": result.get("report_path"),
+                        "results_path": result.get("results_path")
+                    }
+                logger.info(f"Batch: {ticker} {results[ticker]['status']}")
+        
+        succeeded = sum(1 for r in results.values() if r["status"] == "success")
+        limiter = get_rate_limiter()
+        summary = {
+            "tickers": len(tickers),
+            "succeeded": succeeded,
+            "failed": len(tickers) - succeeded,
+            "executor": executor,
+            "max_workers": max_workers,
+            "run_id": run_id,
+            "execution_time": time.time() - start_time,
+            "fmp_rate_limit": limiter.stats() if limiter is not None else None,
+            "results": results
+        }
+        summary["summary_path"] = self._write_batch_summary(summary)
+        
+        logger.info(f"Batch completed in {summary['execution_time']:.2f} seconds: "
+                    f"{succeeded} succeeded, {summary['failed']} failed")
+        return summary
+    
+    def _write_batch_summary(self, summary: Dict[str, Any]) -> str:
+        """
+        Save a batch summary to the reports directory.
+        
+        Args:
+            summary (dict): Batch summary from analyze_companies
+            
+        Returns:
+            str: Path of the summary file
+        """
+        reports_dir = "reports"
+        if not os.path.exists(reports_dir):
+            os.makedirs(reports_dir, exist_ok=True)
+        
+        path = f"{reports_dir}/batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        
+        return path
+
+    def _build_stage_graph(self, ticker: str) -> StageGraph:
+        """Declare the analysis stages and the inputs each one needs."""
+        graph = StageGraph()
+        
+        # Initial company data
+        graph.add_stage("company_data", lambda: self._get_initial_company_data(ticker))
+        
+        # Create research plan
+        graph.add_stage("research_plan", lambda company_data: self._create_research_plan({
+            "ticker": ticker,
+            "company_data": company_data
+        }), inputs=["company_data"])
+        
+        # Collect financial data
+        graph.add_stage("financial_data", lambda research_plan: self._collect_financial_data({
+            "ticker": ticker,
+            "research_plan": research_plan
+        }), inputs=["research_plan"])
+        
+        # Conduct market research
+        graph.add_stage("research_results", lambda company_data, research_plan: self._conduct_market_research({
+            "ticker": ticker,
+            "company_data": company_data,
+            "research_plan": research_plan
+        }), inputs=["company_data", "research_plan"])
+        
+        # Analyze data
+        graph.add_stage("analysis_results", lambda financial_data, research_results, research_plan: self._analyze_data_and_research({
+            "financial_data": financial_data,
+            "research_results": research_results,
+            "research_plan": research_plan
+        }), inputs=["financial_data", "research_results", "research_plan"])
+        
+        # Write results to files
+        graph.add_stage("output_files", lambda analysis_results: self._write_output_files(ticker, analysis_results),
+                        inputs=["analysis_results"])
+        
+        return graph
 
     def _get_initial_company_data(self, ticker: str) -> Dict[str, Any]:
         """Get initial company data."""
@@ -100,15 +301,23 @@ class FinancialAnalysisOrchestrator:
         if not os.path.exists(reports_dir):
             os.makedirs(reports_dir, exist_ok=True)
         
-        # Generate report
-        report_result = self.report_generator.process({
-            "ticker": ticker,
-            "analysis_results": analysis_results
-        })
+        # Analysis agent output (or its JSON checkpoint) holds only native types
+        payload = PromptPayload(analysis_results, converted=True)
         
-        # Write markdown report
-        with open(f"{reports_dir}/{ticker}_analysis.md", 'w') as f:
-            f.write(report_result["report"])
+        report_path = f"{reports_dir}/{ticker}_analysis.md"
+        if REPORT_STREAMING:
+            # The report reaches disk as it is generated rather than after both LLM calls
+            self.report_generator.write_report(ticker, payload, report_path, on_progress=self.on_report_progress)
+        else:
+            # Generate report
+            report_result = self.report_generator.process({
+                "ticker": ticker,
+                "analysis_results": payload
+            })
+            
+            # Write markdown report
+            with open(report_path, 'w') as f:
+                f.write(report_result["report"])
             
         # Write JSON results
         with open(f"{reports_dir}/{ticker}_results.json", 'w') as f:
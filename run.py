@@ -11,23 +11,40 @@ logging.basicConfig(
 logger = logging.getLogger("Financial_Analysis_Runner")
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Run financial analysis for a company")
-    parser.add_argument("ticker", help="Stock ticker symbol (e.g., AAPL)")
+    parser = argparse.ArgumentParser(description="Run financial analysis for one or more companies")
+    parser.add_argument("tickers", nargs="+", help="Stock ticker symbol(s) (e.g., AAPL MSFT)")
+    parser.add_argument("--workers", type=int, default=None, help="Tickers analyzed at once when several are given")
+    parser.add_argument("--executor", choices=["thread", "process"], default=None, help="Worker pool for several tickers")
+    parser.add_argument("--resume", action="store_true", help="Skip stages completed by the last failed run")
+    parser.add_argument("--run-id", default=None, help="Run id to checkpoint to or resume")
     args = parser.parse_args()
     
-    ticker = args.ticker.upper()
-    
-    print(f"Running financial analysis for {ticker}...")
+    tickers = [ticker.upper() for ticker in args.tickers]
     
     try:
         orchestrator = FinancialAnalysisOrchestrator()
-        results = orchestrator.analyze_company(ticker)
         
-        if "error" in results:
-            print(f"Analysis failed: {results['error']}")
+        if len(tickers) == 1:
+            ticker = tickers[0]
+            print(f"Running financial analysis for {ticker}...")
+            results = orchestrator.analyze_company(ticker, run_id=args.run_id, resume=args.resume)
+            
+            if "error" in results:
+                print(f"Analysis failed: {results['error']} (run id {results.get('run_id')})")
+            else:
+                print(f"Analysis complete!")
+                print(f"Report saved to: {results.get('report_path', 'unknown')}")
         else:
-            print(f"Analysis complete!")
-            print(f"Report saved to: {results.get('report_path', 'unknown')}")
+            print(f"Running financial analysis for {len(tickers)} companies...")
+            summary = orchestrator.analyze_companies(tickers, max_workers=args.workers, executor=args.executor,
+                                                     run_id=args.run_id, resume=args.resume)
+            
+            for ticker, result in summary["results"].items():
+                if result["status"] == "success":
+                    print(f"{ticker}: report saved to {result['report_path']}")
+                else:
+                    print(f"{ticker}: analysis failed: {result['error']}")
+            print(f"Batch summary saved to: {summary['summary_path']}")
     
     except Exception as e:
         logger.error(f"Error running analysis: {str(e)}", exc_info=True)
@@ -1,7 +1,12 @@
+import asyncio
 import pytest
+import httpx
+import openai
 from unittest.mock import MagicMock, patch, ANY
 from pydantic import BaseModel, Field
 from agents.base_agent import BaseAgent
+from utils.cache import LRUCache
+from utils.llm_cache import llm_cache_key
 
 class ResponseModel(BaseModel):  # Changed from TestResponseModel to ResponseModel
     """Model for structured responses"""
@@ -16,9 +21,8 @@ class MockAgent(BaseAgent):  # Changed from TestAgent to MockAgent
 @pytest.fixture
 def agent_with_mocks():
     """Create an agent with mocked clients for testing"""
-    # Patch both clients during initialization to avoid instructor type checking
-    with patch('agents.base_agent.instructor.from_openai'), \
-         patch('agents.base_agent.OpenAI'):
+    # Skip the shared client registry; the tests install their own mocks
+    with patch('agents.base_agent.get_llm_clients'):
         agent = MockAgent("test role", "Test Agent")  # Updated class name
         
         # Now create the actual mocks we'll use for testing
@@ -28,21 +32,21 @@ def agent_with_mocks():
         yield agent
 
 def test_base_agent_init():
-    """Test BaseAgent initialization creates both clients"""
-    with patch('agents.base_agent.OpenAI') as mock_openai, \
-         patch('agents.base_agent.instructor.from_openai') as mock_instructor:
-        # Set up return values
-        mock_openai.return_value = MagicMock()
-        mock_instructor.return_value = MagicMock()
-        
-        # Execute
+    """Test BaseAgent initialization takes both clients from the shared registry"""
+    with patch('agents.base_agent.get_llm_clients') as mock_clients:
         agent = MockAgent("test role", "Test Agent")  # Updated class name
     
-        # Assert
-        assert hasattr(agent, "standard_client")
-        assert hasattr(agent, "instructor_client")
-        assert mock_openai.called
-        assert mock_instructor.called
+    mock_clients.assert_called_once_with(None)
+    assert agent.standard_client is mock_clients.return_value.standard
+    assert agent.instructor_client is mock_clients.return_value.instructor
+
+def test_agents_share_clients():
+    """Agents on the same endpoint reuse one client pair instead of building their own"""
+    first = MockAgent("test role", "First", base_url="http://127.0.0.1:9/v1")
+    second = MockAgent("other role", "Second", base_url="http://127.0.0.1:9/v1")
+    
+    assert first.standard_client is second.standard_client
+    assert first.instructor_client is second.instructor_client
 
 def test_call_llm(agent_with_mocks):
     """Test _call_llm uses standard client"""
@@ -89,3 +93,118 @@ def test_call_structured_llm_error_handling(agent_with_mocks):
     # Execute & Assert
     with pytest.raises(Exception):
         agent._call_structured_llm("Test prompt", ResponseModel)  # Updated class name
+
+def test_call_llm_uses_cache_when_enabled(agent_with_mocks):
+    """Identical prompts are answered from the cache after the first call"""
+    agent = agent_with_mocks
+    agent.enable_llm_cache(LRUCache(max_entries=10))
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = "Cached response"
+    agent.standard_client.chat.completions.create.return_value = mock_response
+    
+    assert agent._call_llm("Test prompt") == "Cached response"
+    assert agent._call_llm("Test prompt") == "Cached response"
+    agent._call_llm("Different prompt")
+    
+    assert agent.standard_client.chat.completions.create.call_count == 2
+
+def test_call_structured_llm_rehydrates_cached_model(agent_with_mocks):
+    """Structured responses are cached as JSON and rebuilt as the response model"""
+    agent = agent_with_mocks
+    agent.enable_llm_cache(LRUCache(max_entries=10))
+    agent.instructor_client.chat.completions.create.return_value = ResponseModel(name="Test", value=42)
+    
+    first = agent._call_structured_llm("Test prompt", ResponseModel)
+    second = agent._call_structured_llm("Test prompt", ResponseModel)
+    
+    assert isinstance(second, ResponseModel)
+    assert second == first
+    agent.instructor_client.chat.completions.create.assert_called_once()
+
+def test_llm_cache_key_covers_request_parameters():
+    """Changing any request parameter changes the cache key"""
+    messages = [{"role": "user", "content": "hi"}]
+    base = llm_cache_key("gpt-4", messages, 0.2, 100)
+    
+    assert base == llm_cache_key("gpt-4", [{"role": "user", "content": "hi"}], 0.2, 100)
+    assert base != llm_cache_key("gpt-4o", messages, 0.2, 100)
+    assert base != llm_cache_key("gpt-4", messages, 0.3, 100)
+    assert base != llm_cache_key("gpt-4", messages, 0.2, 200)
+    assert base != llm_cache_key("gpt-4", messages, 0.2, 100, ResponseModel)
+
+def test_call_llm_retries_transient_errors(agent_with_mocks):
+    """Connection failures are retried; the SDK's own retries are disabled."""
+    agent = agent_with_mocks
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = "Recovered"
+    agent.standard_client.chat.completions.create.side_effect = [
+        openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")),
+        mock_response
+    ]
+    
+    with patch("utils.resilience.time.sleep"):
+        assert agent._call_llm("Test prompt") == "Recovered"
+    assert agent.standard_client.chat.completions.create.call_count == 2
+
+def test_clients_disable_sdk_retries():
+    """The OpenAI clients are built with a timeout and without SDK retries."""
+    with patch('utils.llm_clients.OpenAI') as mock_openai, \
+         patch('utils.llm_clients.instructor.from_openai'):
+        MockAgent("test role", "Test Agent", base_url="http://127.0.0.1:9/retries/v1")
+    
+    assert mock_openai.call_args.kwargs["max_retries"] == 0
+    assert mock_openai.call_args.kwargs["timeout"] > 0
+
+class EchoAgent(BaseAgent):
+    def process(self, input_data):
+        return input_data
+
+def test_async_calls_against_local_server():
+    """The async path returns text and structured responses from an OpenAI-compatible endpoint."""
+    from utils.mock_llm_server import MockLLMServer
+    with MockLLMServer(default_content="async hello") as server:
+        agent = EchoAgent("test role", "Async Agent", base_url=server.url)
+        
+        async def run():
+            return await asyncio.gather(agent._acall_llm("hi"), agent._acall_structured_llm("rate it", ResponseModel))
+        
+        text, structured = asyncio.run(run())
+    
+    assert text == "async hello"
+    assert isinstance(structured, ResponseModel)
+    assert structured.name == "Mock name"
+
+def test_async_calls_share_the_in_flight_limit():
+    """Concurrent completions on one loop never exceed LLM_MAX_CONCURRENCY."""
+    from utils.mock_llm_server import MockLLMServer
+    with MockLLMServer(latency="fixed:0.05") as server, \
+         patch('utils.concurrency.LLM_MAX_CONCURRENCY', 3):
+        agents = [EchoAgent("test role", f"Agent {i}", base_url=server.url) for i in range(2)]
+        
+        async def run():
+            return await asyncio.gather(*(agents[i % 2]._acall_llm(f"prompt {i}") for i in range(12)))
+        
+        results = asyncio.run(run())
+        stats = server.stats()
+    
+    assert len(results) == 12
+    assert stats["completed"] == 12
+    assert 2 <= stats["max_in_flight"] <= 3
+
+def test_stream_llm_yields_chunks_and_fills_cache():
+    """Streamed text arrives in pieces, and the joined response is cached for later calls."""
+    from utils.mock_llm_server import MockLLMServer
+    with MockLLMServer(default_content="one two three four five six", tokens_per_second=0) as server:
+        agent = EchoAgent("test role", "Stream Agent", base_url=server.url)
+        agent.enable_llm_cache(LRUCache(8))
+        
+        chunks = list(agent._stream_llm("hi"))
+        again = list(agent._stream_llm("hi"))
+        requests = server.stats()["requests"]
+    
+    assert len(chunks) > 1
+    assert "".join(chunks) == "one two three four five six"
+    assert again == ["one two three four five six"]
+    assert requests == 1
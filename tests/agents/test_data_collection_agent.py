@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import ANY, patch, MagicMock
 import json
 import requests
 from agents.data_collection_agent import DataCollectionAgent
@@ -11,7 +11,7 @@ class TestDataCollectionAgent:
         """Setup for each test method."""
         self.agent = DataCollectionAgent(base_url="mock_url", model_name="mock_model")
     
-    @patch('agents.data_collection_agent.requests.get')
+    @patch('tools.fmp_client.http_get')
     def test_get_company_profile_success(self, mock_get):
         """Test successful company profile retrieval."""
         # Setup mock response
@@ -32,9 +32,10 @@ class TestDataCollectionAgent:
         assert result["industry"] == "Software"
         
         # Verify API call
-        mock_get.assert_called_once_with(f"{self.agent.base_url}/profile/TEST?apikey={self.agent.api_key}")
+        mock_get.assert_called_once_with(f"{self.agent.base_url}/profile/TEST", params={"apikey": self.agent.api_key},
+                                         before_attempt=ANY, after_attempt=ANY)
     
-    @patch('agents.data_collection_agent.requests.get')
+    @patch('tools.fmp_client.http_get')
     def test_get_company_profile_empty_response(self, mock_get):
         """Test empty response handling."""
         # Setup mock to return empty list
@@ -49,7 +50,7 @@ class TestDataCollectionAgent:
         assert "error" in result
         assert "No company profile found" in result["error"]
     
-    @patch('agents.data_collection_agent.requests.get')
+    @patch('tools.fmp_client.http_get')
     def test_get_company_profile_api_error(self, mock_get):
         """Test API error handling."""
         # Setup mock to raise exception
@@ -62,7 +63,7 @@ class TestDataCollectionAgent:
         assert "error" in result
         assert "Failed to fetch company profile" in result["error"]
     
-    @patch('agents.data_collection_agent.requests.get')
+    @patch('tools.fmp_client.http_get')
     def test_get_income_statement(self, mock_get):
         """Test income statement retrieval."""
         # Setup mock response
@@ -77,3 +78,72 @@ class TestDataCollectionAgent:
         assert len(result) == 2
         assert result[0]["revenue"] == 1000000
         assert result[1]["revenue"] == 900000
+    
+    def test_collect_company_data_concurrent(self):
+        """Test concurrent collection keeps the collected_data layout."""
+        data_plan = {
+            "financial_statements": ["income_statement", "cash_flow"],
+            "statement_period": "quarter",
+            "statement_limit": 4,
+            "technical_indicators": ["rsi", {"name": "sma", "time_period": 50}],
+            "ratios_and_metrics": ["key_metrics"],
+            "competitor_tickers": ["COMP"]
+        }
+        
+        with patch.object(self.agent, 'get_company_profile', side_effect=lambda t: {"symbol": t}), \
+             patch.object(self.agent, 'get_stock_price', return_value={"historical": []}), \
+             patch.object(self.agent, 'get_income_statement', return_value=[{"revenue": 1}]) as mock_income, \
+             patch.object(self.agent, 'get_cash_flow', return_value=[{"freeCashFlow": 1}]), \
+             patch.object(self.agent, 'get_key_metrics', side_effect=lambda t, p, l: [{"symbol": t}]), \
+             patch.object(self.agent, 'get_technical_indicators', side_effect=lambda t, n, p, **kwargs: {"name": n, "period": p}):
+            self.agent.max_workers = 4
+            result = self.agent.collect_company_data("TEST", data_plan)
+        
+        assert result["ticker"] == "TEST"
+        assert result["company_profile"] == {"symbol": "TEST"}
+        assert result["income_statement"] == [{"revenue": 1}]
+        assert "balance_sheet" not in result
+        assert result["key_metrics"] == [{"symbol": "TEST"}]
+        assert result["technical_indicators"] == {
+            "rsi": {"name": "rsi", "period": 14},
+            "sma": {"name": "sma", "period": 50}
+        }
+        assert result["competitors"]["COMP"] == {
+            "company_profile": {"symbol": "COMP"},
+            "key_metrics": [{"symbol": "COMP"}]
+        }
+        mock_income.assert_called_once_with("TEST", "quarter", 4)
+    
+    def test_technical_indicators_computed_locally(self):
+        """Local indicators reuse one price download instead of calling the indicator endpoint."""
+        historical = [
+            {"date": f"2024-02-{day:02d}", "open": 1.0, "high": 2.0, "low": 0.5, "close": float(day), "volume": 10}
+            for day in range(29, 0, -1)
+        ]
+        self.agent.indicator_source = "local"
+        
+        with patch.object(self.agent, 'get_stock_price', return_value={"historical": historical}) as mock_price, \
+             patch.object(self.agent, '_fetch') as mock_fetch:
+            result = self.agent.get_technical_indicators("TEST")
+        
+        mock_price.assert_called_once_with("TEST")
+        mock_fetch.assert_not_called()
+        assert set(result.keys()) == {"rsi", "macd", "sma", "ema"}
+        assert result["sma"]["historical"][0] == {"date": "2024-02-29", "sma": pytest.approx(sum(range(16, 30)) / 14)}
+    
+    def test_stock_price_returns_recent_rows_from_the_store(self):
+        """Only the newest PRICE_HISTORY_DAYS bars become rows; indicators map the full history."""
+        historical = [
+            {"date": f"2024-02-{day:02d}", "open": 1.0, "high": 2.0, "low": 0.5, "close": float(day), "volume": 10}
+            for day in range(29, 0, -1)
+        ]
+        self.agent.indicator_source = "local"
+        
+        with patch('tools.price_store.fmp_iter', return_value=historical), \
+             patch('agents.data_collection_agent.PRICE_HISTORY_DAYS', 5):
+            price_data = self.agent.get_stock_price("TEST")
+            sma = self.agent.get_technical_indicators("TEST", "sma", 14, price_data=price_data)
+        
+        assert [row["date"] for row in price_data["historical"]] == [f"2024-02-{day}" for day in range(29, 24, -1)]
+        assert price_data["historical"][0]["label"] == "February 29, 24"
+        assert len(sma["historical"]) == 29 - 13
@@ -99,3 +99,54 @@ More content.
         assert result["ticker"] == "TEST"
         assert "# Test Report" in result["report"]
         assert result["report_file_path"] == "reports/TEST_analysis.md"
+    
+    def test_write_report_streams_to_disk(self, tmp_path, sample_financial_data):
+        """The draft streams beside the report; cleaned, complete versions replace it."""
+        path = tmp_path / "TEST_analysis.md"
+        draft_path = tmp_path / "TEST_analysis.md.draft"
+        on_disk = []
+        
+        def on_progress(stage, chunk):
+            if stage == "draft":
+                on_disk.append(draft_path.read_text())
+            else:
+                # The cleaned draft is the report until the fact check completes
+                assert path.read_text() == "# Draft\nfirst part"
+        
+        streams = [iter(["# Draft", "\nfirst", " part"]), iter(["```markdown\n", "# Final\n", "checked"])]
+        with patch.object(self.agent, '_stream_llm', side_effect=streams) as mock_stream:
+            result = self.agent.write_report("TEST", sample_financial_data, str(path), on_progress=on_progress)
+        
+        assert on_disk == ["# Draft", "# Draft\nfirst", "# Draft\nfirst part"]
+        # The fact check is asked about the cleaned draft
+        assert "# Draft\nfirst part" in mock_stream.call_args_list[1][0][0]
+        assert result["report"] == "# Final\nchecked"
+        assert path.read_text() == "# Final\nchecked"
+        assert not (tmp_path / "TEST_analysis.md.part").exists()
+        assert not draft_path.exists()
+    
+    def test_write_report_requires_analysis_results(self, tmp_path):
+        """Like ``process``, nothing is generated or written without analysis results."""
+        path = tmp_path / "TEST_analysis.md"
+        with patch.object(self.agent, '_stream_llm') as mock_stream:
+            result = self.agent.write_report("TEST", {}, str(path))
+        
+        assert result == {"error": "No analysis results provided for report generation"}
+        mock_stream.assert_not_called()
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_write_report_keeps_previous_report_when_streaming_fails(self, tmp_path, sample_financial_data):
+        """A stream that breaks partway never leaves a partial report at ``path``."""
+        path = tmp_path / "TEST_analysis.md"
+        path.write_text("# Previous report")
+        
+        def broken_stream(prompt):
+            yield "# Draft"
+            raise RuntimeError("connection dropped")
+        
+        with patch.object(self.agent, '_stream_llm', side_effect=broken_stream):
+            with pytest.raises(RuntimeError):
+                self.agent.write_report("TEST", sample_financial_data, str(path))
+        
+        assert path.read_text() == "# Previous report"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["TEST_analysis.md"]
@@ -107,3 +107,38 @@ def test_analyze_research_findings(mock_research_agent):
     assert result["ticker"] == "AAPL"
     assert "analysis" in result
     assert result["analysis"]["market_trends"] == ["Trend 1", "Trend 2"]
+
+def test_conduct_research_fans_out(mock_research_agent):
+    """conduct_research runs searches and extractions concurrently and keeps the findings layout"""
+    agent, _ = mock_research_agent
+    agent.max_workers = 4
+    
+    slugs = {"overview": "overview", "quarterly": "financials", "industry": "industry", "news": "news", "vs": "peers"}
+    
+    def fake_search(query, num_results):
+        slug = next(slug for word, slug in slugs.items() if word in query.split())
+        return [{"title": f"{slug} {i}", "link": f"https://{slug}.com/{i}", "snippet": ""} for i in range(num_results)]
+    
+    def fake_extract(url):
+        if url.endswith("/1"):
+            return {"error": "Failed to extract content"}
+        return {"title": url}
+    
+    with patch.object(agent, 'search_web', side_effect=fake_search) as mock_search, \
+         patch.object(agent, 'extract_article_content', side_effect=fake_extract) as mock_extract:
+        findings = agent.conduct_research({
+            "ticker": "AAPL",
+            "company_name": "Apple",
+            "industry": "Consumer",
+            "competitors": ["MSFT"]
+        }, depth=3)
+    
+    assert mock_search.call_count == 5
+    assert findings["company_overview"] == {"title": "https://overview.com/0"}
+    assert findings["industry_analysis"] == {"title": "https://industry.com/0"}
+    assert findings["market_position"] == {"title": "https://peers.com/0"}
+    # Failed extractions are dropped from list findings, order follows the search results
+    assert findings["financial_insights"] == [{"title": "https://financials.com/0"}, {"title": "https://financials.com/2"}]
+    assert findings["risk_factors"] == []
+    assert findings["news_and_events"] == [{"title": "https://news.com/0"}, {"title": "https://news.com/2"}]
+    assert mock_extract.call_count == 9
@@ -0,0 +1,39 @@
+import time
+from unittest.mock import patch
+from agents.writer_agent import WriterAgent
+
+class TestWriterAgent:
+    """Tests for the WriterAgent."""
+    
+    def setup_method(self):
+        """Setup for each test method."""
+        self.agent = WriterAgent(base_url="mock_url", model_name="mock_model")
+    
+    def test_process_writes_sections_concurrently_in_template_order(self):
+        """Sections are generated in parallel but compiled in template order."""
+        template = {
+            "title": "Financial Analysis: Test (TEST)",
+            "date": "January 01, 2024",
+            "structure": {
+                "executive_summary": {"title": "Executive Summary"},
+                "financial_analysis": {"title": "Financial Analysis"},
+                "investment_recommendation": {"title": "Investment Recommendation"}
+            }
+        }
+        delays = {"executive_summary": 0.2, "financial_analysis": 0.1, "investment_recommendation": 0.0}
+        
+        def fake_section(section_name, section_template, analysis_data):
+            time.sleep(delays[section_name])
+            return f"Content for {section_name}"
+        
+        self.agent.max_workers = 3
+        with patch.object(self.agent, 'generate_report_structure', return_value=template), \
+             patch.object(self.agent, 'write_report_section', side_effect=fake_section):
+            start = time.time()
+            result = self.agent.process({"ticker": "TEST", "analysis_results": {}})
+            elapsed = time.time() - start
+        
+        assert elapsed < 0.28
+        assert list(result["sections"]) == list(template["structure"])
+        report = result["report"]
+        assert report.index("## Executive Summary") < report.index("## Financial Analysis") < report.index("## Investment Recommendation")
@@ -4,6 +4,40 @@ import numpy as np
 import json
 import os
 from unittest.mock import MagicMock, patch
+from utils.cache import SQLiteCache
+from utils.rate_limiter import RateLimiter
+from utils.resilience import reset_circuit_breakers
+
+@pytest.fixture(autouse=True)
+def isolated_response_cache(tmp_path, monkeypatch):
+    """Give every test its own empty FMP response cache."""
+    from tools import fmp_client
+    cache = SQLiteCache(str(tmp_path / "fmp_responses.sqlite"), table="fmp_responses")
+    monkeypatch.setattr(fmp_client, "_response_cache", cache)
+    return cache
+
+@pytest.fixture(autouse=True)
+def isolated_rate_limiter(tmp_path, monkeypatch):
+    """Give every test its own FMP rate limit budget."""
+    from tools import fmp_client
+    limiter = RateLimiter(str(tmp_path / "rate_limits.sqlite"), "fmp", calls_per_minute=6000, burst=1000)
+    monkeypatch.setattr(fmp_client, "_rate_limiter", limiter)
+    return limiter
+
+@pytest.fixture(autouse=True)
+def isolated_price_store(tmp_path, monkeypatch):
+    """Give every test its own empty price store."""
+    from tools import price_store
+    store = price_store.PriceStore(str(tmp_path / "prices"))
+    monkeypatch.setattr(price_store, "_price_store", store)
+    return store
+
+@pytest.fixture(autouse=True)
+def reset_breakers():
+    """Start every test with all circuit breakers closed."""
+    reset_circuit_breakers()
+    yield
+    reset_circuit_breakers()
 
 @pytest.fixture
 def sample_income_statement():
@@ -68,6 +68,14 @@ class TestFinancialAnalyzer:
         # Check trend calculation
         assert result["rsi"]["recent_trend"] == "up"  # 65.5 > 64.2
     
+    def test_analyze_technical_data_skips_non_numeric_values(self):
+        """Unparseable readings are left out of the average instead of failing the indicator."""
+        rows = [{"date": f"2024-01-{d:02d}", "rsi": v} for d, v in zip(range(9, 0, -1), [60, 50, "N/A", None, 40, 30, 20, 10, 0])]
+        result = self.analyzer.analyze_technical_data({"rsi": {"historical": rows}})
+        
+        assert result["rsi"]["latest_value"] == 60
+        assert result["rsi"]["average_value"] == 30
+    
     def test_comprehensive_analysis(self, sample_financial_data):
         """Test the comprehensive analysis function."""
         result = self.analyzer.comprehensive_analysis(sample_financial_data)
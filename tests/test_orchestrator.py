@@ -2,7 +2,10 @@ import pytest
 from unittest.mock import patch, MagicMock, mock_open as mock_open_func
 import os
 import json
+import shutil
+import tempfile
 from orchestrator import FinancialAnalysisOrchestrator
+from utils.checkpoint import CheckpointStore
 
 class TestOrchestrator:
     """Tests for the main orchestrator."""
@@ -10,6 +13,12 @@ class TestOrchestrator:
     def setup_method(self):
         """Setup for each test method."""
         self.orchestrator = FinancialAnalysisOrchestrator()
+        self.checkpoint_dir = tempfile.mkdtemp()
+        self.orchestrator.checkpoints = CheckpointStore(self.checkpoint_dir)
+    
+    def teardown_method(self):
+        """Remove the checkpoints written by the test."""
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
     
     @patch('orchestrator.FinancialAnalysisOrchestrator._get_initial_company_data')
     @patch('orchestrator.FinancialAnalysisOrchestrator._create_research_plan')
@@ -59,4 +68,92 @@ class TestOrchestrator:
         # Check return values 
         assert "execution_time" in result
         assert "report_path" in result
+        assert set(result["stage_timings"]) == {
+            "company_data", "research_plan", "financial_data",
+            "research_results", "analysis_results", "output_files"
+        }
         assert result["ticker"] == "TEST"
+    
+    @patch('orchestrator.FinancialAnalysisOrchestrator._write_batch_summary')
+    @patch('orchestrator.FinancialAnalysisOrchestrator.analyze_company')
+    def test_analyze_companies(self, mock_analyze_company, mock_write_summary):
+        """Test batch analysis reports per-ticker status in input order."""
+        def analyze(ticker, run_id=None, resume=False):
+            if ticker == "BAD":
+                return {"error": "No data"}
+            return {
+                "ticker": ticker,
+                "execution_time": 1.0,
+                "stage_timings": {"company_data": {"start": 0.0, "duration": 1.0}},
+                "report_path": f"reports/{ticker}_analysis.md",
+                "results_path": f"reports/{ticker}_results.json"
+            }
+        mock_analyze_company.side_effect = analyze
+        mock_write_summary.return_value = "reports/batch.json"
+        
+        summary = self.orchestrator.analyze_companies(["aapl", "BAD", "MSFT", "AAPL"], max_workers=2, executor="thread")
+        
+        assert list(summary["results"]) == ["AAPL", "BAD", "MSFT"]
+        assert mock_analyze_company.call_count == 3
+        assert summary["succeeded"] == 2
+        assert summary["failed"] == 1
+        assert summary["results"]["BAD"]["status"] == "error"
+        assert summary["results"]["BAD"]["error"] == "No data"
+        assert summary["results"]["MSFT"]["report_path"] == "reports/MSFT_analysis.md"
+        assert summary["summary_path"] == "reports/batch.json"
+    
+    def test_analyze_companies_unknown_executor(self):
+        """Test an unknown executor is rejected."""
+        with pytest.raises(ValueError):
+            self.orchestrator.analyze_companies(["AAPL"], executor="cluster")
+    
+    @patch('orchestrator.FinancialAnalysisOrchestrator._write_output_files')
+    @patch('orchestrator.FinancialAnalysisOrchestrator._get_initial_company_data')
+    @patch('orchestrator.FinancialAnalysisOrchestrator._create_research_plan')
+    @patch('orchestrator.FinancialAnalysisOrchestrator._collect_financial_data')
+    @patch('orchestrator.FinancialAnalysisOrchestrator._conduct_market_research')
+    @patch('orchestrator.FinancialAnalysisOrchestrator._analyze_data_and_research')
+    def test_resume_skips_checkpointed_stages(self, mock_analyze, mock_research, mock_collect_data,
+                                              mock_plan, mock_initial_data, mock_write_output):
+        """Test a failed run is resumed from its checkpoints."""
+        mock_initial_data.return_value = {"name": "Test Company"}
+        mock_plan.return_value = {"key_areas": ["financials"]}
+        mock_collect_data.return_value = {"financial_data": "test"}
+        mock_research.return_value = {"error": "Search quota exceeded"}
+        mock_analyze.return_value = {"analysis_results": "test"}
+        mock_write_output.side_effect = [IOError("Disk full"), None]
+        
+        failed = self.orchestrator.analyze_company("TEST")
+        assert failed["error"] == "Disk full"
+        # The analysis was built on failed research, so it is not kept either
+        assert set(self.orchestrator.checkpoints.load("TEST", failed["run_id"])) == {
+            "company_data", "research_plan", "financial_data"
+        }
+        
+        mock_research.return_value = {"research": "done"}
+        mock_analyze.return_value = {"analysis_results": "fresh"}
+        result = self.orchestrator.analyze_company("TEST", resume=True)
+        
+        assert result["run_id"] == failed["run_id"]
+        assert set(result["stage_timings"]) == {"research_results", "analysis_results", "output_files"}
+        assert mock_initial_data.call_count == 1
+        assert mock_plan.call_count == 1
+        assert mock_collect_data.call_count == 1
+        assert mock_research.call_count == 2
+        assert mock_analyze.call_count == 2
+        assert mock_analyze.call_args[0][0]["research_results"] == {"research": "done"}
+        mock_write_output.assert_called_with("TEST", {"analysis_results": "fresh"})
+        # Checkpoints of a successful run are removed
+        assert self.orchestrator.checkpoints.runs("TEST") == []
+
+@patch('orchestrator.FinancialAnalysisOrchestrator')
+@patch('orchestrator.reset_llm_clients')
+@patch('orchestrator.reset_session')
+def test_batch_worker_drops_inherited_connections(mock_reset_session, mock_reset_llm_clients, mock_orchestrator):
+    """Forked workers build their own HTTP session and LLM clients."""
+    import orchestrator
+    orchestrator._init_batch_worker()
+    mock_reset_session.assert_called_once()
+    mock_reset_llm_clients.assert_called_once()
+    assert orchestrator._worker_orchestrator is mock_orchestrator.return_value
+    orchestrator._worker_orchestrator = None
@@ -0,0 +1,23 @@
+import os
+from tools.chart_generator import ChartGenerator
+from tools.report_builder import ReportBuilder
+from tools.price_store import PriceSeries
+
+ROWS = [
+    {"date": "2024-01-02", "open": 10.0, "high": 12.0, "low": 9.0, "close": 11.0, "volume": 1000.0},
+    {"date": "2024-01-03", "open": 11.0, "high": 13.0, "low": 10.0, "close": 12.0, "volume": 1500.0}
+]
+
+def test_candlestick_chart_accepts_price_arrays(tmp_path):
+    """Array-backed series produce the same chart data as row dicts."""
+    generator = ChartGenerator(str(tmp_path))
+    from_rows = open(generator.create_candlestick_chart(ROWS, "AAPL")).read()
+    from_arrays = open(generator.create_candlestick_chart(PriceSeries.from_historical("AAPL", ROWS), "AAPL")).read()
+    
+    assert from_arrays == from_rows
+
+def test_static_price_chart_accepts_price_arrays(tmp_path):
+    """The plotly chart is built straight from the columns."""
+    builder = ReportBuilder(str(tmp_path))
+    path = builder._create_static_price_chart(PriceSeries.from_historical("AAPL", ROWS), "AAPL")
+    assert os.path.exists(path)
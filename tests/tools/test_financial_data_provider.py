@@ -1,10 +1,11 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from tools.financial_data_provider import FinancialDataProvider
+from tools.price_store import PriceSeries
 
 @pytest.fixture
 def mock_provider():
-    with patch('tools.financial_data_provider.requests.get') as mock_get:
+    with patch('tools.fmp_client.http_get') as mock_get:
         provider = FinancialDataProvider()
         mock_get.return_value = MagicMock()
         yield provider, mock_get
@@ -63,3 +64,23 @@ def test_get_technical_indicator():
     
     # If we expect indicators to be empty for valid reasons (like API limits),
     # this test should be skipped or the assertion modified
+
+def test_local_indicators_frame_the_stored_series_without_rows():
+    """Indicators are computed from the mapped columns; rows are only built for get_stock_price."""
+    historical = [
+        {"date": f"2024-02-{day:02d}", "open": 1.0, "high": 2.0, "low": 0.5, "close": float(day), "volume": 10}
+        for day in range(29, 0, -1)
+    ]
+    provider = FinancialDataProvider()
+    with patch('tools.price_store.fmp_iter', return_value=historical), \
+         patch('tools.financial_data_provider.TECHNICAL_INDICATOR_SOURCE', "local"), \
+         patch('tools.financial_data_provider.fmp_get', return_value=[{"price": 29.0}]), \
+         patch.object(PriceSeries, 'to_historical', autospec=True, side_effect=PriceSeries.to_historical) as to_rows:
+        sma = provider.get_technical_indicators("TEST", "sma", 14, timeseries=20)
+        to_rows.assert_not_called()
+        prices = provider.get_stock_price("TEST", timeseries=3)
+    
+    assert sma[0] == {"date": "2024-02-29", "sma": pytest.approx(sum(range(16, 30)) / 14)}
+    assert len(sma) == 20 - 13
+    assert [row["close"] for row in prices["historical"]] == [29, 28, 27]
+    assert prices["current_quote"] == {"price": 29.0}
@@ -0,0 +1,193 @@
+import time
+import threading
+import pytest
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock, DEFAULT
+from tools import fmp_client
+
+@pytest.fixture
+def mock_http_get():
+    with patch('tools.fmp_client.http_get') as mock_get:
+        # Run the per-attempt hooks the way http_get does for a single attempt
+        def fake_get(url, params=None, before_attempt=None, after_attempt=None, **kwargs):
+            if before_attempt is not None:
+                before_attempt()
+            if after_attempt is not None:
+                after_attempt(mock_get.return_value)
+            return DEFAULT
+        
+        mock_get.return_value = MagicMock()
+        mock_get.side_effect = fake_get
+        yield mock_get
+
+def test_cache_key_ignores_api_key_and_param_order():
+    """Keys are normalized and never contain the API key."""
+    key_a = fmp_client.make_cache_key("https://fmp/api/v3", "income-statement/AAPL", {"period": "annual", "limit": 5, "apikey": "secret"})
+    key_b = fmp_client.make_cache_key("https://fmp/api/v3/", "/income-statement/AAPL", {"limit": "5", "period": "annual"})
+    assert key_a == key_b
+    assert "secret" not in key_a
+
+def test_fmp_get_serves_repeat_requests_from_cache(mock_http_get):
+    """A second identical request does not hit the network."""
+    mock_http_get.return_value.json.return_value = [{"symbol": "AAPL", "companyName": "Apple Inc."}]
+    
+    first = fmp_client.fmp_get("profile/AAPL", api_key="key-1", base_url="https://fmp")
+    second = fmp_client.fmp_get("profile/AAPL", api_key="key-2", base_url="https://fmp")
+    
+    assert first == second
+    mock_http_get.assert_called_once()
+    assert mock_http_get.call_args.args == ("https://fmp/profile/AAPL",)
+    assert mock_http_get.call_args.kwargs["params"] == {"apikey": "key-1"}
+
+def test_fmp_get_does_not_cache_errors(mock_http_get):
+    """In-band FMP error payloads are refetched."""
+    mock_http_get.return_value.json.return_value = {"Error Message": "Invalid API KEY."}
+    
+    fmp_client.fmp_get("profile/AAPL", base_url="https://fmp")
+    fmp_client.fmp_get("profile/AAPL", base_url="https://fmp")
+    
+    assert mock_http_get.call_count == 2
+
+def test_fmp_get_takes_rate_limit_tokens_on_cache_misses_only(mock_http_get, isolated_rate_limiter):
+    """Cache hits are free; network calls are counted against the budget."""
+    mock_http_get.return_value.json.return_value = [{"symbol": "AAPL"}]
+    
+    fmp_client.fmp_get("profile/AAPL", base_url="https://fmp")
+    fmp_client.fmp_get("profile/AAPL", base_url="https://fmp")
+    
+    assert isolated_rate_limiter.stats()["used_today"] == 1
+
+def test_fmp_get_backs_off_on_429(mock_http_get, isolated_rate_limiter):
+    """A 429 drains the shared bucket for the Retry-After period."""
+    mock_http_get.return_value.status_code = 429
+    mock_http_get.return_value.headers = {"Retry-After": "30"}
+    mock_http_get.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError("429")
+    
+    with pytest.raises(requests.exceptions.HTTPError):
+        fmp_client.fmp_get("profile/AAPL", base_url="https://fmp")
+    
+    assert isolated_rate_limiter.stats()["tokens_available"] == 0
+
+def test_response_ttl_by_endpoint_class():
+    """Each endpoint family gets its own lifetime."""
+    assert fmp_client.response_ttl("quote/AAPL", {}, [{"price": 1}]) == fmp_client.FMP_QUOTE_TTL
+    assert fmp_client.response_ttl("profile/AAPL", {}, [{"symbol": "AAPL"}]) == fmp_client.FMP_PROFILE_TTL
+    assert fmp_client.response_ttl("historical-price-full/AAPL", {}, {"historical": [{}]}) <= 4 * 24 * 60 * 60
+    assert fmp_client.response_ttl("status", {}, {"status": "OK"}) is None
+
+def test_statement_ttl_lasts_until_next_filing():
+    """Statements stay cached until the next expected filing, then are rechecked daily."""
+    now = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    rows = [{"date": "2023-09-30"}, {"date": "2022-09-30"}]
+    
+    # Next annual filing expected around 2024-12-28
+    ttl = fmp_client.seconds_until_next_filing(rows, "annual", now=now)
+    assert 310 * 24 * 60 * 60 > ttl > 295 * 24 * 60 * 60
+    
+    # Quarterly filing for the same period end is already overdue
+    assert fmp_client.seconds_until_next_filing(rows, "quarter", now=now) == fmp_client.FMP_STATEMENT_OVERDUE_TTL
+
+def test_seconds_until_next_close_skips_weekend():
+    """A Friday evening close rolls over to Monday."""
+    friday_evening = datetime(2024, 3, 8, 23, 0, tzinfo=timezone.utc)  # 18:00 in New York
+    seconds = fmp_client.seconds_until_next_close(friday_evening)
+    assert seconds == pytest.approx((2 * 24 + 22) * 60 * 60)
+
+def test_concurrent_identical_requests_share_one_call(mock_http_get):
+    """Callers arriving while a request is in flight wait for it instead of refetching."""
+    started = threading.Event()
+    release = threading.Event()
+    
+    def slow_get(url, params=None, **kwargs):
+        started.set()
+        release.wait(5)
+        response = MagicMock()
+        response.json.return_value = []
+        return response
+    mock_http_get.side_effect = slow_get
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(fmp_client.fmp_get, "profile/MSFT", base_url="https://fmp")
+        started.wait(5)
+        others = [executor.submit(fmp_client.fmp_get, "profile/MSFT", base_url="https://fmp") for _ in range(3)]
+        key = fmp_client.make_cache_key("https://fmp", "profile/MSFT")
+        while fmp_client._in_flight.waiting(key) < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [first.result()] + [f.result() for f in others]
+    
+    assert results == [[], [], [], []]
+    assert mock_http_get.call_count == 1
+
+def test_request_scope_reuses_uncacheable_responses(mock_http_get):
+    """Within a scope, responses the persistent cache skips are still reused."""
+    mock_http_get.return_value.json.return_value = []
+    
+    with fmp_client.request_scope():
+        with fmp_client.request_scope():
+            fmp_client.fmp_get("profile/NONE", base_url="https://fmp")
+        fmp_client.fmp_get("profile/NONE", base_url="https://fmp")
+    assert mock_http_get.call_count == 1
+    
+    fmp_client.fmp_get("profile/NONE", base_url="https://fmp")
+    assert mock_http_get.call_count == 2
+
+def test_request_scope_returns_independent_copies(mock_http_get):
+    """Modifying a returned response does not affect later callers."""
+    mock_http_get.return_value.json.return_value = [{"symbol": "AAPL"}]
+    
+    with fmp_client.request_scope():
+        first = fmp_client.fmp_get("quote/AAPL", base_url="https://fmp")
+        first[0]["symbol"] = "changed"
+        assert fmp_client.fmp_get("quote/AAPL", base_url="https://fmp") == [{"symbol": "AAPL"}]
+
+def test_statement_cache_answers_smaller_limits_from_larger_ones(mock_http_get):
+    """A cached limit=10 response serves limit=5; a larger limit upgrades the entry."""
+    rows = [{"date": f"{2023 - i}-12-31", "revenue": i} for i in range(10)]
+    mock_http_get.return_value.json.return_value = rows
+    
+    assert fmp_client.fmp_get("income-statement/AAPL", {"period": "annual", "limit": 10}, base_url="https://fmp") == rows
+    assert fmp_client.fmp_get("income-statement/AAPL", {"period": "annual", "limit": 5}, base_url="https://fmp") == rows[:5]
+    assert mock_http_get.call_count == 1
+    
+    # A different period is a different statement
+    fmp_client.fmp_get("income-statement/AAPL", {"period": "quarter", "limit": 5}, base_url="https://fmp")
+    assert mock_http_get.call_count == 2
+    
+    longer = rows + [{"date": "2013-12-31", "revenue": 10}, {"date": "2012-12-31", "revenue": 11}]
+    mock_http_get.return_value.json.return_value = longer
+    assert fmp_client.fmp_get("income-statement/AAPL", {"period": "annual", "limit": 12}, base_url="https://fmp") == longer
+    assert fmp_client.fmp_get("income-statement/AAPL", {"period": "annual", "limit": "11"}, base_url="https://fmp") == longer[:11]
+    assert mock_http_get.call_count == 3
+
+def test_statement_cache_knows_when_history_is_complete(mock_http_get):
+    """Fewer rows than requested means there is nothing more to fetch."""
+    rows = [{"date": "2023-12-31"}, {"date": "2022-12-31"}]
+    mock_http_get.return_value.json.return_value = rows
+    
+    fmp_client.fmp_get("balance-sheet-statement/NEWCO", {"period": "annual", "limit": 5}, base_url="https://fmp")
+    assert fmp_client.fmp_get("balance-sheet-statement/NEWCO", {"period": "annual", "limit": 20}, base_url="https://fmp") == rows
+    assert mock_http_get.call_count == 1
+
+def test_fmp_iter_streams_rows_under_the_rate_limit(mock_http_get, isolated_rate_limiter):
+    """Array responses are parsed chunk by chunk from a streamed request."""
+    body = b'{"symbol": "AAPL", "historical": [{"date": "2024-01-03", "close": 12}, {"date": "2024-01-02", "close": 11}]}'
+    mock_http_get.return_value.iter_content.return_value = (body[i:i + 8] for i in range(0, len(body), 8))
+    
+    rows = list(fmp_client.fmp_iter("historical-price-full/AAPL", {"from": "2024-01-02"}, "historical", base_url="https://fmp"))
+    
+    assert [row["close"] for row in rows] == [12, 11]
+    assert mock_http_get.call_args.kwargs["stream"] is True
+    mock_http_get.return_value.iter_content.assert_called_once_with(fmp_client.FMP_STREAM_CHUNK_SIZE)
+    mock_http_get.return_value.close.assert_called_once()
+    assert isolated_rate_limiter.stats()["used_today"] == 1
+
+def test_fmp_iter_reports_truncated_bodies_as_request_errors(mock_http_get):
+    """A body cut off mid-array raises a RequestException, which callers already handle."""
+    mock_http_get.return_value.iter_content.return_value = iter([b'{"historical": [{"date": "2024-01-03", "cl'])
+    
+    with pytest.raises(requests.exceptions.RequestException):
+        list(fmp_client.fmp_iter("historical-price-full/AAPL", None, "historical", base_url="https://fmp"))
+    mock_http_get.return_value.close.assert_called_once()
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+import requests
+from unittest.mock import patch
+from tools.price_store import PriceStore, PriceSeries
+
+def bar(day, close, adj=None):
+    return {"date": day, "open": close - 1, "high": close + 1, "low": close - 2, "close": close,
+            "adjClose": adj if adj is not None else close, "volume": 1000, "label": day}
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path / "prices"))
+
+def test_first_sync_downloads_full_history(store):
+    """The initial sync stores every bar, oldest first, as mapped arrays."""
+    with patch("tools.price_store.fmp_iter", return_value=[bar("2024-01-03", 12), bar("2024-01-02", 11)]) as mock_get:
+        series = store.sync("aapl")
+    
+    mock_get.assert_called_once_with("historical-price-full/AAPL", None, "historical", api_key=None, base_url=None)
+    assert isinstance(series["close"], np.memmap)
+    assert series["close"].tolist() == [11, 12]
+    assert str(series.last_date) == "2024-01-03"
+    assert series.to_historical()[0]["date"] == "2024-01-03"
+    assert series.to_historical()[0]["vwap"] is None
+    assert series.to_historical()[0]["label"] == "January 03, 24"
+    assert list(series.to_historical()[0])[-3:] == ["vwap", "label", "changeOverTime"]
+    assert series.to_frame()["close"].index[0].strftime("%Y-%m-%d") == "2024-01-02"
+
+def test_sync_appends_only_bars_after_the_high_water_mark(store):
+    """Later syncs request from the last stored date and append new bars."""
+    with patch("tools.price_store.fmp_iter", return_value=[bar("2024-01-03", 12), bar("2024-01-02", 11)]):
+        store.sync("AAPL")
+    
+    update = [bar("2024-01-05", 14), bar("2024-01-04", 13), bar("2024-01-03", 12)]
+    with patch("tools.price_store.fmp_iter", return_value=update) as mock_get:
+        series = store.sync("AAPL", force=True)
+    
+    mock_get.assert_called_once_with("historical-price-full/AAPL", {"from": "2024-01-03"}, "historical", api_key=None, base_url=None)
+    assert series["close"].tolist() == [11, 12, 13, 14]
+    assert store.load("AAPL")["close"].tolist() == [11, 12, 13, 14]
+
+def test_sync_is_skipped_until_the_next_close(store):
+    """Fresh data is served without a request."""
+    with patch("tools.price_store.fmp_iter", return_value=[bar("2024-01-02", 11)]) as mock_get:
+        store.sync("AAPL")
+        store.sync("AAPL")
+    assert mock_get.call_count == 1
+
+def test_changed_adjusted_history_triggers_full_reload(store):
+    """A split or dividend re-bases adjClose; the whole history is refetched."""
+    with patch("tools.price_store.fmp_iter", return_value=[bar("2024-01-03", 12), bar("2024-01-02", 11)]):
+        store.sync("AAPL")
+    
+    responses = [
+        [bar("2024-01-04", 13, adj=6.5), bar("2024-01-03", 12, adj=6)],
+        [bar("2024-01-04", 13, adj=6.5), bar("2024-01-03", 12, adj=6), bar("2024-01-02", 11, adj=5.5)]
+    ]
+    with patch("tools.price_store.fmp_iter", side_effect=responses) as mock_get:
+        series = store.sync("AAPL", force=True)
+    
+    assert mock_get.call_count == 2
+    assert series["adjClose"].tolist() == [5.5, 6, 6.5]
+
+def test_failed_sync_serves_stored_bars(store):
+    """A request error falls back to the bars already stored."""
+    with patch("tools.price_store.fmp_iter", return_value=[bar("2024-01-02", 11)]):
+        store.sync("AAPL")
+    
+    with patch("tools.price_store.fmp_iter", side_effect=requests.exceptions.ConnectionError("down")):
+        assert store.sync("AAPL", force=True)["close"].tolist() == [11]
+        with pytest.raises(requests.exceptions.ConnectionError):
+            store.sync("MSFT")
+
+def test_series_tail():
+    """tail returns the newest bars."""
+    series = PriceSeries.from_historical("X", [bar("2024-01-02", 1), bar("2024-01-03", 2), bar("2024-01-04", 3)])
+    assert series.tail(2)["close"].tolist() == [2, 3]
+    assert len(series.tail(0)) == 0
+
+def test_view_returns_mapped_slices_for_a_date_range(store):
+    """Date-range views share memory with the mapped column files."""
+    rows = [bar(f"2024-01-{day:02d}", day) for day in range(2, 12)]
+    with patch("tools.price_store.fmp_iter", return_value=rows):
+        store.sync("AAPL")
+    
+    view = store.view("AAPL", "2024-01-04", "2024-01-06")
+    
+    assert view["close"].tolist() == [4, 5, 6]
+    assert view.date_strings().tolist() == ["2024-01-04", "2024-01-05", "2024-01-06"]
+    assert view.dates.dtype == np.int32
+    assert isinstance(view["close"], np.memmap)
+    series = store.load("AAPL")
+    assert np.shares_memory(series.between("2024-01-04", "2024-01-06")["close"], series["close"])
+    assert len(store.view("AAPL", start="2025-01-01")) == 0
+    assert store.view("MSFT") is None
+
+def test_columns_use_the_configured_dtype(store):
+    """float32 columns halve the stored size."""
+    with patch("tools.price_store.PRICE_STORE_DTYPE", "float32"), \
+         patch("tools.price_store.fmp_iter", return_value=[bar("2024-01-02", 11)]):
+        series = store.sync("AAPL")
+    assert series["close"].dtype == np.float32
+
+def test_from_historical_dedupes_and_sorts():
+    """Rows arrive newest first from FMP; repeated dates keep the last row."""
+    series = PriceSeries.from_historical("AAPL", iter([bar("2024-01-03", 12), bar("2024-01-02", 11), bar("2024-01-03", 13)]))
+    assert series.date_strings().tolist() == ["2024-01-02", "2024-01-03"]
+    assert series["close"].tolist() == [11, 13]
+    assert len(PriceSeries.from_historical("AAPL", [])) == 0
+
+def test_sync_streams_from_the_api(store):
+    """Syncing parses the streamed response into the store end to end."""
+    from utils.mock_fmp_server import MockFMPServer
+    with MockFMPServer() as server:
+        series = store.sync("SYN0001", base_url=server.url)
+        expected = server.market.prices("SYN0001")
+    
+    assert len(series) == len(expected)
+    assert series["close"].tolist() == expected["close"].tolist()
@@ -0,0 +1,106 @@
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+from tools import prompt_payload
+from tools.prompt_payload import PromptPayload, compact, count_tokens, serialize_for_prompt
+
+STATEMENTS = [
+    {"date": "2024-09-28T00:00:00", "symbol": "AAPL", "cik": 320193, "link": "https://sec.gov/a", "finalLink": "https://sec.gov/b",
+     "acceptedDate": "2024-11-01 06:01:36", "revenue": 391035000000.0, "grossProfitRatio": 0.46206349815, "eps": 6.1079},
+    {"date": "2023-09-30T00:00:00", "symbol": "AAPL", "cik": 320193, "link": "https://sec.gov/c", "finalLink": "https://sec.gov/d",
+     "acceptedDate": "2023-11-03 06:01:36", "revenue": 383285000000.0, "grossProfitRatio": 0.44131, "eps": np.float64(6.16)},
+]
+
+@pytest.fixture(autouse=True)
+def clear_encodings():
+    prompt_payload._encodings.clear()
+    yield
+    prompt_payload._encodings.clear()
+
+def test_compact_projects_statement_rows_into_a_table():
+    """Links and filing metadata go, constant columns are stated once, numbers are rounded."""
+    table = compact({"trends": STATEMENTS})["trends"]
+
+    assert table["columns"] == ["date", "revenue", "grossProfitRatio", "eps"]
+    assert table["rows"] == [["2024-09-28", 391035000000, 0.462, 6.11], ["2023-09-30", 383285000000, 0.441, 6.16]]
+    assert table["same"] == {"symbol": "AAPL"}
+
+def test_compact_reads_column_oriented_frames():
+    """``DataFrame.to_dict()`` output is encoded like the records it came from."""
+    frame = pd.DataFrame(STATEMENTS).to_dict()
+    assert compact(frame) == compact(STATEMENTS)
+
+def test_compact_keeps_labeled_indexes():
+    """Nested dicts keyed by anything but 0..n-1 are not mistaken for frames."""
+    by_year = {"revenue": {"2023": 0.1, "2022": 0.2}, "net_income": {"2023": 0.3, "2022": 0.4}}
+    ratios = {"current_ratio": {"value": 1.2, "trend": "up"}, "quick_ratio": {"value": 0.9, "trend": "down"}}
+    assert compact(by_year) == by_year
+    assert compact(ratios) == ratios
+    assert compact(pd.DataFrame({"eps": [6.11, 6.16]}, index=["2024", "2023"]).to_dict()) == {"eps": {"2024": 6.11, "2023": 6.16}}
+
+def test_compact_keeps_scalars_json_native():
+    payload = compact({"ok": np.bool_(True), "nan": float("nan"), "n": np.int64(3), "missing": None, "when": pd.Timestamp("2024-01-02")})
+    assert payload == {"ok": True, "nan": None, "n": 3, "when": "2024-01-02"}
+
+def test_serialize_is_compact_json():
+    text = serialize_for_prompt({"trends": STATEMENTS}, max_tokens=0)
+    assert ", " not in text and ": " not in text
+    assert "sec.gov" not in text
+    assert json.loads(text)["trends"]["rows"][0][0] == "2024-09-28"
+
+def test_serialize_trims_to_the_token_budget():
+    """Lists keep their newest rows and long text is cut until the payload fits."""
+    payload = {
+        "news": [{"title": f"Story {i}", "content": f"Story {i}: " + "word " * 400} for i in range(10)],
+        "prices": [{"date": f"2024-01-{d:02d}", "close": 100.0 + d} for d in range(30, 0, -1)]
+    }
+    full = serialize_for_prompt(payload, max_tokens=0)
+    trimmed = serialize_for_prompt(payload, max_tokens=800)
+
+    assert count_tokens(full) > 800 >= count_tokens(trimmed)
+    data = json.loads(trimmed)
+    assert data["prices"]["rows"][0] == ["2024-01-30", 130]
+    assert data["prices"]["omitted_rows"] > 0
+
+def test_serialize_can_be_switched_off():
+    with patch.object(prompt_payload, "PROMPT_COMPACT", False):
+        text = serialize_for_prompt({"trends": STATEMENTS})
+    assert json.loads(text)["trends"][0]["link"] == "https://sec.gov/a"
+    assert "\n  " in text
+
+def test_count_tokens_without_tiktoken():
+    with patch.object(prompt_payload, "tiktoken", None):
+        assert count_tokens("x" * 10) == 3
+
+def test_payload_converts_once_and_reads_like_the_data():
+    payload = PromptPayload({"n": np.int64(3), "rows": STATEMENTS})
+    assert PromptPayload.of(payload) is payload
+    assert payload["n"] == 3 and type(payload["n"]) is int
+    assert len(payload) == 2 and set(payload) == {"n", "rows"}
+    assert payload.data["rows"][1]["eps"] == 6.16
+
+def test_payload_encodings_are_memoized_by_content():
+    """Repeated encodings, and equal data wrapped again, reuse the serialized text."""
+    data = {"trends": STATEMENTS, "note": "x"}
+    with patch.object(prompt_payload, "_dumps", wraps=prompt_payload._dumps) as dumps:
+        first = PromptPayload(data)
+        text = first.for_prompt()
+        assert first.for_prompt() is text
+        assert PromptPayload(json.loads(json.dumps(data, default=float))).for_prompt() == text
+    assert dumps.call_count == 1
+    assert first.digest == PromptPayload(data).digest != PromptPayload({"note": "y"}).digest
+
+def test_report_prompts_share_one_serialization():
+    """The report and fact-check prompts embed the same payload, serialized once."""
+    from agents.report_agent import ReportAgent
+    agent = ReportAgent(base_url="mock_url", model_name="mock_model")
+    with patch.object(prompt_payload, "_dumps", wraps=prompt_payload._dumps) as dumps, \
+         patch.object(agent, "_call_llm", return_value="# Report") as call_llm:
+        agent.process({"ticker": "TEST", "analysis_results": {"trends": STATEMENTS}})
+    assert dumps.call_count == 1
+    expected = serialize_for_prompt({"trends": STATEMENTS})
+    first, second = (c[0][0] for c in call_llm.call_args_list)
+    assert expected in first and expected in second
@@ -0,0 +1,73 @@
+import pytest
+import numpy as np
+import pandas as pd
+from tools import technical_indicators
+from modules.financial_analyzer import FinancialAnalyzer
+
+@pytest.fixture
+def sample_historical():
+    """Sixty days of synthetic FMP price rows, newest first like the API."""
+    dates = pd.bdate_range("2024-01-01", periods=60)
+    close = 100 + np.cumsum(np.sin(np.arange(60) / 3.0))
+    rows = [
+        {
+            "date": day.strftime("%Y-%m-%d"),
+            "open": float(c - 0.5),
+            "high": float(c + 1.0),
+            "low": float(c - 1.0),
+            "close": float(c),
+            "volume": 1000 + i
+        }
+        for i, (day, c) in enumerate(zip(dates, close))
+    ]
+    return rows[::-1]
+
+def test_sma_matches_rolling_mean(sample_historical):
+    """SMA equals the mean of the last N closes."""
+    result = technical_indicators.compute_indicator(sample_historical, "sma", 10)
+    closes = [row["close"] for row in sample_historical[:10]]
+    
+    assert result[0]["date"] == sample_historical[0]["date"]
+    assert result[0]["sma"] == pytest.approx(sum(closes) / 10)
+    # Warm-up rows are dropped
+    assert len(result) == len(sample_historical) - 9
+
+def test_wma_weights_recent_closes(sample_historical):
+    """WMA weights the newest close by N and the oldest by 1."""
+    result = technical_indicators.compute_indicator(sample_historical, "wma", 3)
+    c0, c1, c2 = (row["close"] for row in sample_historical[:3])
+    assert result[0]["wma"] == pytest.approx((3 * c0 + 2 * c1 + c2) / 6)
+
+def test_rsi_bounds(sample_historical):
+    """RSI stays within 0-100 and is 100 for a strictly rising series."""
+    result = technical_indicators.compute_indicator(sample_historical, "rsi", 14)
+    assert all(0 <= row["rsi"] <= 100 for row in result)
+    
+    rising = [dict(row, close=float(i)) for i, row in enumerate(reversed(sample_historical))][::-1]
+    assert technical_indicators.compute_indicator(rising, "rsi", 14)[0]["rsi"] == 100.0
+
+def test_multi_column_indicators(sample_historical):
+    """MACD and Bollinger Bands emit all their lines."""
+    macd = technical_indicators.compute_indicator(sample_historical, "macd")
+    assert list(macd[0].keys()) == ["date", "macd", "signal", "histogram"]
+    assert macd[0]["histogram"] == pytest.approx(macd[0]["macd"] - macd[0]["signal"])
+    
+    bands = technical_indicators.compute_indicator(sample_historical, "bollinger", 20)
+    assert bands[0]["lowerBand"] < bands[0]["middleBand"] < bands[0]["upperBand"]
+    
+    atr = technical_indicators.compute_indicator(sample_historical, "atr", 14)
+    assert atr[0]["atr"] >= 2.0  # high - low is always 2
+
+def test_unsupported_indicator(sample_historical):
+    """Unknown indicators raise ValueError."""
+    assert not technical_indicators.is_supported("adx")
+    with pytest.raises(ValueError):
+        technical_indicators.compute_indicator(sample_historical, "adx")
+
+def test_output_feeds_financial_analyzer(sample_historical):
+    """Local output has the shape analyze_technical_data consumes."""
+    rsi = technical_indicators.compute_indicator(sample_historical, "rsi", 14)
+    analysis = FinancialAnalyzer().analyze_technical_data({"rsi": {"historical": rsi}})
+    
+    assert analysis["rsi"]["latest_value"] == pytest.approx(rsi[0]["rsi"])
+    assert "error" not in analysis["rsi"]
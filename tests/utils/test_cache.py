@@ -0,0 +1,69 @@
+import time
+from utils.cache import SQLiteCache, LRUCache, TieredCache
+
+def test_sqlite_cache_round_trip_and_expiry(tmp_path):
+    """Values survive a reopen and expire after their TTL."""
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteCache(path)
+    cache.set("forever", {"rows": [1, 2, 3]})
+    cache.set("short", "value", ttl=0.01)
+    
+    time.sleep(0.02)
+    reopened = SQLiteCache(path)
+    assert reopened.get("forever") == {"rows": [1, 2, 3]}
+    assert reopened.get("short") is None
+    assert reopened.get("missing") is None
+
+def test_sqlite_cache_evicts_least_recently_read(tmp_path):
+    """Size-bounded caches drop the entries read longest ago."""
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), max_bytes=25)
+    cache.set("a", "x" * 8)
+    time.sleep(0.01)
+    cache.set("b", "y" * 8)
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", "z" * 8)
+    
+    assert cache.get("a") == "x" * 8
+    assert cache.get("b") is None
+    assert cache.get("c") == "z" * 8
+
+def test_lru_cache_eviction_by_count_and_size():
+    """The memory tier evicts least recently used entries."""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    
+    sized = LRUCache(max_entries=10, max_bytes=10)
+    sized.set("a", "12345")
+    sized.set("b", "12345")
+    assert sized.get("a") is None
+    assert len(sized) == 1
+
+def test_tiered_cache_promotes_persistent_hits(tmp_path):
+    """Entries found only on disk are copied into memory."""
+    persistent = SQLiteCache(str(tmp_path / "cache.sqlite"))
+    persistent.set("key", "from disk")
+    cache = TieredCache(LRUCache(), persistent)
+    
+    assert cache.get("key") == "from disk"
+    assert cache.memory.get("key") == "from disk"
+
+def test_tiered_cache_promotion_keeps_the_remaining_ttl(tmp_path):
+    """A promoted entry expires from memory when it expires on disk."""
+    persistent = SQLiteCache(str(tmp_path / "cache.sqlite"))
+    persistent.set("key", "from disk", ttl=0.2)
+    persistent.set("forever", "from disk")
+    cache = TieredCache(LRUCache(), persistent)
+    
+    assert cache.get("key") == "from disk"
+    assert cache.get("forever") == "from disk"
+    time.sleep(0.25)
+    assert cache.memory.get("key") is None
+    assert cache.get("key") is None
+    assert cache.memory.get("forever") == "from disk"
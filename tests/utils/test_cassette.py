@@ -0,0 +1,163 @@
+import gzip
+import asyncio
+import json
+import httpx
+import requests
+import pytest
+from unittest.mock import patch, MagicMock
+from openai import AsyncOpenAI, OpenAI
+
+from utils import http
+from utils.cassette import Cassette, CassetteMissError, normalize_request, use_cassette
+
+def _response(body, status=200):
+    response = MagicMock(status_code=status, headers={"Content-Type": "application/json", "Set-Cookie": "x"})
+    response.content = json.dumps(body).encode("utf-8")
+    return response
+
+def test_normalize_request_drops_secrets_and_order():
+    """API keys and parameter order do not change a request's identity."""
+    a = normalize_request("get", "https://api.example.com/v3/quote/AAPL?apikey=secret", {"b": 2, "a": 1})
+    b = normalize_request("GET", "https://api.example.com/v3/quote/AAPL", {"a": "1", "b": "2", "api_key": "other"})
+    assert a == b
+    assert "secret" not in json.dumps(a)
+
+def test_record_then_replay_http(tmp_path):
+    """Recorded responses are saved compressed and replayed without the network."""
+    path = str(tmp_path / "run.json.gz")
+    with patch.object(http.get_session(), "get", return_value=_response([{"symbol": "AAPL"}])) as mock_get:
+        with use_cassette(path, "record"):
+            http.http_get("https://api.example.com/v3/quote/AAPL", params={"apikey": "secret"})
+    assert mock_get.call_count == 1
+
+    with gzip.open(path, "rt") as f:
+        raw = f.read()
+    assert "AAPL" in raw and "secret" not in raw and "Set-Cookie" not in raw
+
+    with patch.object(http.get_session(), "get") as mock_get:
+        with use_cassette(path, "replay"):
+            response = http.http_get("https://api.example.com/v3/quote/AAPL", params={"apikey": "other"})
+    mock_get.assert_not_called()
+    assert response.status_code == 200
+    assert response.json() == [{"symbol": "AAPL"}]
+
+def test_replay_miss_raises(tmp_path):
+    """Unrecorded requests fail instead of reaching the network."""
+    path = str(tmp_path / "run.json.gz")
+    with use_cassette(path, "record"):
+        pass
+
+    with patch.object(http.get_session(), "get") as mock_get, use_cassette(path, "replay"):
+        with pytest.raises(CassetteMissError):
+            http.http_get("https://api.example.com/v3/profile/MSFT")
+    mock_get.assert_not_called()
+
+def test_replay_serves_repeats_in_order(tmp_path):
+    """Identical requests get their recordings in order, then the last one again."""
+    path = str(tmp_path / "run.json.gz")
+    cassette = Cassette(path, "record")
+    request = normalize_request("GET", "https://api.example.com/v3/quote/AAPL")
+    for price in (1, 2):
+        cassette.handle(request, lambda: {"status": 200, "headers": {}, "body": str(price), "encoding": "utf-8"})
+    cassette.save()
+
+    replay = Cassette(path, "replay")
+    bodies = [replay.handle(request, None)["body"] for _ in range(3)]
+    assert bodies == ["1", "2", "2"]
+
+def test_replay_latency(tmp_path):
+    """Replay can inject a fixed or the recorded latency."""
+    path = str(tmp_path / "run.json.gz")
+    cassette = Cassette(path, "record")
+    request = normalize_request("GET", "https://api.example.com/v3/quote/AAPL")
+    cassette.handle(request, lambda: {"status": 200, "headers": {}, "body": "1", "encoding": "utf-8"})
+    cassette.interactions[0]["response"]["elapsed"] = 0.25
+    cassette.save()
+
+    with patch("utils.cassette.time.sleep") as mock_sleep:
+        Cassette(path, "replay", latency=0.1).handle(request, None)
+        Cassette(path, "replay", latency="recorded").handle(request, None)
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.1, 0.25]
+
+def test_openai_traffic_round_trip(tmp_path):
+    """The httpx transport records and replays OpenAI SDK calls."""
+    path = str(tmp_path / "llm.json.gz")
+    completion = {
+        "id": "c1", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "hello"}}]
+    }
+    upstream = httpx.MockTransport(lambda request: httpx.Response(200, json=completion))
+
+    def ask(cassette, inner=None):
+        client = OpenAI(api_key="sk-test", max_retries=0, http_client=httpx.Client(transport=cassette.httpx_transport(inner)))
+        response = client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": "hi"}])
+        return response.choices[0].message.content
+
+    with use_cassette(path, "record") as cassette:
+        assert ask(cassette, upstream) == "hello"
+
+    with use_cassette(path, "replay") as cassette:
+        assert ask(cassette) == "hello"
+    with gzip.open(path, "rt") as f:
+        assert "sk-test" not in f.read()
+
+def test_async_openai_traffic_round_trip(tmp_path):
+    """The async transport records and replays AsyncOpenAI calls."""
+    path = str(tmp_path / "llm.json.gz")
+    completion = {
+        "id": "c1", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "async"}}]
+    }
+    upstream = httpx.MockTransport(lambda request: httpx.Response(200, json=completion))
+
+    async def ask(cassette, inner=None):
+        transport = cassette.async_httpx_transport(inner)
+        client = AsyncOpenAI(api_key="sk-test", max_retries=0, http_client=httpx.AsyncClient(transport=transport))
+        response = await client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": "hi"}])
+        return response.choices[0].message.content
+
+    with use_cassette(path, "record") as cassette:
+        assert asyncio.run(ask(cassette, upstream)) == "async"
+    with use_cassette(path, "replay") as cassette:
+        assert asyncio.run(ask(cassette)) == "async"
+
+def test_recording_on_a_warm_machine_replays_on_a_cold_one(tmp_path, monkeypatch, isolated_response_cache):
+    """Record mode bypasses the local caches, so replay needs nothing but the cassette."""
+    from tools import fmp_client, price_store
+    from agents.base_agent import BaseAgent
+    
+    path = str(tmp_path / "warm.json.gz")
+    rows = [{"date": "2024-01-03", "close": 12.0}, {"date": "2024-01-02", "close": 11.0}]
+    bodies = {"profile/AAPL": [{"symbol": "AAPL"}], "historical-price-full/AAPL": {"symbol": "AAPL", "historical": rows}}
+    
+    def upstream(url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(bodies[url.split("/v3/")[1]]).encode("utf-8")
+        return response
+    
+    # Warm machine: profile in the response cache, bars in a freshly synced store
+    warm_store = price_store.PriceStore(str(tmp_path / "warm_prices"))
+    monkeypatch.setattr(price_store, "_price_store", warm_store)
+    with patch("tools.price_store.fmp_iter", return_value=rows):
+        warm_store.sync("AAPL")
+    isolated_response_cache.set(fmp_client.make_cache_key("https://fmp/api/v3", "profile/AAPL"), [{"symbol": "AAPL"}])
+    agent = BaseAgent("tester", "Tester", base_url="mock_url", model_name="mock_model")
+    agent.enable_llm_cache(MagicMock())
+    
+    with patch.object(http.get_session(), "get", side_effect=upstream) as mock_get, use_cassette(path, "record"):
+        with fmp_client.request_scope():
+            fmp_client.fmp_get("profile/AAPL", base_url="https://fmp/api/v3")
+            fmp_client.fmp_get("profile/AAPL", base_url="https://fmp/api/v3")
+        warm_store.sync("AAPL")
+        assert agent._cache_lookup(agent._text_messages("hi")) == (None, None)
+    assert mock_get.call_count == 3
+    
+    # Cold machine: empty response cache and price store, no network
+    cold_store = price_store.PriceStore(str(tmp_path / "cold_prices"))
+    monkeypatch.setattr(price_store, "_price_store", cold_store)
+    isolated_response_cache.clear()
+    with patch.object(http.get_session(), "get") as mock_get, use_cassette(path, "replay"):
+        assert fmp_client.fmp_get("profile/AAPL", base_url="https://fmp/api/v3") == [{"symbol": "AAPL"}]
+        assert cold_store.sync("AAPL")["close"].tolist() == [11.0, 12.0]
+    mock_get.assert_not_called()
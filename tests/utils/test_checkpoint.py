@@ -0,0 +1,37 @@
+import os
+from utils.checkpoint import CheckpointStore
+
+def test_checkpoints_round_trip_per_run(tmp_path):
+    """Stage results are stored per ticker and run."""
+    store = CheckpointStore(str(tmp_path))
+    store.save("aapl", "run1", "company_data", {"name": "Apple"})
+    store.save("AAPL", "run1", "research_plan", ["financials"])
+    store.save("AAPL", "run2", "company_data", {"name": "Apple Inc."})
+    
+    assert store.load("AAPL", "run1") == {"company_data": {"name": "Apple"}, "research_plan": ["financials"]}
+    assert store.load("AAPL", "missing") == {}
+    assert store.runs("AAPL") == ["run1", "run2"]
+    assert store.latest_run("AAPL") == "run2"
+    assert store.latest_run("MSFT") is None
+    
+    store.delete("AAPL", "run1")
+    assert store.runs("AAPL") == ["run2"]
+
+def test_unserializable_results_are_skipped(tmp_path):
+    """A result that is not JSON leaves no partial checkpoint behind."""
+    store = CheckpointStore(str(tmp_path))
+    
+    assert store.save("AAPL", "run1", "company_data", {"raw": object()}) is False
+    assert store.load("AAPL", "run1") == {}
+    assert not os.path.exists(tmp_path / "AAPL" / "run1" / "company_data.json.tmp")
+
+def test_latest_run_ignores_stale_runs(tmp_path):
+    """A run last checkpointed longer ago than max_age is not picked up implicitly."""
+    store = CheckpointStore(str(tmp_path))
+    store.save("AAPL", "run1", "company_data", {"name": "Apple"})
+    assert store.latest_run("AAPL", max_age=60) == "run1"
+    
+    day_ago = os.path.getmtime(tmp_path / "AAPL" / "run1") - 24 * 60 * 60
+    os.utime(tmp_path / "AAPL" / "run1", (day_ago, day_ago))
+    assert store.latest_run("AAPL", max_age=60) is None
+    assert store.latest_run("AAPL") == "run1"
@@ -0,0 +1,35 @@
+import time
+import threading
+from utils.concurrency import run_concurrently
+
+def test_run_concurrently_preserves_task_order():
+    """Results come back in task order even when tasks finish out of order."""
+    tasks = {
+        "slow": lambda: time.sleep(0.05) or "slow",
+        "fast": lambda: "fast"
+    }
+    result = run_concurrently(tasks, max_workers=2)
+    assert list(result.items()) == [("slow", "slow"), ("fast", "fast")]
+
+def test_run_concurrently_respects_worker_cap():
+    """No more than max_workers tasks run at the same time."""
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+    
+    def task():
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return True
+    
+    run_concurrently({i: task for i in range(8)}, max_workers=3)
+    assert state["peak"] <= 3
+
+def test_run_concurrently_serial_mode():
+    """A cap of one runs the tasks inline."""
+    main_thread = threading.current_thread()
+    result = run_concurrently({"a": threading.current_thread}, max_workers=1)
+    assert result["a"] is main_thread
@@ -0,0 +1,52 @@
+from unittest.mock import patch, MagicMock
+from utils import http
+
+def test_get_session_is_shared():
+    """All callers get the same pooled session."""
+    http.reset_session()
+    session = http.get_session()
+    assert http.get_session() is session
+    
+    adapter = session.get_adapter("https://financialmodelingprep.com")
+    assert adapter._pool_maxsize == http.HTTP_POOL_MAXSIZE
+    assert adapter._pool_block == http.HTTP_POOL_BLOCK
+    assert "gzip" in session.headers["Accept-Encoding"]
+
+def test_reset_session_builds_new_pool():
+    """reset_session drops the shared session."""
+    first = http.get_session()
+    http.reset_session()
+    assert http.get_session() is not first
+
+def test_http_get_routes_through_session():
+    """http_get delegates to the shared session."""
+    with patch.object(http.get_session(), "get") as mock_get:
+        http.http_get("https://example.com/api", params={"q": "x"}, timeout=5)
+    mock_get.assert_called_once_with("https://example.com/api", params={"q": "x"}, timeout=5)
+
+def test_http_get_applies_default_timeout_and_retries():
+    """Transient failures are retried under the default timeout."""
+    failed = MagicMock(status_code=503, headers={})
+    ok = MagicMock(status_code=200, headers={})
+    with patch.object(http.get_session(), "get", side_effect=[failed, ok]) as mock_get, \
+         patch("utils.resilience.time.sleep"):
+        response = http.http_get("https://example.com/api")
+    
+    assert response is ok
+    assert mock_get.call_count == 2
+    assert mock_get.call_args.kwargs["timeout"] == (http.HTTP_CONNECT_TIMEOUT, http.HTTP_READ_TIMEOUT)
+
+def test_http_get_runs_hooks_per_attempt_and_closes_retried_responses():
+    """Each retry takes its own rate-limit token, and discarded responses release their connection."""
+    failed = MagicMock(status_code=429, headers={})
+    ok = MagicMock(status_code=200, headers={})
+    before, after = MagicMock(), MagicMock()
+    with patch.object(http.get_session(), "get", side_effect=[failed, ok]), \
+         patch("utils.resilience.time.sleep"):
+        response = http.http_get("https://example.com/api", before_attempt=before, after_attempt=after, stream=True)
+    
+    assert response is ok
+    assert before.call_count == 2
+    assert [c.args[0] for c in after.call_args_list] == [failed, ok]
+    failed.close.assert_called_once()
+    ok.close.assert_not_called()
@@ -0,0 +1,42 @@
+import json
+import pytest
+
+from utils.json_stream import iter_array
+
+DOCUMENT = {
+    "symbol": "AAPL",
+    "meta": {"note": "prices in USD, été – \"quoted\""},
+    "historical": [{"date": f"2024-01-{d:02d}", "close": 100.125 + d, "volume": 123456789} for d in range(1, 20)]
+}
+
+def chunked(data: bytes, size: int):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_iter_array_under_any_chunking(size):
+    """Elements decode identically wherever chunk boundaries fall, including inside numbers and UTF-8."""
+    data = json.dumps(DOCUMENT, ensure_ascii=False, indent=1).encode("utf-8")
+    assert list(iter_array(chunked(data, size), "historical")) == DOCUMENT["historical"]
+
+def test_iter_array_top_level():
+    """A bare top-level array is streamed when no key is given."""
+    data = json.dumps([1, 22, 333, {"a": [1, 2]}]).encode("utf-8")
+    assert list(iter_array(chunked(data, 2))) == [1, 22, 333, {"a": [1, 2]}]
+
+def test_iter_array_missing_array_yields_nothing():
+    """Empty objects and error payloads have no rows."""
+    assert list(iter_array([b"{}"], "historical")) == []
+    assert list(iter_array([b'{"Error Message": "Limit Reach"}'], "historical")) == []
+    assert list(iter_array([b'{"historical": []}'], "historical")) == []
+
+def test_iter_array_is_lazy():
+    """Elements are yielded before the rest of the document has arrived."""
+    def chunks():
+        yield b'{"historical": [{"n": 1}, '
+        raise AssertionError("read past the first element")
+
+    assert next(iter_array(chunks(), "historical")) == {"n": 1}
+
+def test_iter_array_truncated_stream_raises():
+    with pytest.raises(ValueError):
+        list(iter_array([b'{"historical": [{"n": 1}, {"n"'], "historical"))
@@ -0,0 +1,42 @@
+import asyncio
+from unittest.mock import patch
+
+from utils import llm_clients
+from utils.cassette import use_cassette
+from utils.llm_clients import get_async_llm_clients, get_llm_clients, reset_llm_clients
+
+def test_clients_shared_per_endpoint_and_key():
+    """One client pair per (base_url, api_key), built once."""
+    a = get_llm_clients("http://127.0.0.1:9/a/v1", "k1")
+    assert get_llm_clients("http://127.0.0.1:9/a/v1", "k1") is a
+    assert get_llm_clients("http://127.0.0.1:9/a/v1", "k2") is not a
+    assert get_llm_clients("http://127.0.0.1:9/b/v1", "k1") is not a
+
+def test_instructor_wraps_the_shared_client():
+    """The instructor wrapper reuses the standard client and its connection pool."""
+    clients = get_llm_clients("http://127.0.0.1:9/c/v1", "k")
+    assert clients.instructor.client is clients.standard
+    assert clients.standard.max_retries == 0
+
+def test_reset_builds_fresh_clients():
+    a = get_llm_clients("http://127.0.0.1:9/d/v1", "k")
+    reset_llm_clients()
+    assert get_llm_clients("http://127.0.0.1:9/d/v1", "k") is not a
+
+def test_cassette_clients_bypass_registry(tmp_path):
+    """Clients routed through a cassette are never handed to other callers."""
+    with patch.object(llm_clients, "_build", wraps=llm_clients._build) as build:
+        with use_cassette(str(tmp_path / "c.json.gz"), "record"):
+            a = get_llm_clients("http://127.0.0.1:9/e/v1", "k")
+        b = get_llm_clients("http://127.0.0.1:9/e/v1", "k")
+    assert a is not b
+    assert build.call_count == 2
+
+def test_async_clients_shared_per_loop():
+    async def pair():
+        return get_async_llm_clients("http://127.0.0.1:9/f/v1", "k"), get_async_llm_clients("http://127.0.0.1:9/f/v1", "k")
+
+    first, again = asyncio.run(pair())
+    assert first is again
+    other_loop, _ = asyncio.run(pair())
+    assert other_loop is not first
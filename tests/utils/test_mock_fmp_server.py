@@ -0,0 +1,91 @@
+import gc
+import weakref
+import pytest
+import requests
+from datetime import date, timedelta
+
+from agents.data_collection_agent import DataCollectionAgent
+from tools.fmp_client import fmp_get
+from utils.mock_fmp_server import MockFMPServer, SyntheticMarket, universe
+
+@pytest.fixture(scope="module")
+def server():
+    with MockFMPServer(universe_size=50) as server:
+        yield server
+
+def test_synthetic_market_is_deterministic():
+    """The same ticker yields identical data across generator instances."""
+    first, second = SyntheticMarket(), SyntheticMarket()
+    assert first.income_statement("SYN0001", limit=3) == second.income_statement("SYN0001", limit=3)
+    assert first.income_statement("SYN0001") != first.income_statement("SYN0002")
+
+def test_synthetic_market_memos_are_per_instance():
+    """Memoized traits and prices live on the market, not on a class-level cache that pins it."""
+    market = SyntheticMarket(seed=7)
+    assert market.company("SYN0001") is market.company("SYN0001")
+    assert market.company("SYN0001") != SyntheticMarket(seed=8).company("SYN0001")
+    assert market.prices("SYN0001") is market.prices("SYN0001")
+    
+    ref = weakref.ref(market)
+    del market
+    gc.collect()
+    assert ref() is None
+
+def test_statements_are_consistent():
+    """Statements share periods and tie out against each other."""
+    market = SyntheticMarket()
+    income = market.income_statement("SYN0003", "quarter", 6)
+    balance = market.balance_sheet("SYN0003", "quarter", 6)
+    cash = market.cash_flow("SYN0003", "quarter", 6)
+
+    assert [r["date"] for r in income] == [r["date"] for r in balance] == [r["date"] for r in cash]
+    assert income[0]["date"] > income[-1]["date"]
+    assert income[0]["netIncome"] == cash[0]["netIncome"]
+    for row in balance:
+        assert row["totalAssets"] == pytest.approx(row["totalLiabilities"] + row["totalStockholdersEquity"], abs=1)
+
+def test_routes_through_fmp_client(server):
+    """The shared FMP client reads every project route from the server."""
+    ticker = universe(50)[7]
+    assert fmp_get(f"profile/{ticker}", base_url=server.url)[0]["symbol"] == ticker
+    assert len(fmp_get(f"income-statement/{ticker}", {"period": "annual", "limit": 3}, base_url=server.url)) == 3
+    assert fmp_get(f"quote/{ticker}", base_url=server.url)[0]["price"] > 0
+    assert len(fmp_get(f"analyst-estimates/{ticker}", base_url=server.url)) == 5
+
+    rsi = fmp_get(f"technical_indicator/daily/{ticker}", {"type": "rsi", "period": 14}, base_url=server.url)
+    assert list(rsi[0]) == ["date", "open", "high", "low", "close", "volume", "rsi"]
+    assert 0 <= rsi[0]["rsi"] <= 100
+
+    assert len(fmp_get("stock/list", base_url=server.url)) == 50
+
+def test_historical_prices_support_from(server):
+    """Price histories honour ``from`` so incremental syncs fetch only new bars."""
+    since = (date.today() - timedelta(days=10)).isoformat()
+    full = fmp_get("historical-price-full/SYN0004", base_url=server.url)["historical"]
+    recent = fmp_get("historical-price-full/SYN0004", {"from": since}, base_url=server.url)["historical"]
+
+    assert full[0]["date"] >= full[-1]["date"]
+    assert recent == [row for row in full if row["date"] >= since]
+
+def test_data_collection_agent_against_server(server):
+    """The data collection agent runs end to end against the stand-in."""
+    agent = DataCollectionAgent()
+    agent.base_url = server.url
+    data = agent.collect_financial_data("SYN0005")
+
+    assert data["company_profile"]["symbol"] == "SYN0005"
+    assert "error" not in data["income_statement"]
+
+def test_rate_limit_answers_429():
+    """Requests over the configured rate get FMP's 429 with Retry-After."""
+    with MockFMPServer(calls_per_minute=1, burst=1, retry_after=7) as server:
+        assert requests.get(f"{server.url}/quote/SYN0001").status_code == 200
+        response = requests.get(f"{server.url}/quote/SYN0001")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "7"
+        assert "Limit Reach" in response.json()["Error Message"]
+        assert server.stats()["rate_limited"] == 1
+
+def test_unknown_route_is_404(server):
+    response = requests.get(f"{server.url}/not-a-route")
+    assert response.status_code == 404
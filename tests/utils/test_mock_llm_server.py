@@ -0,0 +1,73 @@
+import time
+import random
+import pytest
+import openai
+from openai import OpenAI
+from pydantic import BaseModel, Field
+
+from agents.base_agent import BaseAgent
+from models.research_models import ResearchAnalysis
+from utils.mock_llm_server import MockLLMServer, parse_latency, sample_from_schema
+
+class EchoAgent(BaseAgent):
+    def process(self, input_data):
+        return self._call_llm(input_data)
+
+class Rating(BaseModel):
+    rating: str = Field(description="Buy, hold or sell")
+    target_price: float = Field(description="Price target")
+
+@pytest.fixture
+def server():
+    with MockLLMServer(responses=[{"match": "AAPL", "content": "Apple via {model}: {prompt}"}], seed=1) as server:
+        yield server
+
+def test_parse_latency():
+    """Latency specs produce samplers of the named distribution."""
+    rng = random.Random(0)
+    assert parse_latency("fixed:0.5")(rng) == 0.5
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2
+    assert parse_latency("normal:0,0.001")(rng) >= 0
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1")
+
+def test_sample_from_schema_validates():
+    """Generated payloads validate against nested Pydantic schemas."""
+    analysis = ResearchAnalysis.model_validate(sample_from_schema(ResearchAnalysis.model_json_schema()))
+    assert analysis.competitive_position
+
+def test_agent_completion_uses_templates(server):
+    """BaseAgent talks to the mock server through base_url."""
+    agent = EchoAgent("an analyst", "Echo", base_url=server.url, model_name="mock-model")
+    assert agent.process("Tell me about AAPL") == "Apple via mock-model: Tell me about AAPL"
+    assert agent.process("Anything else") == "Mock response from mock-model."
+    assert server.stats()["completed"] == 2
+
+def test_structured_output_through_instructor(server):
+    """Instructor tool calls are answered with schema-valid arguments."""
+    agent = EchoAgent("an analyst", "Echo", base_url=server.url)
+    result = agent._call_structured_llm("Rate MSFT", Rating)
+    assert isinstance(result, Rating)
+    assert result.rating == "Mock rating"
+
+def test_streaming_at_modeled_throughput():
+    """Streamed completions arrive token by token at the configured rate."""
+    with MockLLMServer(tokens_per_second=200, default_content="one two three four five six seven eight") as server:
+        client = OpenAI(api_key="x", base_url=server.url, max_retries=0)
+        started = time.monotonic()
+        chunks = [c.choices[0].delta.content for c in client.chat.completions.create(
+            model="mock", messages=[{"role": "user", "content": "hi"}], stream=True) if c.choices[0].delta.content]
+        elapsed = time.monotonic() - started
+
+    assert "".join(chunks) == "one two three four five six seven eight"
+    assert len(chunks) > 1
+    assert elapsed >= len(chunks) / 200
+
+def test_rate_limit_responses():
+    """Configured rate limiting answers 429 with Retry-After."""
+    with MockLLMServer(rate_limit_probability=1.0, retry_after=2) as server:
+        client = OpenAI(api_key="x", base_url=server.url, max_retries=0)
+        with pytest.raises(openai.RateLimitError) as excinfo:
+            client.chat.completions.create(model="mock", messages=[{"role": "user", "content": "hi"}])
+        assert excinfo.value.response.headers["Retry-After"] == "2"
+        assert server.stats()["rate_limited"] == 1
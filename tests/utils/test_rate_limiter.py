@@ -0,0 +1,42 @@
+import time
+import pytest
+from utils.rate_limiter import RateLimiter, RateLimitExceeded
+
+def test_calls_block_once_the_burst_is_spent(tmp_path):
+    """After the burst, calls are spaced at the sustained rate."""
+    limiter = RateLimiter(str(tmp_path / "limits.sqlite"), "api", calls_per_minute=1200, burst=2)
+    
+    start = time.time()
+    for _ in range(4):
+        limiter.acquire()
+    elapsed = time.time() - start
+    
+    # Two calls from the burst, then two more at 20 calls/second
+    assert 0.08 <= elapsed < 0.5
+    stats = limiter.stats()
+    assert stats["calls"] == 4
+    assert stats["used_today"] == 4
+    assert stats["waits"] >= 1
+
+def test_limiters_on_the_same_file_share_one_budget(tmp_path):
+    """Separate limiter instances (e.g. worker processes) draw from one bucket."""
+    path = str(tmp_path / "limits.sqlite")
+    first = RateLimiter(path, "api", calls_per_minute=60, burst=1, max_wait=0.1)
+    second = RateLimiter(path, "api", calls_per_minute=60, burst=1, max_wait=0.1)
+    other = RateLimiter(path, "other", calls_per_minute=60, burst=1, max_wait=0.1)
+    
+    first.acquire()
+    other.acquire()
+    with pytest.raises(RateLimitExceeded):
+        second.acquire()
+
+def test_daily_quota(tmp_path):
+    """Calls beyond the daily quota fail instead of blocking until tomorrow."""
+    limiter = RateLimiter(str(tmp_path / "limits.sqlite"), "api", calls_per_minute=6000, burst=10,
+                          daily_quota=3, max_wait=5)
+    for _ in range(3):
+        limiter.acquire()
+    
+    assert limiter.stats()["daily_utilization"] == 1.0
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
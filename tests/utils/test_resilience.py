@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+import requests
+from unittest.mock import MagicMock
+from utils.rate_limiter import RateLimitExceeded
+from utils.resilience import (
+    RetryPolicy, CircuitBreaker, CircuitOpenError, async_call_with_retry, call_with_retry, classify_http
+)
+
+def make_response(status, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    return response
+
+def test_transient_errors_are_retried_with_backoff():
+    """Connection errors are retried until an attempt succeeds."""
+    func = MagicMock(side_effect=[requests.exceptions.ConnectionError("reset"), make_response(502), make_response(200)])
+    delays = []
+    
+    result = call_with_retry(func, classify_http, policy=RetryPolicy(max_attempts=3, base_delay=1, max_delay=10),
+                             sleep=delays.append)
+    
+    assert result.status_code == 200
+    assert func.call_count == 3
+    assert 0 <= delays[0] <= 1 and 0 <= delays[1] <= 2
+
+def test_retry_after_is_honoured_and_capped():
+    """A server-provided Retry-After replaces the computed backoff, up to max_delay."""
+    func = MagicMock(side_effect=[make_response(429, {"Retry-After": "3"}), make_response(503, {"Retry-After": "120"}), make_response(200)])
+    delays = []
+    
+    call_with_retry(func, classify_http, policy=RetryPolicy(max_attempts=3, max_delay=10), sleep=delays.append)
+    
+    assert delays == [3.0, 10]
+
+def test_exhausted_attempts_return_last_response_or_raise():
+    """The final retryable response is returned; the final error is raised."""
+    policy = RetryPolicy(max_attempts=2, base_delay=0)
+    assert call_with_retry(lambda: make_response(503), classify_http, policy=policy, sleep=lambda _: None).status_code == 503
+    
+    with pytest.raises(requests.exceptions.Timeout):
+        call_with_retry(MagicMock(side_effect=requests.exceptions.Timeout()), classify_http, policy=policy, sleep=lambda _: None)
+
+def test_client_errors_are_not_retried():
+    """A 404 is returned immediately."""
+    func = MagicMock(return_value=make_response(404))
+    call_with_retry(func, classify_http, policy=RetryPolicy(max_attempts=3), sleep=lambda _: None)
+    assert func.call_count == 1
+
+def test_deadline_stops_retries():
+    """No retry is started if its wait would pass the deadline."""
+    func = MagicMock(return_value=make_response(503, {"Retry-After": "5"}))
+    call_with_retry(func, classify_http, policy=RetryPolicy(max_attempts=5, deadline=1), sleep=lambda _: None)
+    assert func.call_count == 1
+
+def test_circuit_opens_fails_fast_and_recovers():
+    """Consecutive failures open the circuit until a probe succeeds."""
+    breaker = CircuitBreaker("api.example.com", failure_threshold=2, reset_timeout=0)
+    failing = MagicMock(side_effect=requests.exceptions.ConnectionError("down"))
+    policy = RetryPolicy(max_attempts=1)
+    
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            call_with_retry(failing, classify_http, policy=policy, breaker=breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    
+    breaker.reset_timeout = 60
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(failing, classify_http, policy=policy, breaker=breaker)
+    assert failing.call_count == 2
+    
+    breaker.reset_timeout = 0
+    call_with_retry(lambda: make_response(200), classify_http, policy=policy, breaker=breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_throttling_does_not_trip_the_breaker():
+    """429 responses are retried but do not count as failures."""
+    breaker = CircuitBreaker("api.example.com", failure_threshold=1)
+    call_with_retry(lambda: make_response(429), classify_http, policy=RetryPolicy(max_attempts=2, base_delay=0),
+                    breaker=breaker, sleep=lambda _: None)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_local_rate_limit_is_not_reported_to_the_breaker():
+    """An attempt refused by our own limiter neither closes a half-open circuit nor blocks the next probe."""
+    breaker = CircuitBreaker("api.example.com", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    policy = RetryPolicy(max_attempts=1)
+    
+    with pytest.raises(RateLimitExceeded):
+        call_with_retry(MagicMock(side_effect=RateLimitExceeded("daily quota")), classify_http, policy=policy, breaker=breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    
+    with pytest.raises(requests.exceptions.ConnectionError):
+        call_with_retry(MagicMock(side_effect=requests.exceptions.ConnectionError("down")), classify_http,
+                        policy=policy, breaker=breaker)
+    assert breaker.state == CircuitBreaker.OPEN and breaker.failures == 2
+
+def test_async_retry_awaits_backoff():
+    """The async variant retries the same outcomes and awaits its backoff."""
+    outcomes = [requests.exceptions.ConnectionError("reset"), make_response(503), make_response(200)]
+    delays = []
+    
+    async def attempt():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    
+    async def sleep(delay):
+        delays.append(delay)
+    
+    breaker = CircuitBreaker("api", failure_threshold=5)
+    result = asyncio.run(async_call_with_retry(attempt, classify_http, policy=RetryPolicy(max_attempts=3, base_delay=1),
+                                               breaker=breaker, sleep=sleep))
+    
+    assert result.status_code == 200
+    assert len(delays) == 2
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,35 @@
+import threading
+import pytest
+from utils.singleflight import SingleFlight
+
+def test_waiters_share_the_leaders_result_and_error():
+    """Only the first caller runs; later callers get its outcome."""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    outcomes = []
+    
+    def leader_call():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+    
+    leader = threading.Thread(target=lambda: outcomes.append(flight.do("k", leader_call)))
+    leader.start()
+    while not flight.in_flight():
+        pass
+    follower = threading.Thread(target=lambda: outcomes.append(flight.do("k", lambda: calls.append(2) or "other")))
+    follower.start()
+    while flight.waiting("k") == 0:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+    
+    assert calls == [1]
+    assert sorted(outcomes) == [("value", False), ("value", True)]
+    assert flight.in_flight() == 0
+    
+    with pytest.raises(ValueError):
+        flight.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flight.do("k", lambda: "fresh") == ("fresh", False)
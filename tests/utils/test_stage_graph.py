@@ -0,0 +1,92 @@
+import time
+import pytest
+from utils.stage_graph import StageGraph
+
+def test_stages_receive_their_inputs():
+    """Each stage is called with the results of the stages it declares."""
+    graph = StageGraph()
+    graph.add_stage("a", lambda: 2)
+    graph.add_stage("b", lambda a: a * 10, inputs=["a"])
+    graph.add_stage("c", lambda a, b: a + b, inputs=["a", "b"])
+    
+    results = graph.run()
+    
+    assert results == {"a": 2, "b": 20, "c": 22}
+    assert set(graph.timings) == {"a", "b", "c"}
+    assert graph.timings["c"]["start"] >= graph.timings["b"]["start"]
+
+def test_independent_stages_run_in_parallel():
+    """Siblings that share a parent overlap in time."""
+    graph = StageGraph()
+    graph.add_stage("plan", lambda: "plan")
+    graph.add_stage("left", lambda plan: time.sleep(0.2) or "left", inputs=["plan"])
+    graph.add_stage("right", lambda plan: time.sleep(0.2) or "right", inputs=["plan"])
+    graph.add_stage("join", lambda left, right: left + right, inputs=["left", "right"])
+    
+    start = time.time()
+    results = graph.run()
+    
+    assert results["join"] == "leftright"
+    assert time.time() - start < 0.35
+
+def test_stage_error_propagates():
+    """A failing stage stops the run and re-raises."""
+    graph = StageGraph()
+    graph.add_stage("a", lambda: 1 / 0)
+    graph.add_stage("b", lambda a: a, inputs=["a"])
+    
+    with pytest.raises(ZeroDivisionError):
+        graph.run()
+
+def test_invalid_graphs_are_rejected():
+    """Unknown inputs and cycles are reported before anything runs."""
+    graph = StageGraph()
+    graph.add_stage("a", lambda missing: missing, inputs=["missing"])
+    with pytest.raises(ValueError, match="unknown stage"):
+        graph.run()
+    
+    graph = StageGraph()
+    graph.add_stage("a", lambda b: b, inputs=["b"])
+    graph.add_stage("b", lambda a: a, inputs=["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        graph.run()
+
+def test_completed_stages_are_skipped_and_new_results_reported():
+    """Stages passed in as completed are not run; finished stages are reported."""
+    calls = []
+    graph = StageGraph()
+    graph.add_stage("a", lambda: calls.append("a") or 1)
+    graph.add_stage("b", lambda a: calls.append("b") or a + 1, inputs=["a"])
+    
+    finished = {}
+    results = graph.run(completed={"a": 5}, on_complete=lambda name, result: finished.update({name: result}))
+    
+    assert calls == ["b"]
+    assert results == {"a": 5, "b": 6}
+    assert finished == {"b": 6}
+    assert "a" not in graph.timings
+
+def test_stage_error_waits_for_running_siblings():
+    """Siblings already running finish and are reported before the error is raised."""
+    graph = StageGraph()
+    graph.add_stage("plan", lambda: "plan")
+    graph.add_stage("broken", lambda plan: 1 / 0, inputs=["plan"])
+    graph.add_stage("slow", lambda plan: time.sleep(0.2) or "slow", inputs=["plan"])
+    graph.add_stage("join", lambda broken, slow: "join", inputs=["broken", "slow"])
+    
+    finished = {}
+    with pytest.raises(ZeroDivisionError):
+        graph.run(on_complete=lambda name, result: finished.update({name: result}))
+    
+    assert finished == {"plan": "plan", "slow": "slow"}
+
+def test_prune_completed_drops_stages_downstream_of_missing_ones():
+    """A result built on a stage that must run again is not reused."""
+    graph = StageGraph()
+    graph.add_stage("a", lambda: 1)
+    graph.add_stage("b", lambda a: a, inputs=["a"])
+    graph.add_stage("c", lambda a: a, inputs=["a"])
+    graph.add_stage("d", lambda b, c: b + c, inputs=["b", "c"])
+    
+    assert graph.prune_completed({"a": 1, "c": 1, "d": 2}) == {"a": 1, "c": 1}
+    assert graph.prune_completed({"b": 1, "c": 1}) == {}
@@ -1,6 +1,7 @@
 import json
 import os
 from datetime import datetime
+from tools.price_store import PriceSeries
 
 class ChartGenerator:
     """Tool for generating interactive financial charts using HTML Canvas."""
@@ -15,7 +16,8 @@ class ChartGenerator:
         Generate an interactive candlestick chart using HTML Canvas.
         
         Args:
-            price_data (dict/DataFrame): OHLCV data
+            price_data (dict/list/PriceSeries): OHLCV rows, ``{"raw_data": rows}``, or
+                price store arrays (read column-wise without building row dicts)
             ticker (str): Stock ticker symbol
             title (str, optional): Chart title
             template (str): Chart theme ("dark" or "light")
@@ -37,6 +39,12 @@ class ChartGenerator:
             'volume': [],
         }
         
+        if isinstance(price_data, PriceSeries):
+            chart_data['dates'] = price_data.date_strings().tolist()
+            for column in ['open', 'high', 'low', 'close', 'volume']:
+                chart_data[column] = price_data[column].tolist()
+            price_data = []
+        
         for item in price_data:
             if isinstance(item.get('date'), str):
                 chart_data['dates'].append(item['date'])
@@ -177,7 +185,7 @@ class ChartGenerator:
                     if (i < period - 1) {{
                         mas.push(null);
                         continue;
-                    }
+                    }}
                     
                     let sum = 0;
                     for (let j = 0; j < period; j++) {{
@@ -287,7 +295,7 @@ class ChartGenerator:
             // Event handlers
             function setTimeframe(period) {{
                 // Implement timeframe changes
-                console.log(`Setting timeframe to ${period}`);
+                console.log(`Setting timeframe to ${{period}}`);
                 drawChart();
             }}
             
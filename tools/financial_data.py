@@ -8,6 +8,8 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+from utils.http import http_get
+
 logger = logging.getLogger("Financial_Data_Tool")
 
 class FinancialDataTool:
@@ -18,7 +20,7 @@ class FinancialDataTool:
         self.api_key = os.getenv('FMP_API_KEY')
         if not self.api_key:
             logger.warning("FMP_API_KEY not found in environment variables")
-        self.base_url = "https://financialmodelingprep.com/api/v3"
+        self.base_url = os.getenv('FMP_BASE_URL', "https://financialmodelingprep.com/api/v3")
         
     def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -40,7 +42,7 @@ class FinancialDataTool:
         url = f"{self.base_url}/{endpoint}"
         
         try:
-            response = requests.get(url, params=params)
+            response = http_get(url, params=params)
             response.raise_for_status()  # Raise exception for 4XX/5XX responses
             return response.json()
         except requests.exceptions.HTTPError as e:
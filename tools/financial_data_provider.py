@@ -8,7 +8,10 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-from config import FMP_API_KEY, FMP_BASE_URL
+from config import FMP_API_KEY, FMP_BASE_URL, TECHNICAL_INDICATOR_SOURCE
+from tools.fmp_client import fmp_get
+from tools.price_store import PriceSeries, get_price_store
+from tools import technical_indicators
 
 logger = logging.getLogger("Financial_Data_Provider")
 
@@ -33,18 +36,11 @@ class FinancialDataProvider:
         Returns:
             dict: Response data
         """
-        if params is None:
-            params = {}
-        
-        # Add API key to parameters
-        params['apikey'] = self.api_key
-        
         url = f"{self.base_url}/{endpoint}"
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()  # Raise exception for 4XX/5XX responses
-            return response.json()
+            # Shared client adds the API key and serves fresh responses from the on-disk cache
+            return fmp_get(endpoint, params, api_key=self.api_key, base_url=self.base_url)
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP error when calling {url}: {str(e)}")
             return {"error": str(e)}
@@ -55,6 +51,31 @@ class FinancialDataProvider:
             logger.error(f"Failed to decode JSON response from {url}")
             return {"error": "Invalid JSON response"}
 
+    def _get_price_history(self, ticker: str, timeseries: int) -> Dict[str, Any]:
+        """
+        Get the newest ``timeseries`` daily bars, from the incrementally synced price store when enabled.
+        
+        Args:
+            ticker (str): Company ticker symbol
+            timeseries (int): Number of trading days
+            
+        Returns:
+            PriceSeries or dict: Memory-mapped views of the stored bars; with the store
+            disabled, the FMP response ``{"historical": rows}`` newest first; ``{"error": ...}``
+            on failure
+        """
+        store = get_price_store()
+        if store is None:
+            return self._make_request(f"historical-price-full/{ticker}", {
+                "timeseries": timeseries
+            })
+        
+        try:
+            return store.sync(ticker, api_key=self.api_key, base_url=self.base_url).tail(timeseries)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request error when syncing prices for {ticker}: {str(e)}")
+            return {"error": str(e)}
+
     def get_company_profile(self, ticker: str) -> List[Dict[str, Any]]:
         """
         Get company profile information.
@@ -163,16 +184,16 @@ class FinancialDataProvider:
         Returns:
             dict: Historical stock price data
         """
-        # Get historical daily prices
-        historical_data = self._make_request(f"historical-price-full/{ticker}", {
-            "timeseries": timeseries
-        })
+        # Get historical daily prices; rows are only built for the window returned here
+        historical = self._get_price_history(ticker, timeseries)
+        if isinstance(historical, PriceSeries):
+            historical = {"historical": historical.to_historical()}
         
         # Get current quote
         quote_data = self._make_request(f"quote/{ticker}")
         
         return {
-            "historical": historical_data.get("historical", []),
+            "historical": historical.get("historical", []),
             "current_quote": quote_data[0] if isinstance(quote_data, list) and len(quote_data) > 0 else {}
         }
     
@@ -193,21 +214,40 @@ class FinancialDataProvider:
             "limit": limit
         })
         
-    def get_technical_indicators(self, ticker: str, indicator: str, time_period: int = 14) -> Dict[str, Any]:
+    def get_technical_indicators(self, ticker: str, indicator: str, time_period: int = 14, timeseries: int = 365) -> Dict[str, Any]:
         """
         Get technical indicators for a stock.
         
+        Locally supported indicators are computed from the daily price history
+        shared with ``get_stock_price``; others use the FMP indicator endpoint.
+        
         Args:
             ticker (str): Company ticker symbol
             indicator (str): Technical indicator type (e.g., 'rsi', 'sma', 'ema')
             time_period (int): Time period for indicator calculation
+            timeseries (int): Days of price history to compute from
             
         Returns:
             dict: Technical indicator data
         """
-        # Technical indicators endpoint requires different URL structure
         indicator = indicator.lower()
         
+        # Compute from the (cached) daily price history instead of one request per indicator
+        if TECHNICAL_INDICATOR_SOURCE == "local" and technical_indicators.is_supported(indicator):
+            history = self._get_price_history(ticker, timeseries)
+            if isinstance(history, PriceSeries):
+                # Stored bars are framed straight from the mapped columns
+                prices = history.to_frame()
+            elif "error" in history:
+                return history
+            else:
+                prices = technical_indicators.historical_to_frame(history.get("historical", []))
+            return technical_indicators.indicator_frame_to_records(
+                technical_indicators.compute_indicator_frame(prices, indicator, time_period)
+            )
+        
+        # Technical indicators endpoint requires different URL structure
+        
         # Map indicator names to endpoints
         indicator_endpoints = {
             "sma": "technical_indicator/daily/sma",
@@ -0,0 +1,375 @@
+import copy
+import threading
+import logging
+from contextlib import closing, contextmanager
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, Any, Iterator, Optional
+from urllib.parse import urlencode
+import requests
+
+from config import (
+    FMP_API_KEY, FMP_BASE_URL, FMP_CACHE_ENABLED, FMP_CACHE_PATH,
+    FMP_QUOTE_TTL, FMP_PROFILE_TTL, FMP_STATEMENT_OVERDUE_TTL,
+    FMP_RATE_LIMIT_ENABLED, FMP_CALLS_PER_MINUTE, FMP_RATE_LIMIT_BURST,
+    FMP_DAILY_QUOTA, FMP_RATE_LIMIT_MAX_WAIT, FMP_RATE_LIMIT_PATH, FMP_SCOPE_MAX_ENTRIES,
+    FMP_STREAM_CHUNK_SIZE
+)
+from utils.cache import SQLiteCache, LRUCache
+from utils.http import http_get
+from utils.rate_limiter import RateLimiter
+from utils.cassette import is_recording, is_replaying
+from utils.json_stream import iter_array
+from utils.resilience import parse_retry_after
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger("FMP_Client")
+
+# Endpoint classes, keyed by the first segment of the endpoint path
+STATEMENT_ENDPOINTS = {"income-statement", "balance-sheet-statement", "cash-flow-statement", "key-metrics", "ratios"}
+PRICE_ENDPOINTS = {"historical-price-full", "technical_indicator", "technical-indicator"}
+DAILY_ENDPOINTS = {"profile", "analyst-estimates"}
+QUOTE_ENDPOINTS = {"quote"}
+
+# Typical gap between a period end and its filing (10-K / 10-Q deadlines)
+FILING_LAG = {"annual": timedelta(days=90), "quarter": timedelta(days=45)}
+PERIOD_LENGTH = {"annual": timedelta(days=365), "quarter": timedelta(days=91)}
+
+# Back-off applied to every worker when FMP answers 429 without a Retry-After header
+RATE_LIMITED_BACKOFF = 10.0
+
+_response_cache: Optional[SQLiteCache] = None
+_rate_limiter: Optional[RateLimiter] = None
+_cache_lock = threading.Lock()
+
+# Identical concurrent requests share one HTTP call
+_in_flight = SingleFlight()
+
+# Responses memoized for the duration of the outermost request_scope()
+_scope_memo: Optional[LRUCache] = None
+_scope_depth = 0
+
+def get_response_cache() -> Optional[SQLiteCache]:
+    """
+    Get the process-wide FMP response cache.
+
+    Returns:
+        SQLiteCache: The shared cache, or None when caching is disabled
+    """
+    global _response_cache
+    if not FMP_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        with _cache_lock:
+            if _response_cache is None:
+                _response_cache = SQLiteCache(FMP_CACHE_PATH, table="fmp_responses")
+    return _response_cache
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Get the FMP rate limiter shared with every other process using the same state file.
+
+    Returns:
+        RateLimiter: The shared limiter, or None when rate limiting is disabled
+    """
+    global _rate_limiter
+    if not FMP_RATE_LIMIT_ENABLED:
+        return None
+    if _rate_limiter is None:
+        with _cache_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(
+                    FMP_RATE_LIMIT_PATH, "fmp",
+                    calls_per_minute=FMP_CALLS_PER_MINUTE,
+                    burst=FMP_RATE_LIMIT_BURST,
+                    daily_quota=FMP_DAILY_QUOTA,
+                    max_wait=FMP_RATE_LIMIT_MAX_WAIT
+                )
+    return _rate_limiter
+
+@contextmanager
+def request_scope():
+    """
+    Reuse every FMP response for the duration of a run or batch.
+
+    Inside the scope, repeated requests for the same endpoint and parameters
+    are answered from memory, including responses the persistent cache does
+    not keep (empty results, or everything when the cache is disabled).
+    Quotes still expire after FMP_QUOTE_TTL. Scopes nest: inner scopes share
+    the outermost one's memo, which is dropped when it exits.
+    """
+    global _scope_memo, _scope_depth
+    with _cache_lock:
+        if _scope_depth == 0:
+            _scope_memo = LRUCache(max_entries=FMP_SCOPE_MAX_ENTRIES)
+        _scope_depth += 1
+    try:
+        yield
+    finally:
+        with _cache_lock:
+            _scope_depth -= 1
+            if _scope_depth == 0:
+                _scope_memo = None
+
+def make_cache_key(base_url: str, endpoint: str, params: Dict[str, Any] = None) -> str:
+    """
+    Build a cache key from the endpoint and its normalized query parameters.
+
+    The API key is excluded so entries survive key rotation and are shared
+    between callers using different keys.
+    """
+    normalized = sorted(
+        (str(k), str(v)) for k, v in (params or {}).items()
+        if v is not None and str(k).lower() != "apikey"
+    )
+    key = f"{base_url.rstrip('/')}/{endpoint.strip('/')}"
+    return f"{key}?{urlencode(normalized)}" if normalized else key
+
+def _endpoint_class(endpoint: str) -> str:
+    """Return the first path segment, which identifies the FMP endpoint family."""
+    return endpoint.strip("/").split("/")[0]
+
+def _parse_date(value: Any) -> Optional[date]:
+    """Parse the date part of an FMP date/datetime string."""
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+def seconds_until_next_close(now: Optional[datetime] = None) -> float:
+    """
+    Seconds until the next US market close (16:00 New York time, weekdays).
+
+    Args:
+        now (datetime, optional): Reference time, defaults to the current time
+
+    Returns:
+        float: Seconds until the next close
+    """
+    try:
+        from zoneinfo import ZoneInfo
+        market_tz = ZoneInfo("America/New_York")
+    except Exception:
+        # No tz database available; 21:00 UTC is the close outside daylight saving
+        market_tz = timezone(timedelta(hours=-5))
+
+    now = now or datetime.now(timezone.utc)
+    local_now = now.astimezone(market_tz)
+    close = local_now.replace(hour=16, minute=0, second=0, microsecond=0)
+    if close <= local_now:
+        close += timedelta(days=1)
+    while close.weekday() >= 5:
+        close += timedelta(days=1)
+
+    return (close - local_now).total_seconds()
+
+def seconds_until_next_filing(data: Any, period: str, now: Optional[datetime] = None) -> float:
+    """
+    Estimate how long statement data stays current.
+
+    The next filing is expected one period plus the filing lag after the
+    latest period end. Once that date has passed, entries are rechecked every
+    ``FMP_STATEMENT_OVERDUE_TTL`` seconds until the new filing shows up.
+
+    Args:
+        data (list): Statement rows as returned by FMP
+        period (str): 'annual' or 'quarter'
+        now (datetime, optional): Reference time, defaults to the current time
+
+    Returns:
+        float: Seconds the response can be cached for
+    """
+    period = period if period in PERIOD_LENGTH else "annual"
+    dates = [_parse_date(row.get("date")) for row in data if isinstance(row, dict)]
+    dates = [d for d in dates if d is not None]
+    if not dates:
+        return FMP_STATEMENT_OVERDUE_TTL
+
+    now = now or datetime.now(timezone.utc)
+    latest = datetime.combine(max(dates), datetime.min.time(), tzinfo=timezone.utc)
+    next_filing = latest + PERIOD_LENGTH[period] + FILING_LAG[period]
+    return max((next_filing - now).total_seconds(), FMP_STATEMENT_OVERDUE_TTL)
+
+def _is_error_payload(data: Any) -> bool:
+    """Check for FMP's in-band error responses."""
+    return isinstance(data, dict) and ("Error Message" in data or "error" in data)
+
+def response_ttl(endpoint: str, params: Dict[str, Any], data: Any) -> Optional[float]:
+    """
+    Decide how long a response may be cached.
+
+    Args:
+        endpoint (str): FMP endpoint path
+        params (dict): Query parameters used for the request
+        data: Decoded response body
+
+    Returns:
+        float: TTL in seconds, or None if the response must not be cached
+    """
+    # Never cache empty bodies or FMP's in-band error payloads
+    if not data or _is_error_payload(data):
+        return None
+
+    endpoint_class = _endpoint_class(endpoint)
+    if endpoint_class in QUOTE_ENDPOINTS:
+        return FMP_QUOTE_TTL
+    if endpoint_class in DAILY_ENDPOINTS:
+        return FMP_PROFILE_TTL
+    if endpoint_class in PRICE_ENDPOINTS:
+        return seconds_until_next_close()
+    if endpoint_class in STATEMENT_ENDPOINTS and isinstance(data, list):
+        return seconds_until_next_filing(data, (params or {}).get("period", "annual"))
+    return None
+
+def fmp_get(endpoint: str, params: Dict[str, Any] = None, api_key: str = None, base_url: str = None) -> Any:
+    """
+    GET an FMP endpoint, serving it from the response cache when possible.
+
+    Cache misses go through the shared rate limiter, which blocks until the
+    plan's per-minute and daily budget admits the call. Concurrent requests for
+    the same endpoint and parameters share a single call, and inside a
+    ``request_scope()`` repeated requests are answered from memory.
+
+    Args:
+        endpoint (str): Endpoint path relative to the API base URL (e.g. 'profile/AAPL')
+        params (dict, optional): Query parameters, without the API key
+        api_key (str, optional): API key, defaults to FMP_API_KEY
+        base_url (str, optional): API base URL, defaults to FMP_BASE_URL
+
+    Returns:
+        The decoded JSON response
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails or the
+            daily quota is exhausted (RateLimitExceeded)
+    """
+    base_url = base_url or FMP_BASE_URL
+    params = dict(params or {})
+    key = make_cache_key(base_url, endpoint, params)
+
+    # Recordings must capture every request, not just the ones missing from memory
+    memo = None if is_recording() else _scope_memo
+    if memo is not None:
+        memoized = memo.get(key)
+        if memoized is not None:
+            logger.debug(f"Request scope hit for {key}")
+            return copy.deepcopy(memoized)
+
+    data, shared = _in_flight.do(key, lambda: _fetch(endpoint, params, key, api_key, base_url))
+    if shared:
+        logger.debug(f"Coalesced request for {key}")
+        # Each caller gets its own copy; callers are free to modify the data
+        return copy.deepcopy(data)
+
+    if memo is not None and data is not None and not _is_error_payload(data):
+        ttl = FMP_QUOTE_TTL if _endpoint_class(endpoint) in QUOTE_ENDPOINTS else None
+        memo.set(key, copy.deepcopy(data), ttl)
+    return data
+
+def _statement_limit(endpoint: str, params: Dict[str, Any]) -> Optional[int]:
+    """Return the row limit of a statement request, or None if it is not range-cacheable."""
+    if _endpoint_class(endpoint) not in STATEMENT_ENDPOINTS or params.get("limit") is None:
+        return None
+    try:
+        return int(params["limit"])
+    except (TypeError, ValueError):
+        return None
+
+def statement_range_key(base_url: str, endpoint: str, params: Dict[str, Any]) -> str:
+    """Cache key shared by every ``limit`` of the same statement request."""
+    return make_cache_key(base_url, endpoint, {k: v for k, v in params.items() if k != "limit"}) + "#rows"
+
+def _cached_statement_rows(cache: SQLiteCache, range_key: str, limit: int) -> Optional[list]:
+    """
+    Answer a statement request from the rows cached for any limit that covers it.
+
+    Statements are newest first, so the first ``limit`` rows of a larger
+    request are exactly the response to the smaller one. A cached response
+    with fewer rows than its own limit holds the company's full history and
+    covers every limit.
+    """
+    entry = cache.get(range_key)
+    if entry is None:
+        return None
+    rows = entry["rows"]
+    if entry["limit"] >= limit or len(rows) < entry["limit"]:
+        return rows[:limit]
+    return None
+
+def _request(endpoint: str, params: Dict[str, Any], api_key: Optional[str], base_url: str, **kwargs) -> requests.Response:
+    """Call the API under the shared rate limit; raises on HTTP errors."""
+    # Replayed responses never reach FMP, so they do not spend the budget
+    limiter = None if is_replaying() else get_rate_limiter()
+
+    def penalize(response: requests.Response) -> None:
+        if response.status_code == 429:
+            limiter.penalize(parse_retry_after(response.headers) or RATE_LIMITED_BACKOFF)
+
+    # Every attempt, retries included, takes a token, so pushback from FMP slows the whole process
+    if limiter is not None:
+        kwargs.update(before_attempt=limiter.acquire, after_attempt=penalize)
+    response = http_get(f"{base_url}/{endpoint}", params={**params, "apikey": api_key or FMP_API_KEY}, **kwargs)
+    try:
+        response.raise_for_status()
+    except requests.exceptions.HTTPError:
+        response.close()
+        raise
+    return response
+
+def fmp_iter(endpoint: str, params: Dict[str, Any] = None, array_key: str = None,
+             api_key: str = None, base_url: str = None) -> Iterator[Any]:
+    """
+    Stream the elements of an FMP array response as they are parsed.
+
+    The body is read in FMP_STREAM_CHUNK_SIZE chunks and never held in memory
+    as a whole, so large payloads (e.g. a full ``historical-price-full``
+    history) cost one element at a time instead of the whole object tree.
+    Responses are not cached or coalesced; callers keep what they need.
+
+    Args:
+        endpoint (str): Endpoint path relative to the API base URL
+        params (dict, optional): Query parameters, without the API key
+        array_key (str, optional): Key of the array in a top-level object
+            (e.g. "historical"); None for endpoints returning a bare array
+        api_key (str, optional): API key, defaults to FMP_API_KEY
+        base_url (str, optional): API base URL, defaults to FMP_BASE_URL
+
+    Yields:
+        Each element of the array
+
+    Raises:
+        requests.exceptions.RequestException: If the request or the transfer fails,
+            or the body is malformed or truncated (``InvalidJSONError``)
+    """
+    response = _request(endpoint, dict(params or {}), api_key, base_url or FMP_BASE_URL, stream=True)
+    with closing(response):
+        try:
+            yield from iter_array(response.iter_content(FMP_STREAM_CHUNK_SIZE), array_key)
+        except ValueError as e:
+            # Surface bad bodies like any other failed request, so callers handle one exception type
+            raise requests.exceptions.InvalidJSONError(f"Invalid JSON from {endpoint}: {str(e)}", response=response) from e
+
+def _fetch(endpoint: str, params: Dict[str, Any], key: str, api_key: Optional[str], base_url: str) -> Any:
+    """Serve a request from the response cache or the API, caching what may be reused."""
+    cache = None if is_recording() else get_response_cache()
+    limit = _statement_limit(endpoint, params)
+    range_key = statement_range_key(base_url, endpoint, params) if limit is not None else None
+
+    if cache is not None:
+        cached = _cached_statement_rows(cache, range_key, limit) if range_key else cache.get(key)
+        if cached is not None:
+            logger.debug(f"Cache hit for {key}")
+            return cached
+
+    data = _request(endpoint, params, api_key, base_url).json()
+
+    if cache is not None:
+        ttl = response_ttl(endpoint, params, data)
+        if ttl and range_key:
+            # Keep the widest response; a concurrent larger request may have stored it already
+            current = cache.get(range_key)
+            if current is None or current["limit"] < limit:
+                cache.set(range_key, {"limit": limit, "rows": data}, ttl)
+        elif ttl:
+            cache.set(key, data, ttl)
+
+    return data
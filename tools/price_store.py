@@ -0,0 +1,365 @@
+import os
+import json
+import time
+import shutil
+import threading
+import logging
+from array import array
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import PRICE_STORE_ENABLED, PRICE_STORE_DIR, PRICE_STORE_DTYPE
+from tools.fmp_client import fmp_iter, seconds_until_next_close
+from utils.cassette import get_cassette
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads are still serialized, processes are not
+    fcntl = None
+
+logger = logging.getLogger("Price_Store")
+
+# Numeric fields of FMP daily bars kept in the store, one column file each, in FMP's order
+PRICE_COLUMNS = [
+    "open", "high", "low", "close", "adjClose", "volume", "unadjustedVolume",
+    "change", "changePercent", "vwap", "changeOverTime"
+]
+
+# FMP's display label for a bar, e.g. "January 03, 24"
+LABEL_FORMAT = "%B %d, %y"
+
+EPOCH = np.datetime64("1970-01-01", "D")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def day_number(value: Any) -> int:
+    """Days since 1970-01-01 for a date, datetime or ISO date string, as stored in ``dates``."""
+    return date.fromisoformat(str(value)[:10]).toordinal() - _EPOCH_ORDINAL
+
+class PriceSeries:
+    """
+    Daily bars of one ticker, oldest first, backed by memory-mapped column files.
+
+    ``dates`` holds days since 1970-01-01 as int32; every other column is a
+    contiguous float array (``PRICE_STORE_DTYPE``) of the same length. Arrays
+    read from the store are read-only views of the mapped files, so processes
+    reading the same ticker share pages through the OS cache, and slicing
+    (``tail``, ``between``) never copies.
+    """
+
+    def __init__(self, ticker: str, dates: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.ticker = ticker
+        self.dates = dates
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @property
+    def last_date(self) -> Optional[date]:
+        """Date of the newest bar, the store's high-water mark."""
+        if not len(self.dates):
+            return None
+        return (EPOCH + int(self.dates[-1])).astype(date)
+
+    def tail(self, n: int) -> "PriceSeries":
+        """The newest ``n`` bars, as views."""
+        start = max(0, len(self.dates) - max(0, n))
+        return PriceSeries(self.ticker, self.dates[start:], {k: v[start:] for k, v in self.columns.items()})
+
+    def between(self, start: Any = None, end: Any = None) -> "PriceSeries":
+        """
+        Bars dated from ``start`` to ``end`` inclusive, as views.
+
+        Args:
+            start (date or str, optional): First date; None starts at the oldest bar
+            end (date or str, optional): Last date; None ends at the newest bar
+        """
+        lo = int(np.searchsorted(self.dates, day_number(start), side="left")) if start is not None else 0
+        hi = int(np.searchsorted(self.dates, day_number(end), side="right")) if end is not None else len(self.dates)
+        return PriceSeries(self.ticker, self.dates[lo:hi], {k: v[lo:hi] for k, v in self.columns.items()})
+
+    def date_strings(self) -> np.ndarray:
+        """Dates as ``YYYY-MM-DD`` strings, oldest first."""
+        return (EPOCH + self.dates.astype("int64")).astype(str)
+
+    def datetimes(self) -> np.ndarray:
+        """Dates as ``datetime64[D]`` values, oldest first."""
+        return EPOCH + self.dates.astype("int64")
+
+    def to_frame(self) -> pd.DataFrame:
+        """Ascending frame indexed by date, as produced by ``historical_to_frame``."""
+        index = pd.DatetimeIndex(self.datetimes().astype("datetime64[ns]"), name="date")
+        return pd.DataFrame({k: np.asarray(v) for k, v in self.columns.items()}, index=index, copy=False)
+
+    def to_historical(self) -> List[Dict[str, Any]]:
+        """
+        FMP-style ``historical`` rows, newest first, with the fields of the API response.
+
+        This builds one dict per bar; slice the series first (``tail``, ``between``)
+        and use the arrays or ``to_frame`` for anything that does not need rows.
+        """
+        days = self.date_strings()[::-1]
+        labels = pd.DatetimeIndex(days).strftime(LABEL_FORMAT)
+        values = {k: v[::-1].tolist() for k, v in self.columns.items()}
+        rows = []
+        for i, day in enumerate(days):
+            row = {"date": day}
+            for column, column_values in values.items():
+                if column == "changeOverTime":
+                    row["label"] = labels[i]
+                value = column_values[i]
+                row[column] = None if value != value else value
+            rows.append(row)
+        return rows
+
+    @classmethod
+    def from_historical(cls, ticker: str, historical: Iterable[Dict[str, Any]]) -> "PriceSeries":
+        """
+        Build an in-memory series from FMP ``historical`` rows in any order.
+
+        Rows are consumed one at a time into typed column buffers, so a
+        streamed response (``fmp_iter``) never exists as a list of dicts.
+        For repeated dates the last row wins.
+        """
+        dates = array("i")
+        buffers = {column: array("d") for column in PRICE_COLUMNS}
+        for row in historical:
+            if not isinstance(row, dict) or not row.get("date"):
+                continue
+            dates.append(day_number(row["date"]))
+            for column, buffer in buffers.items():
+                value = row.get(column)
+                buffer.append(np.nan if value is None else float(value))
+
+        days = np.array(dates, dtype=np.int32)
+        order = np.argsort(days, kind="stable")
+        days = days[order]
+        keep = np.append(days[1:] != days[:-1], True) if len(days) else np.ones(0, dtype=bool)
+        columns = {column: np.array(buffer, dtype=np.float64)[order][keep] for column, buffer in buffers.items()}
+        return cls(ticker, days[keep], columns)
+
+    def append(self, other: "PriceSeries") -> "PriceSeries":
+        """A new in-memory series with ``other``'s bars after this one's."""
+        return PriceSeries(
+            self.ticker,
+            np.concatenate([self.dates, other.dates]),
+            {k: np.concatenate([v, other.columns[k]]) for k, v in self.columns.items()}
+        )
+
+class PriceStore:
+    """
+    Per-ticker store of daily bars with incremental sync from FMP.
+
+    Each ticker has a directory of versions; a version holds one ``.npy`` file
+    per column. New data is written to a fresh version and published by
+    atomically replacing the ``CURRENT`` pointer, so readers never observe a
+    partially written series. Syncing fetches only bars after the newest
+    stored date (FMP's ``from`` parameter) and appends them.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the store.
+
+        Args:
+            root (str): Directory holding one subdirectory per ticker
+        """
+        self.root = root
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _ticker_dir(self, ticker: str) -> str:
+        return os.path.join(self.root, ticker.upper())
+
+    @contextmanager
+    def _locked(self, ticker: str):
+        """Serialize writers of a ticker across threads and, where supported, processes."""
+        with self._locks_guard:
+            lock = self._locks.setdefault(ticker.upper(), threading.Lock())
+        with lock:
+            ticker_dir = self._ticker_dir(ticker)
+            os.makedirs(ticker_dir, exist_ok=True)
+            with open(os.path.join(ticker_dir, ".lock"), "w") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def _read_json(self, path: str) -> Dict[str, Any]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json(self, path: str, data: Dict[str, Any]) -> None:
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(f"{path}.tmp", path)
+
+    def load(self, ticker: str) -> Optional[PriceSeries]:
+        """
+        Map a ticker's stored bars without reading them into memory.
+
+        Args:
+            ticker (str): Company ticker symbol
+
+        Returns:
+            PriceSeries: Read-only memory-mapped series, or None if nothing is stored
+        """
+        ticker_dir = self._ticker_dir(ticker)
+        # A concurrent sync may replace the version between reading CURRENT and mapping it
+        for _ in range(2):
+            version = self._read_json(os.path.join(ticker_dir, "CURRENT")).get("version")
+            if version is None:
+                return None
+
+            version_dir = os.path.join(ticker_dir, version)
+            try:
+                dates = np.load(os.path.join(version_dir, "date.npy"), mmap_mode="r")
+                columns = {
+                    column: np.load(os.path.join(version_dir, f"{column}.npy"), mmap_mode="r")
+                    for column in PRICE_COLUMNS
+                }
+                return PriceSeries(ticker.upper(), dates, columns)
+            except (OSError, ValueError) as e:
+                error = e
+        logger.warning(f"Price store for {ticker} is unreadable: {str(error)}")
+        return None
+
+    def view(self, ticker: str, start: Any = None, end: Any = None) -> Optional[PriceSeries]:
+        """
+        Zero-copy views of a ticker's stored bars between two dates.
+
+        Nothing is fetched; call ``sync`` first to bring the store up to date.
+
+        Args:
+            ticker (str): Company ticker symbol
+            start (date or str, optional): First date, inclusive
+            end (date or str, optional): Last date, inclusive
+
+        Returns:
+            PriceSeries: Memory-mapped views, or None if nothing is stored
+        """
+        series = self.load(ticker)
+        if series is None:
+            return None
+        return series.between(start, end)
+
+    def _write(self, series: PriceSeries) -> None:
+        """Publish a series as a new version and drop the versions it replaces."""
+        ticker_dir = self._ticker_dir(series.ticker)
+        version = str(time.time_ns())
+        version_dir = os.path.join(ticker_dir, version)
+        os.makedirs(version_dir)
+
+        np.save(os.path.join(version_dir, "date.npy"), np.ascontiguousarray(series.dates, dtype=np.int32))
+        for column in PRICE_COLUMNS:
+            np.save(os.path.join(version_dir, f"{column}.npy"), np.ascontiguousarray(series.columns[column], dtype=PRICE_STORE_DTYPE))
+        self._write_json(os.path.join(ticker_dir, "CURRENT"), {"version": version, "rows": len(series)})
+
+        # Open memory maps keep old files alive until they are closed
+        for name in os.listdir(ticker_dir):
+            path = os.path.join(ticker_dir, name)
+            if name != version and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def sync(self, ticker: str, api_key: str = None, base_url: str = None, force: bool = False) -> PriceSeries:
+        """
+        Bring a ticker's bars up to date and return them.
+
+        The first sync downloads the full history. Later syncs request bars from
+        the high-water-mark date onwards and append the new ones; nothing is
+        fetched again until the next market close. If the overlapping bar's
+        adjusted close changed (a split or dividend re-based the history), the
+        full history is downloaded again. While a cassette is recording or
+        replaying, every sync downloads the full history.
+
+        Args:
+            ticker (str): Company ticker symbol
+            api_key (str, optional): FMP API key
+            base_url (str, optional): FMP base URL
+            force (bool): Sync even if the stored data is still current
+
+        Returns:
+            PriceSeries: The stored series
+
+        Raises:
+            requests.exceptions.RequestException: If fetching fails and nothing is stored yet
+        """
+        ticker = ticker.upper()
+        with self._locked(ticker):
+            # Under a cassette the full history is always requested, so recording on a warm
+            # store and replaying on a cold one (or the reverse) make the same request
+            stored = None if get_cassette() is not None else self.load(ticker)
+            state_path = os.path.join(self._ticker_dir(ticker), "sync.json")
+            if stored is not None and not force and self._read_json(state_path).get("fresh_until", 0) > time.time():
+                return stored
+
+            try:
+                series = self._sync(ticker, stored, api_key, base_url)
+            except Exception as e:
+                if stored is None:
+                    raise
+                logger.warning(f"Price sync for {ticker} failed, using bars up to {stored.last_date}: {str(e)}")
+                return stored
+
+            self._write_json(state_path, {"synced_at": time.time(), "fresh_until": time.time() + seconds_until_next_close()})
+            return series
+
+    def _sync(self, ticker: str, stored: Optional[PriceSeries], api_key: str, base_url: str) -> PriceSeries:
+        def fetch(params=None) -> PriceSeries:
+            # Streamed straight into column buffers; a full history is never parsed as one object tree
+            rows = fmp_iter(f"historical-price-full/{ticker}", params, "historical", api_key=api_key, base_url=base_url)
+            return PriceSeries.from_historical(ticker, rows)
+
+        if stored is None or not len(stored):
+            series = fetch()
+            logger.info(f"Price store: downloaded {len(series)} bars for {ticker}")
+            if not len(series):
+                return series
+            self._write(series)
+            return self.load(ticker)
+
+        last = stored.last_date
+        update = fetch({"from": last.isoformat()})
+
+        overlap = np.flatnonzero(update.dates == stored.dates[-1])
+        if len(overlap) and not np.allclose(update["adjClose"][overlap[0]], stored["adjClose"][-1], equal_nan=True):
+            series = fetch()
+            logger.info(f"Price store: adjusted history changed for {ticker}, reloaded {len(series)} bars")
+            self._write(series)
+            return self.load(ticker)
+
+        new = update.tail(int(np.count_nonzero(update.dates > stored.dates[-1])))
+        if not len(new):
+            return stored
+
+        self._write(stored.append(new))
+        logger.info(f"Price store: appended {len(new)} bars for {ticker} after {last}")
+        return self.load(ticker)
+
+_price_store: Optional[PriceStore] = None
+_store_lock = threading.Lock()
+
+def get_price_store() -> Optional[PriceStore]:
+    """
+    Get the process-wide price store.
+
+    Returns:
+        PriceStore: The shared store, or None when it is disabled
+    """
+    global _price_store
+    if not PRICE_STORE_ENABLED:
+        return None
+    if _price_store is None:
+        with _store_lock:
+            if _price_store is None:
+                _price_store = PriceStore(PRICE_STORE_DIR)
+    return _price_store
@@ -0,0 +1,306 @@
+import re
+import json
+import math
+import hashlib
+import logging
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import OPENAI_MODEL, PROMPT_COMPACT, PROMPT_TOKEN_BUDGET, PROMPT_FLOAT_DECIMALS
+from tools.data_transformer import NumpyEncoder, convert_numpy_types
+from utils.cache import LRUCache
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to a characters-per-token estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Filing metadata and links from FMP statements; no analytical value in a prompt
+DROP_FIELDS = {"link", "finalLink", "cik", "acceptedDate", "fillingDate", "filingDate"}
+
+# Average characters per token of compact JSON, used when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+
+# Progressively tighter (rows per list, characters per string) tried until a payload fits its budget
+TRIM_LEVELS: List[Tuple[Optional[int], Optional[int]]] = [(8, 1500), (5, 800), (3, 400), (2, 200), (1, 100)]
+
+# Bounds of the process-wide cache of encoded payloads
+ENCODING_CACHE_ENTRIES = 128
+ENCODING_CACHE_BYTES = 64 * 1024 * 1024
+
+_MIDNIGHT = re.compile(r"^(\d{4}-\d{2}-\d{2})[T ]00:00:00$")
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens a model sees for some text.
+
+    Uses tiktoken when it is installed, otherwise estimates from the length.
+
+    Args:
+        text (str): Text to count
+        model (str, optional): Model whose tokenizer to use, defaults to OPENAI_MODEL
+
+    Returns:
+        int: Number of tokens
+    """
+    if tiktoken is not None:
+        return len(_encoding(model or OPENAI_MODEL).encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def _number(value: float) -> Any:
+    if math.isnan(value) or math.isinf(value):
+        return None
+    if value.is_integer() and abs(value) < 1e15:
+        return int(value)
+    if abs(value) >= 1:
+        return round(value, PROMPT_FLOAT_DECIMALS)
+    # Small ratios keep significant digits rather than decimals
+    return float(f"{value:.{PROMPT_FLOAT_DECIMALS + 1}g}")
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+def _table(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Encode records as column names plus value rows; columns equal in every row are stated once."""
+    columns: List[str] = []
+    for row in rows:
+        columns.extend(key for key in row if key not in columns)
+
+    same = {}
+    varying = []
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        if all(value is None for value in values):
+            continue
+        if len(rows) > 1 and all(value == values[0] for value in values):
+            same[column] = values[0]
+        else:
+            varying.append(column)
+
+    table = {"columns": varying, "rows": [[row.get(column) for column in varying] for row in rows]}
+    if same:
+        table["same"] = same
+    return table
+
+def _from_columns(value: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Turn a column-oriented ``DataFrame.to_dict()`` back into records, or None if it is not one.
+
+    Only frames with a default 0..n-1 index qualify: any other inner keys (years,
+    or names like "value"/"trend" in nested LLM JSON) carry meaning and are kept.
+    """
+    if len(value) < 2 or not all(isinstance(column, dict) and column for column in value.values()):
+        return None
+    index = list(next(iter(value.values())))
+    if [str(i) for i in index] != [str(i) for i in range(len(index))]:
+        return None
+    if not all(list(column) == index for column in value.values()):
+        return None
+    if not all(_is_scalar(cell) for column in value.values() for cell in column.values()):
+        return None
+    return [{name: column[i] for name, column in value.items()} for i in index]
+
+def compact(obj: Any, max_rows: Optional[int] = None, max_chars: Optional[int] = None) -> Any:
+    """
+    Project an analysis payload onto what an LLM needs to read.
+
+    Drops filing metadata and links, rounds floats, shortens midnight
+    timestamps to dates and encodes lists of records (and column-oriented
+    DataFrame dicts) as tables. NumPy and pandas values become native types.
+
+    Args:
+        obj: Analysis data, e.g. the output of FinancialAnalyzer.comprehensive_analysis
+        max_rows (int, optional): Keep only the first rows of every list (FMP lists are newest first)
+        max_chars (int, optional): Truncate longer strings
+
+    Returns:
+        The compacted, JSON-serializable payload
+    """
+    if isinstance(obj, dict):
+        records = _from_columns(obj)
+        if records is not None:
+            return compact(records, max_rows, max_chars)
+        return {
+            str(key): compact(value, max_rows, max_chars)
+            for key, value in obj.items()
+            if key not in DROP_FIELDS and value is not None
+        }
+
+    if isinstance(obj, (list, tuple)):
+        items = list(obj)
+        omitted = 0
+        if max_rows is not None and len(items) > max_rows:
+            omitted = len(items) - max_rows
+            items = items[:max_rows]
+        items = [compact(item, max_rows, max_chars) for item in items]
+
+        if len(items) > 1 and all(isinstance(item, dict) and all(_is_scalar(v) for v in item.values()) for item in items):
+            table = _table(items)
+            if omitted:
+                table["omitted_rows"] = omitted
+            return table
+        if omitted:
+            items.append(f"... {omitted} more")
+        return items
+
+    obj = convert_numpy_types(obj)
+    if isinstance(obj, bool) or obj is None:
+        return obj
+    if isinstance(obj, float):
+        return _number(obj)
+    if isinstance(obj, str):
+        match = _MIDNIGHT.match(obj)
+        if match:
+            return match.group(1)
+        if max_chars is not None and len(obj) > max_chars:
+            return obj[:max_chars] + "…"
+        return obj
+    if isinstance(obj, (dict, list)):
+        # Arrays converted to lists
+        return compact(obj, max_rows, max_chars)
+    return obj
+
+def _dumps(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+
+# Encoded payloads by content hash and form, shared by every PromptPayload in the process
+_encodings = LRUCache(max_entries=ENCODING_CACHE_ENTRIES, max_bytes=ENCODING_CACHE_BYTES)
+
+class PromptPayload(Mapping):
+    """
+    Analysis data converted to native types once, with its prompt encodings memoized.
+
+    Build one per run and hand it to every agent that embeds the data in a
+    prompt: the pretty, compact and budget-trimmed encodings are produced on
+    first use and cached by content hash, so later agents (and equal data
+    wrapped again, e.g. after a checkpoint resume) reuse the text instead of
+    walking the tree again. The payload is read-only; the data it wraps must
+    not be mutated once it has been encoded.
+    """
+
+    __slots__ = ("_data", "_digest")
+
+    def __init__(self, data: Any, converted: bool = False):
+        """
+        Wrap analysis data.
+
+        Args:
+            data: Analysis data, usually a dict
+            converted (bool): The data is already free of NumPy and pandas types
+                (e.g. FinancialAnalyzer output), so the conversion walk is skipped
+        """
+        self._data = data if converted else convert_numpy_types(data)
+        self._digest: Optional[str] = None
+
+    @classmethod
+    def of(cls, data: Any) -> "PromptPayload":
+        """Return ``data`` if it is already a payload, otherwise wrap it."""
+        return data if isinstance(data, cls) else cls(data)
+
+    @property
+    def data(self) -> Any:
+        """The converted data, e.g. for results written to disk."""
+        return self._data
+
+    @property
+    def digest(self) -> str:
+        """Content hash of the data."""
+        if self._digest is None:
+            try:
+                canonical = json.dumps(self._data, sort_keys=True, separators=(",", ":"), default=str)
+            except TypeError:  # Keys of mixed types cannot be sorted
+                canonical = json.dumps(self._data, separators=(",", ":"), default=str)
+            self._digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return self._digest
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _encoded(self, form: str, encode: Callable[[], str]) -> str:
+        key = f"{self.digest}:{form}"
+        text = _encodings.get(key)
+        if text is None:
+            text = encode()
+            _encodings.set(key, text)
+        return text
+
+    def pretty(self) -> str:
+        """The data as indented JSON."""
+        return self._encoded("pretty", lambda: json.dumps(self._data, cls=NumpyEncoder, indent=2))
+
+    def compact_json(self, max_rows: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+        """The data projected by ``compact`` and written without whitespace."""
+        return self._encoded(f"compact:{max_rows}:{max_chars}", lambda: _dumps(compact(self._data, max_rows, max_chars)))
+
+    def for_prompt(self, max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+        """
+        The encoding to embed in an LLM prompt.
+
+        The compact encoding, cut progressively (fewer list rows, shorter
+        strings) until it fits the token budget; a payload that cannot be cut
+        enough is returned at the tightest level with a warning. With
+        PROMPT_COMPACT=false the pretty encoding is returned instead.
+
+        Args:
+            max_tokens (int, optional): Token budget, defaults to PROMPT_TOKEN_BUDGET; 0 means unlimited
+            model (str, optional): Model whose tokenizer counts the budget, defaults to OPENAI_MODEL
+
+        Returns:
+            str: The serialized payload
+        """
+        if not PROMPT_COMPACT:
+            return self.pretty()
+
+        budget = PROMPT_TOKEN_BUDGET if max_tokens is None else max_tokens
+        if not budget:
+            return self.compact_json()
+        return self._encoded(f"prompt:{budget}:{model or OPENAI_MODEL}", lambda: self._fit(budget, model))
+
+    def _fit(self, budget: int, model: Optional[str]) -> str:
+        text = self.compact_json()
+        tokens = count_tokens(text, model)
+        if tokens <= budget:
+            return text
+
+        for max_rows, max_chars in TRIM_LEVELS:
+            trimmed = self.compact_json(max_rows, max_chars)
+            trimmed_tokens = count_tokens(trimmed, model)
+            if trimmed_tokens <= budget:
+                logger.debug(f"Prompt payload trimmed from {tokens} to {trimmed_tokens} tokens (rows={max_rows}, chars={max_chars})")
+                return trimmed
+
+        logger.warning(f"Prompt payload is {trimmed_tokens} tokens after trimming, over the budget of {budget}")
+        return trimmed
+
+def serialize_for_prompt(obj: Any, max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+    """
+    Serialize analysis data for inclusion in an LLM prompt.
+
+    Shorthand for ``PromptPayload.of(obj).for_prompt(max_tokens, model)``;
+    pass a PromptPayload to reuse encodings across calls.
+
+    Args:
+        obj: Analysis data or a PromptPayload
+        max_tokens (int, optional): Token budget, defaults to PROMPT_TOKEN_BUDGET; 0 means unlimited
+        model (str, optional): Model whose tokenizer counts the budget, defaults to OPENAI_MODEL
+
+    Returns:
+        str: The serialized payload
+    """
+    return PromptPayload.of(obj).for_prompt(max_tokens, model)
@@ -7,6 +7,7 @@ from plotly.subplots import make_subplots
 from datetime import datetime
 import json
 from tools.chart_generator import ChartGenerator
+from tools.price_store import PriceSeries
 
 class ReportBuilder:
     """Tool for building and formatting financial reports and creating visualizations."""
@@ -75,12 +76,15 @@ class ReportBuilder:
         
     def _create_static_price_chart(self, stock_data, ticker):
         """Create static backup chart using plotly."""
-        if not stock_data or 'raw_data' not in stock_data:
+        if isinstance(stock_data, PriceSeries):
+            # Plotly takes the mapped columns directly; no per-row objects are built
+            df = {'date': stock_data.datetimes(), **{col: stock_data[col] for col in ['open', 'high', 'low', 'close', 'volume']}}
+        elif not stock_data or 'raw_data' not in stock_data:
             return None
-            
-        df = pd.DataFrame(stock_data['raw_data'])
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date')
+        else:
+            df = pd.DataFrame(stock_data['raw_data'])
+            df['date'] = pd.to_datetime(df['date'])
+            df = df.sort_values('date')
         
         # Create plotly figure
         fig = make_subplots(rows=2, cols=1, shared_xaxes=True, 
@@ -99,7 +103,7 @@ class ReportBuilder:
         ), row=1, col=1)
         
         # Add moving averages if available
-        if 'SMA_50' in df.columns:
+        if 'SMA_50' in df:
             fig.add_trace(go.Scatter(
                 x=df['date'],
                 y=df['SMA_50'],
@@ -107,7 +111,7 @@ class ReportBuilder:
                 line=dict(color='blue', width=1)
             ), row=1, col=1)
             
-        if 'SMA_200' in df.columns:
+        if 'SMA_200' in df:
             fig.add_trace(go.Scatter(
                 x=df['date'],
                 y=df['SMA_200'],
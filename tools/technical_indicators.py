@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, List
+import logging
+
+logger = logging.getLogger("Technical_Indicators")
+
+def historical_to_frame(historical: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Convert FMP ``historical`` price rows into an ascending OHLCV DataFrame.
+
+    Args:
+        historical (list): Price rows with date, open, high, low, close and volume
+
+    Returns:
+        pd.DataFrame: Float OHLCV columns indexed by date, oldest first
+    """
+    if not historical:
+        return pd.DataFrame(columns=["open", "high", "low", "close", "volume"], dtype=float)
+
+    df = pd.DataFrame(historical)
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.drop_duplicates("date").set_index("date").sort_index()
+
+    columns = [col for col in ["open", "high", "low", "close", "volume"] if col in df.columns]
+    return df[columns].apply(pd.to_numeric, errors="coerce").astype(float)
+
+def _ema(series: pd.Series, period: int) -> pd.Series:
+    return series.ewm(span=period, adjust=False, min_periods=period).mean()
+
+def _wilder(series: pd.Series, period: int) -> pd.Series:
+    """Wilder's smoothing, an EMA with alpha = 1 / period."""
+    return series.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+
+def sma(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Simple moving average of the close."""
+    return pd.DataFrame({"sma": df["close"].rolling(period).mean()})
+
+def ema(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Exponential moving average of the close."""
+    return pd.DataFrame({"ema": _ema(df["close"], period)})
+
+def wma(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Linearly weighted moving average of the close."""
+    close = df["close"].to_numpy()
+    values = np.full(len(close), np.nan)
+    if len(close) >= period:
+        weights = np.arange(1, period + 1, dtype=float)
+        values[period - 1:] = np.convolve(close, weights[::-1], mode="valid") / weights.sum()
+    return pd.DataFrame({"wma": values}, index=df.index)
+
+def dema(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Double exponential moving average of the close."""
+    first = _ema(df["close"], period)
+    return pd.DataFrame({"dema": 2 * first - _ema(first, period)})
+
+def tema(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Triple exponential moving average of the close."""
+    first = _ema(df["close"], period)
+    second = _ema(first, period)
+    return pd.DataFrame({"tema": 3 * first - 3 * second + _ema(second, period)})
+
+def rsi(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Relative strength index using Wilder's smoothing."""
+    delta = df["close"].diff()
+    avg_gain = _wilder(delta.clip(lower=0), period)
+    avg_loss = _wilder(-delta.clip(upper=0), period)
+    values = 100 - 100 / (1 + avg_gain / avg_loss)
+    # No losses in the window means maximum strength
+    values = values.where(avg_loss != 0, 100.0)
+    return pd.DataFrame({"rsi": values.where(avg_gain.notna())})
+
+def macd(df: pd.DataFrame, period: int = None) -> pd.DataFrame:
+    """MACD (12, 26, 9) line, signal and histogram; ``period`` is ignored."""
+    line = _ema(df["close"], 12) - _ema(df["close"], 26)
+    signal = _ema(line, 9)
+    return pd.DataFrame({"macd": line, "signal": signal, "histogram": line - signal})
+
+def bollinger(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Bollinger Bands at two standard deviations around the SMA."""
+    middle = df["close"].rolling(period).mean()
+    deviation = df["close"].rolling(period).std(ddof=0)
+    return pd.DataFrame({
+        "middleBand": middle,
+        "upperBand": middle + 2 * deviation,
+        "lowerBand": middle - 2 * deviation
+    })
+
+def atr(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Average true range using Wilder's smoothing."""
+    previous_close = df["close"].shift(1)
+    true_range = pd.concat([
+        df["high"] - df["low"],
+        (df["high"] - previous_close).abs(),
+        (df["low"] - previous_close).abs()
+    ], axis=1).max(axis=1)
+    return pd.DataFrame({"atr": _wilder(true_range, period)})
+
+def williams(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Williams %R over the look-back window."""
+    highest = df["high"].rolling(period).max()
+    lowest = df["low"].rolling(period).min()
+    return pd.DataFrame({"williams": (highest - df["close"]) / (highest - lowest) * -100})
+
+def standard_deviation(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """Rolling population standard deviation of the close."""
+    return pd.DataFrame({"standardDeviation": df["close"].rolling(period).std(ddof=0)})
+
+INDICATORS: Dict[str, Callable[[pd.DataFrame, int], pd.DataFrame]] = {
+    "sma": sma,
+    "ema": ema,
+    "wma": wma,
+    "dema": dema,
+    "tema": tema,
+    "rsi": rsi,
+    "macd": macd,
+    "bollinger": bollinger,
+    "atr": atr,
+    "williams": williams,
+    "standarddeviation": standard_deviation
+}
+
+def is_supported(indicator: str) -> bool:
+    """Check whether an indicator can be computed locally."""
+    return str(indicator).lower() in INDICATORS
+
+def compute_indicator_frame(prices: pd.DataFrame, indicator: str, period: int = 14) -> pd.DataFrame:
+    """
+    Compute an indicator over an ascending OHLCV frame.
+
+    Args:
+        prices (pd.DataFrame): Output of ``historical_to_frame``
+        indicator (str): Indicator name (see ``INDICATORS``)
+        period (int): Look-back window
+
+    Returns:
+        pd.DataFrame: Indicator columns aligned to ``prices``, warm-up rows included as NaN
+    """
+    name = str(indicator).lower()
+    if name not in INDICATORS:
+        raise ValueError(f"Unsupported indicator: {indicator}")
+    return INDICATORS[name](prices, int(period))
+
+def indicator_frame_to_records(values: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert an indicator frame to FMP-style rows, newest first, warm-up dropped."""
+    values = values.dropna(subset=[values.columns[0]]).iloc[::-1]
+    dates = values.index.strftime("%Y-%m-%d")
+    columns = {col: values[col].to_numpy() for col in values.columns}
+
+    records = []
+    for i, day in enumerate(dates):
+        row = {"date": day}
+        for col, column_values in columns.items():
+            value = column_values[i]
+            row[col] = None if np.isnan(value) else float(value)
+        records.append(row)
+    return records
+
+def compute_indicator(historical: List[Dict[str, Any]], indicator: str, period: int = 14) -> List[Dict[str, Any]]:
+    """
+    Compute an indicator from FMP ``historical`` price rows.
+
+    The result mirrors FMP's technical indicator endpoint: newest row first,
+    one dict per date with the indicator value(s) directly after ``date``, so
+    it can be wrapped as ``{"historical": rows}`` for ``FinancialAnalyzer``.
+
+    Args:
+        historical (list): Price rows from ``historical-price-full``
+        indicator (str): Indicator name (see ``INDICATORS``)
+        period (int): Look-back window
+
+    Returns:
+        list: Indicator rows, newest first, warm-up period dropped
+    """
+    return indicator_frame_to_records(compute_indicator_frame(historical_to_frame(historical), indicator, period))
@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class SQLiteCache:
+    """
+    Persistent key/value cache with per-entry expiry backed by SQLite.
+
+    Values are stored as JSON text. A single database file can be shared by
+    several threads and worker processes; SQLite's own locking serializes writers.
+    When ``max_bytes`` is set, the least recently read entries are evicted
+    once the stored values grow past that size.
+    """
+
+    def __init__(self, path: str, table: str = "cache", max_bytes: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): Path of the SQLite database file
+            table (str): Table holding the entries
+            max_bytes (int, optional): Size limit for stored values; None is unbounded
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.table = table
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the open connection, reconnecting in a forked child process."""
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, created_at REAL NOT NULL, "
+                "size INTEGER NOT NULL DEFAULT 0, accessed_at REAL NOT NULL DEFAULT 0)"
+            )
+            # Databases created before size tracking lack the eviction columns
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({self.table})")}
+            if "size" not in columns:
+                self._conn.execute(f"ALTER TABLE {self.table} ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            if "accessed_at" not in columns:
+                self._conn.execute(f"ALTER TABLE {self.table} ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        return self.get_with_expiry(key)[0]
+
+    def get_with_expiry(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """
+        Get a cached value and the time it expires.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            tuple: The cached value (None if missing or expired) and its expiry
+                as a ``time.time()`` timestamp (None if it never expires)
+        """
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute(
+                    f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self.max_bytes is not None:
+                    conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.Error as e:
+                logger.warning(f"Cache read failed for {key}: {str(e)}")
+                return None, None
+
+        if row is None:
+            return None, None
+
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None, None
+
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key (str): Cache key
+            value: JSON-serializable value
+            ttl (float, optional): Lifetime in seconds; None never expires
+        """
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        encoded = json.dumps(value)
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, created_at, size, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, encoded, expires_at, now, len(encoded), now)
+                )
+                if self.max_bytes is not None:
+                    self._evict(conn)
+            except sqlite3.Error as e:
+                logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently read entries until the cache fits in ``max_bytes``."""
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        removed = 0
+        for key, size in conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        logger.debug(f"Evicted {removed} entries from {self.table}")
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry."""
+        with self._lock:
+            self._connection().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """
+        Remove every expired entry.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            cursor = self._connection().execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._connection().execute(f"DELETE FROM {self.table}")
+
+class LRUCache:
+    """Thread-safe in-memory cache evicting least recently used entries by count and size."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept
+            max_bytes (int, optional): Maximum total JSON size of the entries; None is unbounded
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self._total_bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries if over capacity."""
+        size = len(json.dumps(value))
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size, expires_at)
+            self._total_bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+            ):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._total_bytes -= entry[1]
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class TieredCache:
+    """Memory tier in front of an optional persistent tier; hits in the lower tier are promoted."""
+
+    def __init__(self, memory: LRUCache, persistent: Optional[SQLiteCache] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            memory (LRUCache): Fast in-process tier
+            persistent (SQLiteCache, optional): Durable tier shared across runs
+        """
+        self.memory = memory
+        self.persistent = persistent
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value from the fastest tier holding it."""
+        value = self.memory.get(key)
+        if value is None and self.persistent is not None:
+            value, expires_at = self.persistent.get_with_expiry(key)
+            if value is not None:
+                # The promoted copy expires with the persistent entry
+                ttl = expires_at - time.time() if expires_at is not None else None
+                self.memory.set(key, value, ttl)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value in every tier."""
+        self.memory.set(key, value, ttl)
+        if self.persistent is not None:
+            self.persistent.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry from every tier."""
+        self.memory.delete(key)
+        if self.persistent is not None:
+            self.persistent.delete(key)
+
+    def clear(self) -> None:
+        """Remove every entry from every tier."""
+        self.memory.clear()
+        if self.persistent is not None:
+            self.persistent.clear()
@@ -0,0 +1,351 @@
+import os
+import gzip
+import asyncio
+import json
+import time
+import base64
+import hashlib
+import atexit
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit, parse_qsl
+
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config import CASSETTE_MODE, CASSETTE_PATH, CASSETTE_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# Query parameters holding credentials; they never reach the cassette or its keys
+SECRET_PARAMS = {"apikey", "api_key", "key", "token", "access_token"}
+
+# Response headers worth keeping; the rest are transport noise
+KEPT_HEADERS = {"content-type", "retry-after", "x-request-id"}
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """Raised in replay mode for a request the cassette has no recording of."""
+
+def _normalize_body(body: Optional[bytes]) -> Any:
+    """Decode JSON request bodies so key order and whitespace do not matter."""
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return hashlib.sha256(body).hexdigest()
+
+def normalize_request(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                      body: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Describe a request independently of credentials and parameter order.
+
+    Args:
+        method (str): HTTP method
+        url (str): Request URL, possibly with a query string
+        params (dict, optional): Extra query parameters
+        body (bytes, optional): Request body
+
+    Returns:
+        dict: Method, URL without query, sorted non-secret parameters and decoded body
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + [(k, v) for k, v in (params or {}).items() if v is not None]
+    return {
+        "method": method.upper(),
+        "url": urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip("/"), "", "")),
+        "params": sorted((str(k), str(v)) for k, v in query if str(k).lower() not in SECRET_PARAMS),
+        "body": _normalize_body(body)
+    }
+
+def request_key(request: Dict[str, Any]) -> str:
+    """Stable identity of a normalized request."""
+    encoded = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def _encode_body(content: bytes) -> Dict[str, str]:
+    try:
+        return {"body": content.decode("utf-8"), "encoding": "utf-8"}
+    except UnicodeDecodeError:
+        return {"body": base64.b64encode(content).decode("ascii"), "encoding": "base64"}
+
+def _decode_body(entry: Dict[str, Any]) -> bytes:
+    if entry.get("encoding") == "base64":
+        return base64.b64decode(entry["body"])
+    return entry["body"].encode("utf-8")
+
+class Cassette:
+    """
+    Recorded request/response pairs for deterministic, offline runs.
+
+    In ``record`` mode real responses are captured and written to a
+    gzip-compressed JSON file by ``save``. In ``replay`` mode requests are
+    answered from the file and never reach the network; identical requests
+    are served their recordings in order, repeating the last one. Replayed
+    responses can be delayed by a fixed number of seconds or by the latency
+    observed while recording (``latency="recorded"``).
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency: Union[float, str, None] = None):
+        """
+        Initialize the cassette.
+
+        Args:
+            path (str): Cassette file (``.json.gz``)
+            mode (str): "record" or "replay"
+            latency (float or str, optional): Replay delay in seconds, or "recorded"
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.interactions: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, List[Dict[str, Any]]] = {}
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if mode == "replay":
+            self.load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def load(self) -> None:
+        """Read the cassette file."""
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        self.interactions = data.get("interactions", [])
+        self._by_key = {}
+        for interaction in self.interactions:
+            self._by_key.setdefault(interaction["key"], []).append(interaction["response"])
+        logger.info(f"Loaded {len(self.interactions)} recorded interactions from {self.path}")
+
+    def save(self) -> None:
+        """Write the recorded interactions to the cassette file."""
+        if self.mode != "record":
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = {"version": 1, "interactions": list(self.interactions)}
+        with gzip.open(f"{self.path}.tmp", "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(f"{self.path}.tmp", self.path)
+        logger.info(f"Saved {len(data['interactions'])} interactions to {self.path}")
+
+    def handle(self, request: Dict[str, Any], perform: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Answer a normalized request from the recording, or perform and record it.
+
+        Args:
+            request (dict): Output of ``normalize_request``
+            perform (callable): Makes the real request and returns a response entry
+                (``status``, ``headers``, ``body``, ``encoding``)
+
+        Returns:
+            dict: The response entry
+
+        Raises:
+            CassetteMissError: In replay mode, if the request was never recorded
+        """
+        if self.mode == "replay":
+            entry, delay = self.lookup(request)
+            if delay > 0:
+                time.sleep(delay)
+            return entry
+
+        started = time.monotonic()
+        entry = perform()
+        entry["elapsed"] = time.monotonic() - started
+        self.record(request, entry)
+        return entry
+
+    def lookup(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        """
+        Find the next recorded response for a request in replay mode.
+
+        Returns:
+            tuple: The response entry and the delay to apply before serving it
+
+        Raises:
+            CassetteMissError: If the request was never recorded
+        """
+        key = request_key(request)
+        with self._lock:
+            recorded = self._by_key.get(key)
+            if not recorded:
+                raise CassetteMissError(f"No recording for {request['method']} {request['url']} {request['params']}")
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            entry = recorded[min(index, len(recorded) - 1)]
+
+        delay = entry.get("elapsed", 0.0) if self.latency == "recorded" else float(self.latency or 0.0)
+        return entry, delay
+
+    def record(self, request: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        """Add a performed request and its response entry to the recording."""
+        key = request_key(request)
+        with self._lock:
+            self.interactions.append({"key": key, "request": request, "response": entry})
+            self._by_key.setdefault(key, []).append(entry)
+
+    def requests_get(self, url: str, params: Optional[Dict[str, Any]], send: Callable[[], requests.Response]) -> requests.Response:
+        """Serve a ``requests`` GET through the cassette."""
+        def perform() -> Dict[str, Any]:
+            response = send()
+            return {
+                "status": response.status_code,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+                **_encode_body(response.content)
+            }
+
+        # Recorded responses are rebuilt from the entry too, so both modes hand callers the same thing
+        entry = self.handle(normalize_request("GET", url, params), perform)
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response._content = _decode_body(entry)
+        response._content_consumed = True  # iter_content serves _content instead of reading the socket
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+    def httpx_transport(self, inner: Optional[httpx.BaseTransport] = None) -> "CassetteTransport":
+        """An httpx transport (for the OpenAI SDK) backed by this cassette."""
+        return CassetteTransport(self, inner)
+
+    def async_httpx_transport(self, inner: Optional[httpx.AsyncBaseTransport] = None) -> "AsyncCassetteTransport":
+        """An async httpx transport (for ``AsyncOpenAI``) backed by this cassette."""
+        return AsyncCassetteTransport(self, inner)
+
+class CassetteTransport(httpx.BaseTransport):
+    """httpx transport that records or replays requests through a Cassette."""
+
+    def __init__(self, cassette: Cassette, inner: Optional[httpx.BaseTransport] = None):
+        self.cassette = cassette
+        self.inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        def perform() -> Dict[str, Any]:
+            if self.inner is None:
+                self.inner = httpx.HTTPTransport()
+            response = self.inner.handle_request(request)
+            content = response.read()
+            return {
+                "status": response.status_code,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+                **_encode_body(content)
+            }
+
+        normalized = normalize_request(request.method, str(request.url), body=request.read())
+        entry = self.cassette.handle(normalized, perform)
+        return httpx.Response(entry["status"], headers=entry.get("headers", {}), content=_decode_body(entry), request=request)
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """Async httpx transport that records or replays requests through a Cassette."""
+
+    def __init__(self, cassette: Cassette, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        normalized = normalize_request(request.method, str(request.url), body=await request.aread())
+
+        if self.cassette.replaying:
+            entry, delay = self.cassette.lookup(normalized)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            if self.inner is None:
+                self.inner = httpx.AsyncHTTPTransport()
+            started = time.monotonic()
+            response = await self.inner.handle_async_request(request)
+            content = await response.aread()
+            entry = {
+                "status": response.status_code,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+                **_encode_body(content),
+                "elapsed": time.monotonic() - started
+            }
+            self.cassette.record(normalized, entry)
+
+        return httpx.Response(entry["status"], headers=entry.get("headers", {}), content=_decode_body(entry), request=request)
+
+    async def aclose(self) -> None:
+        if self.inner is not None:
+            await self.inner.aclose()
+
+_cassette: Optional[Cassette] = None
+_configured = False
+_cassette_lock = threading.Lock()
+
+def get_cassette() -> Optional[Cassette]:
+    """
+    Get the active cassette.
+
+    Returns:
+        Cassette: The cassette set by ``use_cassette`` or configured through
+            CASSETTE_MODE, or None when traffic goes to the network as usual
+    """
+    global _cassette, _configured
+    if not _configured:
+        with _cassette_lock:
+            if not _configured:
+                if CASSETTE_MODE in ("record", "replay"):
+                    latency = CASSETTE_LATENCY if CASSETTE_LATENCY == "recorded" else float(CASSETTE_LATENCY or 0)
+                    _cassette = Cassette(CASSETTE_PATH, CASSETTE_MODE, latency)
+                    if CASSETTE_MODE == "record":
+                        atexit.register(_cassette.save)
+                _configured = True
+    return _cassette
+
+def is_replaying() -> bool:
+    """Check whether responses are currently served from a cassette."""
+    cassette = get_cassette()
+    return cassette is not None and cassette.replaying
+
+def is_recording() -> bool:
+    """
+    Check whether traffic is currently being recorded to a cassette.
+
+    Local caches that could answer a request (the FMP response cache, the
+    ``request_scope`` memo, the LLM response cache) are bypassed while
+    recording, so the cassette captures every request a cold machine makes.
+    """
+    cassette = get_cassette()
+    return cassette is not None and not cassette.replaying
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", latency: Union[float, str, None] = None):
+    """
+    Record or replay all HTTP and LLM traffic inside the block.
+
+    Agents pick the cassette up when they are constructed, so create them
+    inside the block. A recording is saved when the block exits.
+
+    Args:
+        path (str): Cassette file (``.json.gz``)
+        mode (str): "record" or "replay"
+        latency (float or str, optional): Replay delay in seconds, or "recorded"
+    """
+    global _cassette, _configured
+    cassette = Cassette(path, mode, latency)
+    with _cassette_lock:
+        previous = (_cassette, _configured)
+        _cassette, _configured = cassette, True
+    try:
+        yield cassette
+    finally:
+        with _cassette_lock:
+            _cassette, _configured = previous
+        cassette.save()
@@ -0,0 +1,131 @@
+import os
+import json
+import shutil
+import time
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class CheckpointStore:
+    """
+    Per-run store of orchestrator stage outputs.
+
+    Each stage result is saved as JSON under ``<root>/<ticker>/<run_id>/<stage>.json``
+    as soon as the stage finishes, so a failed run can be resumed without
+    repeating the data collection and LLM work it already paid for.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the store.
+
+        Args:
+            root (str): Directory holding the checkpoints
+        """
+        self.root = root
+
+    @staticmethod
+    def new_run_id() -> str:
+        """Generate a run id that sorts chronologically."""
+        return datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+
+    def _run_dir(self, ticker: str, run_id: str) -> str:
+        return os.path.join(self.root, ticker.upper(), run_id)
+
+    def save(self, ticker: str, run_id: str, stage: str, result: Any) -> bool:
+        """
+        Persist a stage result.
+
+        The file is written to a temporary name and renamed into place, so a
+        crash mid-write never leaves a truncated checkpoint behind.
+
+        Args:
+            ticker (str): Company ticker symbol
+            run_id (str): Run the result belongs to
+            stage (str): Stage name
+            result: JSON-serializable stage result
+
+        Returns:
+            bool: True if the checkpoint was written
+        """
+        try:
+            encoded = json.dumps(result)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Stage {stage} for {ticker} is not serializable, skipping checkpoint: {str(e)}")
+            return False
+
+        run_dir = self._run_dir(ticker, run_id)
+        path = os.path.join(run_dir, f"{stage}.json")
+        try:
+            os.makedirs(run_dir, exist_ok=True)
+            with open(f"{path}.tmp", "w") as f:
+                f.write(encoded)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning(f"Could not write checkpoint {path}: {str(e)}")
+            return False
+
+        logger.debug(f"Saved checkpoint {path}")
+        return True
+
+    def load(self, ticker: str, run_id: str) -> Dict[str, Any]:
+        """
+        Load every completed stage of a run.
+
+        Args:
+            ticker (str): Company ticker symbol
+            run_id (str): Run to load
+
+        Returns:
+            dict: Stage results keyed by stage name; empty if the run is unknown
+        """
+        run_dir = self._run_dir(ticker, run_id)
+        if not os.path.isdir(run_dir):
+            return {}
+
+        completed = {}
+        for filename in sorted(os.listdir(run_dir)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(run_dir, filename)) as f:
+                    completed[filename[:-len(".json")]] = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint {filename} for {ticker}: {str(e)}")
+        return completed
+
+    def runs(self, ticker: str) -> List[str]:
+        """List the run ids stored for a ticker, oldest first."""
+        ticker_dir = os.path.join(self.root, ticker.upper())
+        if not os.path.isdir(ticker_dir):
+            return []
+        return sorted(name for name in os.listdir(ticker_dir) if os.path.isdir(os.path.join(ticker_dir, name)))
+
+    def latest_run(self, ticker: str, max_age: Optional[float] = None) -> Optional[str]:
+        """
+        Return the most recent run id for a ticker, or None.
+
+        Args:
+            ticker (str): Company ticker symbol
+            max_age (float, optional): Ignore runs whose last checkpoint is older
+                than this many seconds
+
+        Returns:
+            str: The run id, or None if there is no (recent enough) run
+        """
+        runs = self.runs(ticker)
+        if not runs:
+            return None
+        latest = runs[-1]
+        if max_age is not None:
+            age = time.time() - os.path.getmtime(self._run_dir(ticker, latest))
+            if age > max_age:
+                logger.info(f"Latest run {latest} for {ticker} is {age / 3600:.1f}h old, not resuming it")
+                return None
+        return latest
+
+    def delete(self, ticker: str, run_id: str) -> None:
+        """Remove a run's checkpoints."""
+        shutil.rmtree(self._run_dir(ticker, run_id), ignore_errors=True)
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable
+
+from config import LLM_MAX_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+_llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_llm_semaphores_lock = threading.Lock()
+
+def run_concurrently(tasks: Dict[Hashable, Callable[[], Any]], max_workers: int) -> Dict[Hashable, Any]:
+    """
+    Run independent zero-argument callables on a bounded thread pool.
+
+    Args:
+        tasks (dict): Mapping of result key to the callable producing it
+        max_workers (int): Maximum number of tasks in flight at once; 1 runs serially
+
+    Returns:
+        dict: Results keyed like ``tasks`` and in the same order, regardless of completion order
+    """
+    if not tasks:
+        return {}
+
+    if max_workers is None or max_workers <= 1 or len(tasks) == 1:
+        return {key: task() for key, task in tasks.items()}
+
+    workers = min(max_workers, len(tasks))
+    logger.debug(f"Running {len(tasks)} tasks on {workers} workers")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {key: executor.submit(task) for key, task in tasks.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+def llm_semaphore() -> asyncio.Semaphore:
+    """
+    Get the semaphore capping in-flight async LLM completions on the running loop.
+
+    Every agent awaiting a completion on the same event loop shares it, so
+    at most LLM_MAX_CONCURRENCY requests are outstanding however many
+    coroutines are scheduled. Must be called from a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    with _llm_semaphores_lock:
+        semaphore = _llm_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = _llm_semaphores[loop] = asyncio.Semaphore(max(1, LLM_MAX_CONCURRENCY))
+        return semaphore
@@ -0,0 +1,112 @@
+import threading
+import logging
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+from utils.resilience import RetryPolicy, call_with_retry, classify_http, get_circuit_breaker
+from utils.cassette import get_cassette
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def _create_session() -> requests.Session:
+    """Build a keep-alive session with a bounded connection pool per host."""
+    session = requests.Session()
+
+    # pool_connections is the number of hosts kept warm, pool_maxsize the
+    # connections per host; with pool_block the per-host size is a hard cap.
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        pool_block=HTTP_POOL_BLOCK
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive"
+    })
+
+    logger.debug(f"Created shared HTTP session (hosts={HTTP_POOL_CONNECTIONS}, per_host={HTTP_POOL_MAXSIZE})")
+    return session
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide pooled HTTP session.
+
+    Returns:
+        requests.Session: Shared session used by every outbound HTTP client
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+def reset_session() -> None:
+    """Close the shared session so the next call builds a fresh pool (e.g. after fork)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+def http_get(url: str, params: Dict[str, Any] = None, **kwargs) -> requests.Response:
+    """
+    Issue a GET request through the shared session.
+
+    Requests time out after HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT unless a
+    ``timeout`` is given. Connection errors, timeouts, 429 and transient 5xx
+    responses are retried with jittered exponential backoff (honouring
+    Retry-After), and a per-host circuit breaker fails fast while the host is down.
+    With an active cassette the response is recorded, or replayed without
+    touching the network.
+
+    Args:
+        url (str): Request URL
+        params (dict, optional): Query parameters
+        retry_policy (RetryPolicy, optional): Overrides the configured retry policy
+        before_attempt (callable, optional): Called before every attempt, retries
+            included (e.g. to take a rate-limit token)
+        after_attempt (callable, optional): Called with the response of every attempt
+        **kwargs: Extra arguments passed to ``requests.Session.get``
+
+    Returns:
+        requests.Response: The response of the last attempt
+
+    Raises:
+        requests.exceptions.RequestException: If every attempt fails,
+            CircuitOpenError while the host's circuit is open, or
+            CassetteMissError if a replayed request was never recorded
+    """
+    retry_policy = kwargs.pop("retry_policy", None)
+    before_attempt = kwargs.pop("before_attempt", None)
+    after_attempt = kwargs.pop("after_attempt", None)
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+
+    def attempt() -> requests.Response:
+        if before_attempt is not None:
+            before_attempt()
+        response = get_session().get(url, params=params, **kwargs)
+        if after_attempt is not None:
+            after_attempt(response)
+        return response
+
+    def send() -> requests.Response:
+        return call_with_retry(
+            attempt,
+            classify_http,
+            policy=retry_policy or RetryPolicy(),
+            breaker=get_circuit_breaker(urlparse(url).netloc)
+        )
+
+    cassette = get_cassette()
+    if cassette is not None:
+        return cassette.requests_get(url, params, send)
+    return send()
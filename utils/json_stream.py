@@ -0,0 +1,113 @@
+import json
+import codecs
+from typing import Any, Iterable, Iterator, Optional
+
+_WHITESPACE = " \t\n\r"
+
+class _Reader:
+    """Incremental view of a JSON document arriving as byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk, dropping what has been consumed; False at end of input."""
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                self.buffer = self.buffer[self.pos:] + self._text.decode(chunk)
+                self.pos = 0
+                return True
+        self.buffer = self.buffer[self.pos:] + self._text.decode(b"", final=True)
+        self.pos = 0
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it, or "" at end of input."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+def iter_array(chunks: Iterable[bytes], key: Optional[str] = None) -> Iterator[Any]:
+    """
+    Yield the elements of a JSON array while the document is still arriving.
+
+    Only the element being decoded and the unread part of the current chunk
+    are held in memory, so peak memory does not grow with the array's length.
+
+    Args:
+        chunks (iterable): UTF-8 byte chunks, e.g. ``response.iter_content(65536)``
+        key (str, optional): Read the array stored under this key of a top-level
+            object (e.g. "historical"); None expects a top-level array
+
+    Yields:
+        Each decoded element. Nothing is yielded if the document holds no such
+        array (e.g. an empty object or an error payload).
+
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    reader = _Reader(chunks)
+
+    if key is not None:
+        if reader.peek() != "{":
+            return
+        reader.pos += 1
+        while True:
+            char = reader.peek()
+            if char in ("}", ""):
+                return
+            if char == ",":
+                reader.pos += 1
+                continue
+            name = reader.value()
+            reader.expect(":")
+            if name == key:
+                break
+            reader.value()
+
+    if reader.peek() != "[":
+        return
+    reader.pos += 1
+    while True:
+        char = reader.peek()
+        if char == "]":
+            return
+        if char == "":
+            raise ValueError("JSON stream ended inside an array")
+        if char == ",":
+            reader.pos += 1
+            continue
+        yield reader.value()
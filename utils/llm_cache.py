@@ -0,0 +1,59 @@
+import json
+import hashlib
+import threading
+import logging
+from typing import Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from config import (
+    LLM_CACHE_MEMORY_ENTRIES, LLM_CACHE_PERSISTENT, LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES
+)
+from utils.cache import LRUCache, SQLiteCache, TieredCache
+
+logger = logging.getLogger(__name__)
+
+_llm_cache: Optional[TieredCache] = None
+_cache_lock = threading.Lock()
+
+def llm_cache_key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+                  response_model: Optional[Type[BaseModel]] = None) -> str:
+    """
+    Content-address an LLM request.
+
+    Args:
+        model (str): Model name
+        messages (list): Chat messages sent to the model
+        temperature (float): Sampling temperature
+        max_tokens (int): Completion token limit
+        response_model (type, optional): Pydantic model for structured calls; its JSON schema is part of the key
+
+    Returns:
+        str: SHA-256 hex digest identifying the request
+    """
+    request = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "response_schema": response_model.model_json_schema() if response_model is not None else None
+    }
+    encoded = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def get_llm_cache() -> TieredCache:
+    """
+    Get the process-wide LLM response cache.
+
+    Returns:
+        TieredCache: In-memory LRU tier, backed by SQLite when LLM_CACHE_PERSISTENT is set
+    """
+    global _llm_cache
+    if _llm_cache is None:
+        with _cache_lock:
+            if _llm_cache is None:
+                persistent = None
+                if LLM_CACHE_PERSISTENT:
+                    persistent = SQLiteCache(LLM_CACHE_PATH, table="llm_responses", max_bytes=LLM_CACHE_MAX_BYTES)
+                _llm_cache = TieredCache(LRUCache(max_entries=LLM_CACHE_MEMORY_ENTRIES), persistent)
+    return _llm_cache
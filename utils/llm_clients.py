@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import weakref
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import httpx
+import instructor
+from openai import AsyncOpenAI, OpenAI
+
+from config import OPENAI_API_KEY, OPENAI_BASE_URL, LLM_TIMEOUT, LLM_POOL_MAXSIZE
+from utils.cassette import get_cassette
+
+logger = logging.getLogger(__name__)
+
+class LLMClients(NamedTuple):
+    """An OpenAI client and its instructor wrapper, sharing one connection pool."""
+    standard: OpenAI
+    instructor: instructor.Instructor
+
+class AsyncLLMClients(NamedTuple):
+    """Async counterpart of LLMClients."""
+    standard: AsyncOpenAI
+    instructor: instructor.AsyncInstructor
+
+_clients: Dict[Tuple[str, str], LLMClients] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], AsyncLLMClients]]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=LLM_POOL_MAXSIZE, max_keepalive_connections=LLM_POOL_MAXSIZE)
+
+def _client_options(base_url: str, api_key: str) -> dict:
+    # Retries are handled by BaseAgent._complete, so the SDK's own retry loop is disabled
+    return {"api_key": api_key, "base_url": base_url, "timeout": LLM_TIMEOUT, "max_retries": 0}
+
+def _build(base_url: str, api_key: str, transport: Optional[httpx.BaseTransport] = None) -> LLMClients:
+    http_client = httpx.Client(limits=_limits(), timeout=LLM_TIMEOUT, transport=transport)
+    client = OpenAI(http_client=http_client, **_client_options(base_url, api_key))
+    # instructor wraps the client's create method without copying the client, so both share the pool
+    return LLMClients(client, instructor.from_openai(client))
+
+def _build_async(base_url: str, api_key: str, transport: Optional[httpx.AsyncBaseTransport] = None) -> AsyncLLMClients:
+    http_client = httpx.AsyncClient(limits=_limits(), timeout=LLM_TIMEOUT, transport=transport)
+    client = AsyncOpenAI(http_client=http_client, **_client_options(base_url, api_key))
+    return AsyncLLMClients(client, instructor.from_openai(client))
+
+def get_llm_clients(base_url: Optional[str] = None, api_key: Optional[str] = None) -> LLMClients:
+    """
+    Get the process-wide clients for an LLM endpoint.
+
+    Every caller with the same ``(base_url, api_key)`` gets the same clients
+    and therefore the same keep-alive connection pool (at most LLM_POOL_MAXSIZE
+    connections). While a cassette is active, fresh clients routed through it
+    are returned instead, so recordings never leak into the shared pool.
+
+    Args:
+        base_url (str, optional): API base URL, defaults to OPENAI_BASE_URL
+        api_key (str, optional): API key, defaults to OPENAI_API_KEY
+
+    Returns:
+        LLMClients: The standard client and its instructor-patched wrapper
+    """
+    key = (base_url or OPENAI_BASE_URL, api_key or OPENAI_API_KEY)
+
+    cassette = get_cassette()
+    if cassette is not None:
+        return _build(*key, transport=cassette.httpx_transport())
+
+    clients = _clients.get(key)
+    if clients is None:
+        with _clients_lock:
+            clients = _clients.get(key)
+            if clients is None:
+                clients = _clients[key] = _build(*key)
+                logger.debug(f"Created shared LLM clients for {key[0]} (pool={LLM_POOL_MAXSIZE})")
+    return clients
+
+def get_async_llm_clients(base_url: Optional[str] = None, api_key: Optional[str] = None) -> AsyncLLMClients:
+    """
+    Get the shared async clients for an LLM endpoint on the running event loop.
+
+    httpx async pools belong to the loop that opened them, so clients are
+    shared per ``(loop, base_url, api_key)``. Must be called from a coroutine.
+
+    Args:
+        base_url (str, optional): API base URL, defaults to OPENAI_BASE_URL
+        api_key (str, optional): API key, defaults to OPENAI_API_KEY
+
+    Returns:
+        AsyncLLMClients: The async client and its instructor-patched wrapper
+    """
+    key = (base_url or OPENAI_BASE_URL, api_key or OPENAI_API_KEY)
+
+    cassette = get_cassette()
+    if cassette is not None:
+        return _build_async(*key, transport=cassette.async_httpx_transport())
+
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        clients = per_loop.get(key)
+        if clients is None:
+            clients = per_loop[key] = _build_async(*key)
+        return clients
+
+def reset_llm_clients() -> None:
+    """Close the shared sync clients so the next call builds fresh pools (e.g. after fork)."""
+    with _clients_lock:
+        for clients in _clients.values():
+            clients.standard.close()
+        _clients.clear()
@@ -0,0 +1,675 @@
+"""
+Local stand-in for the Financial Modeling Prep v3 API.
+
+Serves the routes this project uses from a deterministic synthetic data
+generator: any ticker gets a stable company, statements, estimates and a
+daily price history, so data collection can be benchmarked over thousands
+of tickers without spending quota. Point the clients at it with
+``FMP_BASE_URL=http://127.0.0.1:8200/api/v3``.
+
+    python -m utils.mock_fmp_server --port 8200 --universe 5000 --calls-per-minute 300 --latency uniform:0.02,0.1
+"""
+import re
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+import logging
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+import numpy as np
+import pandas as pd
+
+from tools import technical_indicators
+from utils.mock_llm_server import parse_latency
+
+logger = logging.getLogger(__name__)
+
+SECTORS = [
+    ("Technology", "Software - Infrastructure"),
+    ("Technology", "Semiconductors"),
+    ("Healthcare", "Drug Manufacturers - General"),
+    ("Financial Services", "Banks - Diversified"),
+    ("Consumer Cyclical", "Specialty Retail"),
+    ("Industrials", "Aerospace & Defense"),
+    ("Energy", "Oil & Gas Integrated"),
+    ("Communication Services", "Internet Content & Information"),
+    ("Consumer Defensive", "Beverages - Non-Alcoholic"),
+    ("Utilities", "Utilities - Regulated Electric")
+]
+
+# First bar of every synthetic price history; histories are stable prefixes, so incremental syncs line up
+HISTORY_START = date(2010, 1, 4)
+
+# Price histories kept in memory per market, least recently used evicted first
+PRICE_FRAME_CACHE_SIZE = 512
+
+def universe(size: int) -> List[str]:
+    """Deterministic synthetic ticker symbols (``SYN0000``, ``SYN0001``, ...)."""
+    return [f"SYN{i:04d}" for i in range(size)]
+
+class SyntheticMarket:
+    """
+    Deterministic synthetic fundamentals and prices.
+
+    Every value is derived from the ticker symbol alone (and the current date
+    for the end of price histories), so repeated runs and separate server
+    processes serve identical data.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        # Per-instance memos, so they are released with the market
+        self._companies: Dict[str, Dict[str, Any]] = {}
+        self._frames: "OrderedDict[Tuple[str, date], pd.DataFrame]" = OrderedDict()
+        self._frames_lock = threading.Lock()
+
+    def _rng(self, ticker: str, salt: str = "") -> random.Random:
+        return random.Random(zlib.crc32(f"{self.seed}:{ticker}:{salt}".encode("utf-8")))
+
+    def company(self, ticker: str) -> Dict[str, Any]:
+        """Static traits of a company: size, growth, margins, leverage."""
+        traits = self._companies.get(ticker)
+        if traits is None:
+            # Deterministic per ticker, so a concurrent duplicate build is harmless
+            traits = self._companies[ticker] = self._company(ticker)
+        return traits
+
+    def _company(self, ticker: str) -> Dict[str, Any]:
+        rng = self._rng(ticker, "company")
+        sector, industry = SECTORS[rng.randrange(len(SECTORS))]
+        return {
+            "ticker": ticker,
+            "name": f"{ticker.title()} Holdings Inc.",
+            "sector": sector,
+            "industry": industry,
+            "revenue": rng.lognormvariate(21, 1.3),
+            "growth": rng.gauss(0.06, 0.08),
+            "gross_margin": rng.uniform(0.2, 0.75),
+            "operating_margin": rng.uniform(0.03, 0.35),
+            "tax_rate": rng.uniform(0.12, 0.25),
+            "asset_turnover": rng.uniform(0.3, 1.5),
+            "leverage": rng.uniform(0.2, 0.8),
+            "shares": rng.lognormvariate(19.5, 1.0),
+            "beta": round(rng.uniform(0.5, 1.8), 2),
+            "price": rng.lognormvariate(4, 0.8),
+            "volatility": rng.uniform(0.15, 0.6),
+            "drift": rng.gauss(0.07, 0.05),
+            "employees": int(rng.lognormvariate(9, 1.5))
+        }
+
+    def _cik(self, ticker: str) -> str:
+        return f"{zlib.crc32(ticker.encode('utf-8')) % 10**10:010d}"
+
+    def profile(self, ticker: str) -> List[Dict[str, Any]]:
+        c = self.company(ticker)
+        quote = self.quote(ticker)[0]
+        return [{
+            "symbol": ticker,
+            "price": quote["price"],
+            "beta": c["beta"],
+            "volAvg": quote["avgVolume"],
+            "mktCap": quote["marketCap"],
+            "lastDiv": round(quote["price"] * 0.01, 2),
+            "range": f"{quote['yearLow']}-{quote['yearHigh']}",
+            "changes": quote["change"],
+            "companyName": c["name"],
+            "currency": "USD",
+            "cik": self._cik(ticker),
+            "isin": f"US{self._cik(ticker)}",
+            "exchange": "NASDAQ Global Select",
+            "exchangeShortName": "NASDAQ",
+            "industry": c["industry"],
+            "website": f"https://www.{ticker.lower()}.example.com",
+            "description": f"{c['name']} is a synthetic company in the {c['industry']} industry used for local benchmarks.",
+            "ceo": "Jane Doe",
+            "sector": c["sector"],
+            "country": "US",
+            "fullTimeEmployees": str(c["employees"]),
+            "ipoDate": "2000-01-03",
+            "isEtf": False,
+            "isActivelyTrading": True
+        }]
+
+    def _periods(self, period: str, limit: int) -> List[Tuple[str, str, int, float]]:
+        """(date, period label, calendar year, revenue scale) of the newest ``limit`` reporting periods."""
+        today = date.today()
+        periods = []
+        if period == "quarter":
+            quarter_ends = [(3, 31), (6, 30), (9, 30), (12, 31)]
+            year, index = today.year, (today.month - 1) // 3 - 1
+            for i in range(limit):
+                if index < 0:
+                    year, index = year - 1, 3
+                month, day = quarter_ends[index]
+                periods.append((date(year, month, day).isoformat(), f"Q{index + 1}", year, 0.25))
+                index -= 1
+        else:
+            for i in range(limit):
+                year = today.year - 1 - i
+                periods.append((date(year, 12, 31).isoformat(), "FY", year, 1.0))
+        return periods
+
+    def _fundamentals(self, ticker: str, period: str, limit: int) -> List[Dict[str, float]]:
+        """Core figures per period, newest first, consistent across all statements."""
+        c = self.company(ticker)
+        rows = []
+        for day, label, year, scale in self._periods(period, limit):
+            rng = self._rng(ticker, day)
+            years_back = date.today().year - year
+            revenue = c["revenue"] * scale * (1 + c["growth"]) ** (-years_back) * rng.uniform(0.95, 1.05)
+            gross = revenue * c["gross_margin"] * rng.uniform(0.97, 1.03)
+            operating = revenue * c["operating_margin"] * rng.uniform(0.9, 1.1)
+            interest = revenue * 0.01
+            pretax = operating - interest
+            net = pretax * (1 - c["tax_rate"])
+            assets = revenue / scale / c["asset_turnover"]
+            liabilities = assets * c["leverage"]
+            rows.append({
+                "date": day, "period": label, "calendarYear": str(year), "revenue": revenue,
+                "grossProfit": gross, "operatingIncome": operating, "interestExpense": interest,
+                "incomeBeforeTax": pretax, "netIncome": net, "assets": assets, "liabilities": liabilities,
+                "depreciation": revenue * 0.04, "capex": revenue * rng.uniform(0.03, 0.08), "rng": rng
+            })
+        return rows
+
+    def _statement_base(self, ticker: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "date": row["date"],
+            "symbol": ticker,
+            "reportedCurrency": "USD",
+            "cik": self._cik(ticker),
+            "fillingDate": row["date"],
+            "acceptedDate": f"{row['date']} 16:30:00",
+            "calendarYear": row["calendarYear"],
+            "period": row["period"]
+        }
+
+    def income_statement(self, ticker: str, period: str = "annual", limit: int = 5) -> List[Dict[str, Any]]:
+        c = self.company(ticker)
+        statements = []
+        for row in self._fundamentals(ticker, period, limit):
+            revenue, gross, operating = row["revenue"], row["grossProfit"], row["operatingIncome"]
+            statements.append({
+                **self._statement_base(ticker, row),
+                "revenue": round(revenue),
+                "costOfRevenue": round(revenue - gross),
+                "grossProfit": round(gross),
+                "grossProfitRatio": gross / revenue,
+                "researchAndDevelopmentExpenses": round((gross - operating) * 0.4),
+                "sellingGeneralAndAdministrativeExpenses": round((gross - operating) * 0.6),
+                "operatingExpenses": round(gross - operating),
+                "interestExpense": round(row["interestExpense"]),
+                "depreciationAndAmortization": round(row["depreciation"]),
+                "ebitda": round(operating + row["depreciation"]),
+                "ebitdaratio": (operating + row["depreciation"]) / revenue,
+                "operatingIncome": round(operating),
+                "operatingIncomeRatio": operating / revenue,
+                "incomeBeforeTax": round(row["incomeBeforeTax"]),
+                "incomeTaxExpense": round(row["incomeBeforeTax"] - row["netIncome"]),
+                "netIncome": round(row["netIncome"]),
+                "netIncomeRatio": row["netIncome"] / revenue,
+                "eps": round(row["netIncome"] / c["shares"], 2),
+                "epsdiluted": round(row["netIncome"] / (c["shares"] * 1.01), 2),
+                "weightedAverageShsOut": round(c["shares"]),
+                "weightedAverageShsOutDil": round(c["shares"] * 1.01)
+            })
+        return statements
+
+    def balance_sheet(self, ticker: str, period: str = "annual", limit: int = 5) -> List[Dict[str, Any]]:
+        statements = []
+        for row in self._fundamentals(ticker, period, limit):
+            assets, liabilities, rng = row["assets"], row["liabilities"], row["rng"]
+            current_assets = assets * rng.uniform(0.25, 0.45)
+            current_liabilities = liabilities * rng.uniform(0.3, 0.5)
+            cash = current_assets * 0.4
+            debt = liabilities * 0.5
+            statements.append({
+                **self._statement_base(ticker, row),
+                "cashAndCashEquivalents": round(cash),
+                "shortTermInvestments": round(current_assets * 0.1),
+                "netReceivables": round(current_assets * 0.25),
+                "inventory": round(current_assets * 0.2),
+                "totalCurrentAssets": round(current_assets),
+                "propertyPlantEquipmentNet": round(assets * 0.3),
+                "goodwill": round(assets * 0.1),
+                "totalNonCurrentAssets": round(assets - current_assets),
+                "totalAssets": round(assets),
+                "accountPayables": round(current_liabilities * 0.5),
+                "shortTermDebt": round(debt * 0.1),
+                "totalCurrentLiabilities": round(current_liabilities),
+                "longTermDebt": round(debt * 0.9),
+                "totalNonCurrentLiabilities": round(liabilities - current_liabilities),
+                "totalLiabilities": round(liabilities),
+                "retainedEarnings": round((assets - liabilities) * 0.6),
+                "totalStockholdersEquity": round(assets - liabilities),
+                "totalEquity": round(assets - liabilities),
+                "totalLiabilitiesAndStockholdersEquity": round(assets),
+                "totalDebt": round(debt),
+                "netDebt": round(debt - cash)
+            })
+        return statements
+
+    def cash_flow(self, ticker: str, period: str = "annual", limit: int = 5) -> List[Dict[str, Any]]:
+        statements = []
+        for row in self._fundamentals(ticker, period, limit):
+            operating = row["netIncome"] + row["depreciation"]
+            dividends = max(0.0, row["netIncome"] * 0.3)
+            statements.append({
+                **self._statement_base(ticker, row),
+                "netIncome": round(row["netIncome"]),
+                "depreciationAndAmortization": round(row["depreciation"]),
+                "stockBasedCompensation": round(row["revenue"] * 0.01),
+                "netCashProvidedByOperatingActivities": round(operating),
+                "investmentsInPropertyPlantAndEquipment": -round(row["capex"]),
+                "netCashUsedForInvestingActivites": -round(row["capex"] * 1.2),
+                "debtRepayment": -round(row["liabilities"] * 0.02),
+                "dividendsPaid": -round(dividends),
+                "netCashUsedProvidedByFinancingActivities": -round(dividends + row["liabilities"] * 0.02),
+                "netChangeInCash": round(operating - row["capex"] * 1.2 - dividends - row["liabilities"] * 0.02),
+                "operatingCashFlow": round(operating),
+                "capitalExpenditure": -round(row["capex"]),
+                "freeCashFlow": round(operating - row["capex"])
+            })
+        return statements
+
+    def key_metrics(self, ticker: str, period: str = "annual", limit: int = 5) -> List[Dict[str, Any]]:
+        c = self.company(ticker)
+        price = self.quote(ticker)[0]["price"]
+        market_cap = price * c["shares"]
+        metrics = []
+        for income, balance, cash in zip(self.income_statement(ticker, period, limit),
+                                         self.balance_sheet(ticker, period, limit),
+                                         self.cash_flow(ticker, period, limit)):
+            equity = balance["totalStockholdersEquity"]
+            metrics.append({
+                "symbol": ticker, "date": income["date"], "calendarYear": income["calendarYear"], "period": income["period"],
+                "revenuePerShare": income["revenue"] / c["shares"],
+                "netIncomePerShare": income["netIncome"] / c["shares"],
+                "operatingCashFlowPerShare": cash["operatingCashFlow"] / c["shares"],
+                "freeCashFlowPerShare": cash["freeCashFlow"] / c["shares"],
+                "bookValuePerShare": equity / c["shares"],
+                "marketCap": market_cap,
+                "enterpriseValue": market_cap + balance["netDebt"],
+                "peRatio": market_cap / income["netIncome"] if income["netIncome"] else None,
+                "priceToSalesRatio": market_cap / income["revenue"],
+                "pbRatio": market_cap / equity if equity else None,
+                "evToSales": (market_cap + balance["netDebt"]) / income["revenue"],
+                "debtToEquity": balance["totalDebt"] / equity if equity else None,
+                "currentRatio": balance["totalCurrentAssets"] / balance["totalCurrentLiabilities"],
+                "dividendYield": -cash["dividendsPaid"] / market_cap,
+                "roe": income["netIncome"] / equity if equity else None,
+                "roic": income["operatingIncome"] * 0.8 / (equity + balance["totalDebt"])
+            })
+        return metrics
+
+    def ratios(self, ticker: str, period: str = "annual", limit: int = 5) -> List[Dict[str, Any]]:
+        ratios = []
+        for income, balance, metrics in zip(self.income_statement(ticker, period, limit),
+                                            self.balance_sheet(ticker, period, limit),
+                                            self.key_metrics(ticker, period, limit)):
+            equity = balance["totalStockholdersEquity"]
+            ratios.append({
+                "symbol": ticker, "date": income["date"], "calendarYear": income["calendarYear"], "period": income["period"],
+                "currentRatio": metrics["currentRatio"],
+                "quickRatio": (balance["totalCurrentAssets"] - balance["inventory"]) / balance["totalCurrentLiabilities"],
+                "cashRatio": balance["cashAndCashEquivalents"] / balance["totalCurrentLiabilities"],
+                "grossProfitMargin": income["grossProfitRatio"],
+                "operatingProfitMargin": income["operatingIncomeRatio"],
+                "netProfitMargin": income["netIncomeRatio"],
+                "returnOnAssets": income["netIncome"] / balance["totalAssets"],
+                "returnOnEquity": income["netIncome"] / equity if equity else None,
+                "debtRatio": balance["totalLiabilities"] / balance["totalAssets"],
+                "debtEquityRatio": metrics["debtToEquity"],
+                "interestCoverage": income["operatingIncome"] / income["interestExpense"] if income["interestExpense"] else None,
+                "assetTurnover": income["revenue"] / balance["totalAssets"],
+                "priceEarningsRatio": metrics["peRatio"],
+                "priceToBookRatio": metrics["pbRatio"],
+                "priceToSalesRatio": metrics["priceToSalesRatio"],
+                "dividendYield": metrics["dividendYield"]
+            })
+        return ratios
+
+    def analyst_estimates(self, ticker: str, period: str = "annual", limit: int = 5) -> List[Dict[str, Any]]:
+        c = self.company(ticker)
+        latest = self._fundamentals(ticker, "annual", 1)[0]
+        estimates = []
+        for i in range(limit, 0, -1):
+            revenue = latest["revenue"] * (1 + c["growth"]) ** i
+            net = latest["netIncome"] * (1 + c["growth"]) ** i
+            estimates.append({
+                "symbol": ticker,
+                "date": date(int(latest["calendarYear"]) + i, 12, 31).isoformat(),
+                "estimatedRevenueLow": round(revenue * 0.93), "estimatedRevenueHigh": round(revenue * 1.07),
+                "estimatedRevenueAvg": round(revenue),
+                "estimatedEbitdaAvg": round(revenue * c["operating_margin"] * 1.15),
+                "estimatedNetIncomeLow": round(net * 0.9), "estimatedNetIncomeHigh": round(net * 1.1),
+                "estimatedNetIncomeAvg": round(net),
+                "estimatedEpsLow": round(net * 0.9 / c["shares"], 2), "estimatedEpsHigh": round(net * 1.1 / c["shares"], 2),
+                "estimatedEpsAvg": round(net / c["shares"], 2),
+                "numberAnalystEstimatedRevenue": 12, "numberAnalystsEstimatedEps": 14
+            })
+        return estimates
+
+    def _price_frame(self, ticker: str, end: date) -> pd.DataFrame:
+        """Ascending daily OHLCV from HISTORY_START to ``end`` (a geometric random walk)."""
+        key = (ticker, end)
+        with self._frames_lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                return frame
+        frame = self._build_price_frame(ticker, end)
+        with self._frames_lock:
+            self._frames[key] = frame
+            while len(self._frames) > PRICE_FRAME_CACHE_SIZE:
+                self._frames.popitem(last=False)
+        return frame
+
+    def _build_price_frame(self, ticker: str, end: date) -> pd.DataFrame:
+        c = self.company(ticker)
+        days = np.arange(np.datetime64(HISTORY_START), np.datetime64(end) + 1, dtype="datetime64[D]")
+        days = days[np.is_busday(days)]
+
+        # Draw a fixed-length path so the history for a date never depends on ``end``
+        total = int(np.busday_count(np.datetime64(HISTORY_START), np.datetime64("2040-01-01")))
+        rng = np.random.default_rng(zlib.crc32(f"{self.seed}:{ticker}:prices".encode("utf-8")))
+        returns = rng.normal(c["drift"] / 252, c["volatility"] / np.sqrt(252), total)[:len(days)]
+        spread = np.abs(rng.normal(0, c["volatility"] / np.sqrt(252) / 2, total))[:len(days)]
+        volume_noise = rng.lognormal(0, 0.3, total)[:len(days)]
+
+        close = c["price"] * np.exp(np.cumsum(returns))
+        open_ = np.concatenate([[close[0]], close[:-1]]) if len(close) else close
+        high = np.maximum(open_, close) * (1 + spread)
+        low = np.minimum(open_, close) * (1 - spread)
+        volume = np.round(c["shares"] * 0.004 * volume_noise)
+        return pd.DataFrame({
+            "open": open_.round(2), "high": high.round(2), "low": low.round(2), "close": close.round(2), "volume": volume
+        }, index=pd.DatetimeIndex(days.astype("datetime64[ns]"), name="date"))
+
+    def prices(self, ticker: str) -> pd.DataFrame:
+        return self._price_frame(ticker, date.today())
+
+    def historical(self, ticker: str, start: str = None, end: str = None, timeseries: int = None) -> Dict[str, Any]:
+        frame = self.prices(ticker)
+        if start:
+            frame = frame[frame.index >= pd.Timestamp(start)]
+        if end:
+            frame = frame[frame.index <= pd.Timestamp(end)]
+        if timeseries:
+            frame = frame.iloc[-int(timeseries):]
+
+        previous = frame["close"].shift(1).fillna(frame["open"])
+        rows = []
+        for day, bar, prev in zip(frame.index.strftime("%Y-%m-%d")[::-1], frame.iloc[::-1].itertuples(), previous.iloc[::-1]):
+            change = round(bar.close - bar.open, 2)
+            rows.append({
+                "date": day, "open": bar.open, "high": bar.high, "low": bar.low, "close": bar.close,
+                "adjClose": bar.close, "volume": bar.volume, "unadjustedVolume": bar.volume,
+                "change": change, "changePercent": round(change / bar.open * 100, 4),
+                "vwap": round((bar.high + bar.low + bar.close) / 3, 4),
+                "label": pd.Timestamp(day).strftime("%B %d, %y"),
+                "changeOverTime": round(change / bar.open, 6)
+            })
+        return {"symbol": ticker, "historical": rows}
+
+    def quote(self, ticker: str) -> List[Dict[str, Any]]:
+        c = self.company(ticker)
+        frame = self.prices(ticker)
+        last, previous = frame.iloc[-1], frame.iloc[-2]
+        year = frame.iloc[-252:]
+        return [{
+            "symbol": ticker,
+            "name": c["name"],
+            "price": last["close"],
+            "changesPercentage": round((last["close"] / previous["close"] - 1) * 100, 4),
+            "change": round(last["close"] - previous["close"], 2),
+            "dayLow": last["low"],
+            "dayHigh": last["high"],
+            "yearHigh": year["high"].max(),
+            "yearLow": year["low"].min(),
+            "marketCap": round(last["close"] * c["shares"]),
+            "priceAvg50": round(frame["close"].iloc[-50:].mean(), 2),
+            "priceAvg200": round(frame["close"].iloc[-200:].mean(), 2),
+            "exchange": "NASDAQ",
+            "volume": last["volume"],
+            "avgVolume": round(frame["volume"].iloc[-50:].mean()),
+            "open": last["open"],
+            "previousClose": previous["close"],
+            "sharesOutstanding": round(c["shares"]),
+            "timestamp": int(time.time())
+        }]
+
+    def technical_indicator(self, ticker: str, indicator: str, period: int = 14) -> List[Dict[str, Any]]:
+        """Indicator rows, newest first, laid out like FMP's: ``date``, the bar's OHLCV, then the values."""
+        frame = self.prices(ticker)
+        rows = technical_indicators.indicator_frame_to_records(
+            technical_indicators.compute_indicator_frame(frame, indicator, period)
+        )
+        bars = frame.iloc[::-1]
+        by_date = dict(zip(bars.index.strftime("%Y-%m-%d"), bars.to_dict("records")))
+        return [{"date": row["date"], **by_date[row["date"]], **row} for row in rows]
+
+class MockFMPServer:
+    """
+    HTTP server for the FMP v3 routes used by the data collection code.
+
+    Requests are delayed by ``latency`` and admitted by a token bucket of
+    ``calls_per_minute`` (with ``burst``); requests over the limit, and a
+    ``rate_limit_probability`` fraction of all requests, get FMP's 429
+    "Limit Reach" response with Retry-After. ``stock/list`` returns a
+    universe of ``universe_size`` synthetic tickers, but every route serves
+    any symbol.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "fixed:0",
+                 calls_per_minute: float = 0.0, burst: int = 10, rate_limit_probability: float = 0.0,
+                 retry_after: float = 1.0, universe_size: int = 1000, require_api_key: bool = False,
+                 seed: int = 0):
+        """
+        Initialize the server (call ``start`` to serve).
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind; 0 picks a free one
+            latency (str): Response delay distribution (see ``parse_latency``)
+            calls_per_minute (float): Sustained request rate before 429s; 0 is unlimited
+            burst (int): Requests admitted back to back after an idle period
+            rate_limit_probability (float): Fraction of requests answered with 429 regardless of rate
+            retry_after (float): Retry-After seconds sent with 429s
+            universe_size (int): Tickers listed by ``stock/list``
+            require_api_key (bool): Answer 401 to requests without ``apikey``
+            seed (int): Seed of the synthetic market and of failure injection
+        """
+        self.market = SyntheticMarket(seed)
+        self.latency = parse_latency(latency)
+        self.calls_per_minute = calls_per_minute
+        self.burst = max(1, burst)
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self.universe_size = universe_size
+        self.require_api_key = require_api_key
+        self._rng = random.Random(seed)
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "served": 0, "rate_limited": 0, "not_found": 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as ``FMP_BASE_URL``."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v3"
+
+    def start(self) -> "MockFMPServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-fmp-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Mock FMP server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockFMPServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _admit(self) -> Tuple[bool, float]:
+        """Take a token; return (admitted, response delay)."""
+        with self._lock:
+            self._stats["requests"] += 1
+            delay = self.latency(self._rng)
+            limited = self._rng.random() < self.rate_limit_probability
+            if self.calls_per_minute and not limited:
+                now = time.monotonic()
+                self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) * self.calls_per_minute / 60)
+                self._refilled_at = now
+                limited = self._tokens < 1
+                if not limited:
+                    self._tokens -= 1
+            self._stats["rate_limited" if limited else "served"] += 1
+            return not limited, delay
+
+    def route(self, path: str, params: Dict[str, str]) -> Optional[Any]:
+        """
+        Resolve an API path (after ``/api/v3/``) to a payload.
+
+        Returns:
+            The JSON payload, or None for an unknown route
+        """
+        market = self.market
+        period = params.get("period", "annual")
+        limit = int(params.get("limit", 5) or 5)
+        parts = [p for p in path.split("/") if p]
+
+        if parts == ["stock", "list"]:
+            return [{"symbol": t, "name": market.company(t)["name"], "exchangeShortName": "NASDAQ", "type": "stock"}
+                    for t in universe(self.universe_size)]
+        if len(parts) < 2:
+            return None
+
+        ticker = parts[-1].upper()
+        route = "/".join(parts[:-1])
+        statements = {
+            "income-statement": market.income_statement,
+            "balance-sheet-statement": market.balance_sheet,
+            "cash-flow-statement": market.cash_flow,
+            "key-metrics": market.key_metrics,
+            "ratios": market.ratios,
+            "analyst-estimates": market.analyst_estimates
+        }
+        if route in statements:
+            return statements[route](ticker, period, limit)
+        if route == "profile":
+            return market.profile(ticker)
+        if route == "quote":
+            return [q for t in ticker.split(",") for q in market.quote(t)]
+        if route == "historical-price-full":
+            return market.historical(ticker, params.get("from"), params.get("to"), params.get("timeseries"))
+
+        # technical_indicator/daily/{t}?type=rsi, or the indicator in the path (technical_indicator/daily/rsi/{t})
+        match = re.fullmatch(r"technical[_-]indicator/daily(?:/(\w+))?", route)
+        if match:
+            indicator = (match.group(1) or params.get("type", "sma")).lower()
+            if not technical_indicators.is_supported(indicator):
+                return {"Error Message": f"Unsupported indicator {indicator}"}
+            return market.technical_indicator(ticker, indicator, int(params.get("period", 14)))
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send_json(self, status: int, payload: Any, headers: Dict[str, str] = None) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = dict(parse_qsl(parts.query))
+                if not parts.path.startswith("/api/v3/"):
+                    self._send_json(404, {"Error Message": f"Unknown route {parts.path}"})
+                    return
+                if server.require_api_key and not params.get("apikey"):
+                    self._send_json(401, {"Error Message": "Invalid API KEY. Please retry or visit our documentation."})
+                    return
+
+                admitted, delay = server._admit()
+                time.sleep(delay)
+                if not admitted:
+                    self._send_json(429, {"Error Message": "Limit Reach . Please upgrade your plan or visit our documentation."},
+                                    {"Retry-After": f"{server.retry_after:g}"})
+                    return
+
+                try:
+                    payload = server.route(parts.path[len("/api/v3/"):], params)
+                except (ValueError, KeyError) as e:
+                    self._send_json(400, {"Error Message": str(e)})
+                    return
+                if payload is None:
+                    with server._lock:
+                        server._stats["not_found"] += 1
+                    self._send_json(404, {"Error Message": f"Unknown route {parts.path}"})
+                    return
+                self._send_json(200, payload)
+
+        return Handler
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Financial Modeling Prep stand-in with synthetic data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency", default="fixed:0", help="Response delay, e.g. fixed:0.05, uniform:0.02,0.2, lognormal:-3,0.5")
+    parser.add_argument("--calls-per-minute", type=float, default=0.0, help="Sustained rate before 429s; 0 is unlimited")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--universe", type=int, default=1000, help="Tickers listed by stock/list")
+    parser.add_argument("--require-api-key", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockFMPServer(
+        host=args.host, port=args.port, latency=args.latency, calls_per_minute=args.calls_per_minute,
+        burst=args.burst, rate_limit_probability=args.rate_limit_probability, retry_after=args.retry_after,
+        universe_size=args.universe, require_api_key=args.require_api_key, seed=args.seed
+    )
+    print(f"Serving FMP API at {server.url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""
+Local OpenAI-compatible stand-in for load testing without network access.
+
+Serves ``/v1/chat/completions`` (plain, streaming and instructor tool calls)
+and ``/v1/models`` with modeled time-to-first-token, generation throughput,
+rate limiting and canned or templated payloads. Point an agent at it with
+``base_url=server.url`` (or ``OPENAI_BASE_URL``).
+
+    python -m utils.mock_llm_server --port 8100 --latency lognormal:-1.5,0.5 --tokens-per-second 60
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution.
+
+    Args:
+        spec (str): ``fixed:S``, ``uniform:LO,HI``, ``normal:MEAN,STD`` or
+            ``lognormal:MU,SIGMA`` (seconds; normal samples are clipped at 0)
+
+    Returns:
+        callable: Draws a delay in seconds from a ``random.Random``
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] if args else []
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(*values)
+    if kind == "normal" and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(*values))
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(*values)
+    raise ValueError(f"Invalid latency distribution: {spec}")
+
+def count_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4) if text else 0
+
+def split_tokens(text: str) -> List[str]:
+    """Split text into streamable pieces of roughly one token each."""
+    return re.findall(r"\S{1,4}\s*|\s+", text)
+
+def sample_from_schema(schema: Dict[str, Any], defs: Dict[str, Any] = None, name: str = "value",
+                       rng: Optional[random.Random] = None) -> Any:
+    """
+    Generate a value that validates against a JSON schema.
+
+    Args:
+        schema (dict): JSON schema, as sent by instructor for a Pydantic model
+        defs (dict, optional): ``$defs`` of the root schema
+        name (str): Property name, used to make strings readable
+        rng (random.Random, optional): Source of numbers
+
+    Returns:
+        A JSON-compatible value
+    """
+    rng = rng or random.Random(0)
+    defs = defs if defs is not None else schema.get("$defs", {})
+
+    if "$ref" in schema:
+        return sample_from_schema(defs[schema["$ref"].split("/")[-1]], defs, name, rng)
+    if "default" in schema and schema["default"] is not None:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return sample_from_schema(options[0], defs, name, rng)
+
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return {key: sample_from_schema(sub, defs, key, rng) for key, sub in properties.items()}
+    if kind == "array":
+        count = max(schema.get("minItems", 2), 1)
+        return [sample_from_schema(schema.get("items", {}), defs, name, rng) for _ in range(count)]
+    if kind == "integer":
+        return rng.randint(schema.get("minimum", 1), schema.get("maximum", 100))
+    if kind == "number":
+        return round(rng.uniform(schema.get("minimum", 0.0), schema.get("maximum", 100.0)), 2)
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    return f"Mock {name.replace('_', ' ')}"
+
+class _SafeFormat(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+class MockLLMServer:
+    """
+    OpenAI-compatible chat completions server with modeled timing.
+
+    Each request waits for a time-to-first-token drawn from ``latency``, then
+    emits the completion at ``tokens_per_second`` (streamed chunk by chunk,
+    or all at once when the full duration has passed). Requests beyond
+    ``max_concurrency`` and a ``rate_limit_probability`` fraction of requests
+    get 429 with Retry-After; ``error_probability`` of them get 500.
+
+    Content comes from the first rule in ``responses`` whose ``match`` regex
+    is found in the last user message; ``content`` is a template with
+    ``{prompt}``, ``{model}``, ``{system}`` and ``{n}`` (request number).
+    Requests carrying tools (instructor) or a JSON schema ``response_format``
+    get arguments generated from the schema unless a rule supplies ``json``.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "fixed:0",
+                 tokens_per_second: float = 0.0, max_concurrency: int = 0,
+                 rate_limit_probability: float = 0.0, error_probability: float = 0.0,
+                 retry_after: float = 1.0, responses: List[Dict[str, Any]] = None,
+                 default_content: str = "Mock response from {model}.", seed: int = None):
+        """
+        Initialize the server (call ``start`` to serve).
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind; 0 picks a free one
+            latency (str): Time-to-first-token distribution (see ``parse_latency``)
+            tokens_per_second (float): Generation throughput; 0 is instant
+            max_concurrency (int): Requests served at once before answering 429; 0 is unlimited
+            rate_limit_probability (float): Fraction of requests answered with 429
+            error_probability (float): Fraction of requests answered with 500
+            retry_after (float): Retry-After seconds sent with 429s
+            responses (list, optional): Rules ``{"match", "content"}`` or ``{"match", "json"}``
+            default_content (str): Template used when no rule matches
+            seed (int, optional): Seed for reproducible latencies and failures
+        """
+        self.latency = parse_latency(latency)
+        self.tokens_per_second = tokens_per_second
+        self.max_concurrency = max_concurrency
+        self.rate_limit_probability = rate_limit_probability
+        self.error_probability = error_probability
+        self.retry_after = retry_after
+        self.responses = responses or []
+        self.default_content = default_content
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "completed": 0, "rate_limited": 0, "errors": 0,
+                       "in_flight": 0, "max_in_flight": 0, "completion_tokens": 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass as ``base_url`` to OpenAI clients."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-llm-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Mock LLM server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Request counters, including the peak number of concurrent requests."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _admit(self) -> Optional[int]:
+        """Count a request in; return an error status to answer with instead, if any."""
+        with self._lock:
+            self._stats["requests"] += 1
+            draw = self._rng.random()
+            if self.max_concurrency and self._stats["in_flight"] >= self.max_concurrency:
+                status = 429
+            elif draw < self.rate_limit_probability:
+                status = 429
+            elif draw < self.rate_limit_probability + self.error_probability:
+                status = 500
+            else:
+                self._stats["in_flight"] += 1
+                self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._stats["in_flight"])
+                return None
+            self._stats["rate_limited" if status == 429 else "errors"] += 1
+            return status
+
+    def _release(self, completion_tokens: int) -> None:
+        with self._lock:
+            self._stats["in_flight"] -= 1
+            self._stats["completed"] += 1
+            self._stats["completion_tokens"] += completion_tokens
+
+    def _first_token_delay(self) -> float:
+        with self._lock:
+            return self.latency(self._rng)
+
+    def _payload(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Decide the assistant content or tool call for a request."""
+        messages = body.get("messages", [])
+        prompt = next((str(m.get("content", "")) for m in reversed(messages) if m.get("role") == "user"), "")
+        system = next((str(m.get("content", "")) for m in messages if m.get("role") == "system"), "")
+        with self._lock:
+            number = self._stats["requests"]
+
+        rule = next((r for r in self.responses if re.search(r.get("match", ""), prompt)), {})
+        tools = body.get("tools") or []
+        response_format = body.get("response_format") or {}
+
+        if tools:
+            function = tools[0].get("function", {})
+            arguments = rule.get("json") or sample_from_schema(function.get("parameters", {}), name=function.get("name", "value"))
+            return {"tool": function.get("name"), "arguments": json.dumps(arguments)}
+        if response_format.get("type") == "json_schema":
+            schema = response_format.get("json_schema", {}).get("schema", {})
+            return {"content": json.dumps(rule.get("json") or sample_from_schema(schema))}
+        if "json" in rule:
+            return {"content": json.dumps(rule["json"])}
+
+        template = rule.get("content", self.default_content)
+        values = _SafeFormat(prompt=prompt, system=system, model=body.get("model", "mock"), n=number)
+        return {"content": template.format_map(values)}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/v1/models":
+                    self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]})
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown route {self.path}", "type": "invalid_request_error"}})
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self._send_json(404, {"error": {"message": f"Unknown route {self.path}", "type": "invalid_request_error"}})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+                    return
+
+                status = server._admit()
+                if status == 429:
+                    self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                                    {"Retry-After": f"{server.retry_after:g}"})
+                    return
+                if status is not None:
+                    self._send_json(status, {"error": {"message": "Mock server error", "type": "server_error"}})
+                    return
+
+                completion_tokens = 0
+                try:
+                    payload = server._payload(body)
+                    text = payload.get("content") or payload.get("arguments", "")
+                    completion_tokens = count_tokens(text)
+                    time.sleep(server._first_token_delay())
+                    if body.get("stream"):
+                        self._stream(body, payload)
+                    else:
+                        if server.tokens_per_second:
+                            time.sleep(completion_tokens / server.tokens_per_second)
+                        self._send_json(200, self._completion(body, payload, completion_tokens))
+                finally:
+                    server._release(completion_tokens)
+
+            def _message(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+                if "tool" in payload:
+                    return {"role": "assistant", "content": None, "tool_calls": [{
+                        "id": "call_mock", "type": "function",
+                        "function": {"name": payload["tool"], "arguments": payload["arguments"]}
+                    }]}
+                return {"role": "assistant", "content": payload["content"]}
+
+            def _completion(self, body: Dict[str, Any], payload: Dict[str, Any], completion_tokens: int) -> Dict[str, Any]:
+                prompt_tokens = count_tokens(json.dumps(body.get("messages", [])))
+                return {
+                    "id": f"chatcmpl-mock-{time.time_ns()}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "mock"),
+                    "choices": [{
+                        "index": 0,
+                        "message": self._message(payload),
+                        "finish_reason": "tool_calls" if "tool" in payload else "stop"
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens
+                    }
+                }
+
+            def _stream(self, body: Dict[str, Any], payload: Dict[str, Any]) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                base = {"id": f"chatcmpl-mock-{time.time_ns()}", "object": "chat.completion.chunk",
+                        "created": int(time.time()), "model": body.get("model", "mock")}
+
+                def emit(delta: Dict[str, Any], finish_reason: str = None) -> None:
+                    chunk = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                pieces = split_tokens(payload.get("content") or payload.get("arguments", ""))
+                delay = 1.0 / server.tokens_per_second if server.tokens_per_second else 0.0
+                if "tool" in payload:
+                    emit({"role": "assistant", "tool_calls": [{"index": 0, "id": "call_mock", "type": "function",
+                                                               "function": {"name": payload["tool"], "arguments": ""}}]})
+                    for piece in pieces:
+                        time.sleep(delay)
+                        emit({"tool_calls": [{"index": 0, "function": {"arguments": piece}}]})
+                    emit({}, "tool_calls")
+                else:
+                    emit({"role": "assistant", "content": ""})
+                    for piece in pieces:
+                        time.sleep(delay)
+                        emit({"content": piece})
+                    emit({}, "stop")
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="fixed:0", help="Time to first token, e.g. fixed:0.3, uniform:0.1,0.8, lognormal:-1.5,0.5")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Generation throughput; 0 is instant")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="Concurrent requests before 429; 0 is unlimited")
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--error-probability", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--responses", help="JSON file with a list of {match, content|json} rules")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        with open(args.responses) as f:
+            responses = json.load(f)
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockLLMServer(
+        host=args.host, port=args.port, latency=args.latency, tokens_per_second=args.tokens_per_second,
+        max_concurrency=args.max_concurrency, rate_limit_probability=args.rate_limit_probability,
+        error_probability=args.error_probability, retry_after=args.retry_after,
+        responses=responses, seed=args.seed
+    )
+    print(f"Serving OpenAI-compatible API at {server.url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import os
+import time
+import sqlite3
+import threading
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """Raised when a call cannot be admitted within the limiter's maximum wait."""
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread and process using the same database file.
+
+    Tokens refill continuously at ``calls_per_minute / 60`` per second up to
+    ``burst``; each call takes one. An optional ``daily_quota`` caps the calls
+    per UTC day. Callers block until a token is available, so bursts from
+    concurrent workers are queued instead of turning into HTTP 429s. The
+    bucket lives in SQLite and is updated inside an immediate transaction,
+    which serializes parallel batch workers on one budget.
+    """
+
+    def __init__(self, path: str, name: str, calls_per_minute: float, burst: int = 10,
+                 daily_quota: Optional[int] = None, max_wait: Optional[float] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            path (str): Path of the SQLite database holding the bucket
+            name (str): Bucket name; limiters with the same path and name share a budget
+            calls_per_minute (float): Sustained call rate
+            burst (int): Calls allowed back to back after an idle period
+            daily_quota (int, optional): Maximum calls per UTC day; None is unlimited
+            max_wait (float, optional): Longest a call may block before RateLimitExceeded; None waits indefinitely
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.name = name
+        self.rate = calls_per_minute / 60.0
+        self.burst = max(1, int(burst))
+        self.daily_quota = daily_quota or None
+        self.max_wait = max_wait
+        self.calls = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the open connection, reconnecting in a forked child process."""
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, "
+                "day TEXT NOT NULL, day_count INTEGER NOT NULL)"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def _today(now: float) -> str:
+        return datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _seconds_until_tomorrow(now: float) -> float:
+        current = datetime.fromtimestamp(now, timezone.utc)
+        tomorrow = datetime.combine(current.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        return (tomorrow - current).total_seconds()
+
+    def _read_state(self, conn: sqlite3.Connection, now: float):
+        """Return (tokens, day_count) refilled up to ``now``; call inside a transaction."""
+        row = conn.execute(
+            "SELECT tokens, updated_at, day, day_count FROM rate_limits WHERE name = ?", (self.name,)
+        ).fetchone()
+        if row is None:
+            return float(self.burst), 0
+
+        tokens, updated_at, day, day_count = row
+        tokens = min(float(self.burst), tokens + max(0.0, now - updated_at) * self.rate)
+        if day != self._today(now):
+            day_count = 0
+        return tokens, day_count
+
+    def _write_state(self, conn: sqlite3.Connection, now: float, tokens: float, day_count: int) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO rate_limits (name, tokens, updated_at, day, day_count) VALUES (?, ?, ?, ?, ?)",
+            (self.name, tokens, now, self._today(now), day_count)
+        )
+
+    def _try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return the seconds to wait."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                tokens, day_count = self._read_state(conn, now)
+
+                if self.daily_quota is not None and day_count >= self.daily_quota:
+                    wait = self._seconds_until_tomorrow(now)
+                elif tokens >= 1:
+                    self._write_state(conn, now, tokens - 1, day_count + 1)
+                    wait = 0.0
+                else:
+                    wait = (1 - tokens) / self.rate
+
+                conn.execute("COMMIT")
+                return wait
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def acquire(self) -> float:
+        """
+        Block until a call is admitted.
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If admission would take longer than ``max_wait``
+                (typically once the daily quota is used up)
+        """
+        started = time.time()
+        while True:
+            wait = self._try_acquire()
+            if wait == 0:
+                break
+
+            waited = time.time() - started
+            if self.max_wait is not None and waited + wait > self.max_wait:
+                raise RateLimitExceeded(
+                    f"Rate limit '{self.name}' would block for {wait:.0f}s "
+                    f"(used {self.stats()['used_today']} of {self.daily_quota or 'unlimited'} calls today)"
+                )
+            logger.debug(f"Rate limit '{self.name}' reached, waiting {wait:.2f}s")
+            time.sleep(wait)
+
+        waited = time.time() - started
+        with self._lock:
+            self.calls += 1
+            if waited > 0:
+                self.waits += 1
+                self.wait_seconds += waited
+        return waited
+
+    def penalize(self, seconds: float) -> None:
+        """
+        Drain the bucket so no caller is admitted for ``seconds``.
+
+        Used when the server answers 429 anyway, e.g. because another client
+        shares the API key, so every worker backs off together.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                tokens, day_count = self._read_state(conn, now)
+                self._write_state(conn, now, min(tokens, -seconds * self.rate), day_count)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        logger.warning(f"Rate limit '{self.name}' backing off for {seconds:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report utilization of the shared budget and this process's waiting.
+
+        Returns:
+            dict: Configured limits, calls used today, quota utilization,
+                tokens available and the calls/waits seen by this process
+        """
+        with self._lock:
+            conn = self._connection()
+            tokens, day_count = self._read_state(conn, time.time())
+            calls, waits, wait_seconds = self.calls, self.waits, self.wait_seconds
+
+        return {
+            "name": self.name,
+            "calls_per_minute": self.rate * 60,
+            "burst": self.burst,
+            "daily_quota": self.daily_quota,
+            "used_today": day_count,
+            "daily_utilization": day_count / self.daily_quota if self.daily_quota else None,
+            "tokens_available": max(0.0, tokens),
+            "calls": calls,
+            "waits": waits,
+            "wait_seconds": wait_seconds
+        }
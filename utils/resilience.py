@@ -0,0 +1,282 @@
+import time
+import random
+import asyncio
+import threading
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import requests
+
+from config import (
+    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_DEADLINE,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT
+)
+from utils.rate_limiter import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+# Outcome of one attempt: (retryable, retry_after seconds, counts as a dependency failure);
+# a failure of None means the attempt never reached the dependency and tells the breaker nothing
+Outcome = Tuple[bool, Optional[float], Optional[bool]]
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without calling the dependency while its circuit breaker is open."""
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded per delay and per call."""
+
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY, deadline: Optional[float] = RETRY_DEADLINE):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts (int): Attempts including the first one
+            base_delay (float): Backoff ceiling before the second attempt; doubles after each retry
+            max_delay (float): Longest single wait, also caps Retry-After
+            deadline (float, optional): No retry is started once this many seconds have passed
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before the retry following ``attempt`` (0-based).
+
+        A server-provided Retry-After wins over the computed backoff.
+        """
+        if retry_after is not None:
+            return min(max(0.0, retry_after), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+class CircuitBreaker:
+    """
+    Per-dependency circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls
+    fail immediately with CircuitOpenError. Once ``reset_timeout`` has passed a
+    single probe call is let through; its success closes the circuit again,
+    its failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        """
+        Initialize the breaker.
+
+        Args:
+            name (str): Dependency name, used in errors and logs
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open before a probe
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """
+        Admit or reject a call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or a probe is already in flight
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                logger.info(f"Circuit for {self.name} half-open, probing")
+                return
+            raise CircuitOpenError(f"Circuit for {self.name} is open after {self.failures} consecutive failures")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def release(self) -> None:
+        """Withdraw an admitted call that never reached the dependency, freeing a probe slot."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                # opened_at is unchanged, so the next call probes straight away
+                self.state = self.OPEN
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker for a dependency (e.g. a host name)."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+def reset_circuit_breakers() -> None:
+    """Forget every breaker's state."""
+    with _breakers_lock:
+        _breakers.clear()
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """Seconds requested by a Retry-After header, if it holds a number."""
+    try:
+        return float(headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def _retry_delay(attempt: int, started: float, result: Any, error: Optional[BaseException],
+                 classify: Callable[[Any, Optional[BaseException]], Outcome],
+                 policy: RetryPolicy, breaker: Optional[CircuitBreaker]) -> Optional[float]:
+    """Classify an attempt, report it to the breaker and return the wait before the next one, or None to stop."""
+    retryable, retry_after, failure = classify(result, error)
+    if breaker is not None:
+        if failure is None:
+            breaker.release()
+        elif failure:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    if not retryable or attempt == policy.max_attempts - 1:
+        return None
+
+    delay = policy.backoff(attempt, retry_after)
+    if policy.deadline is not None and time.monotonic() - started + delay > policy.deadline:
+        return None
+
+    reason = str(error) if error is not None else f"status {getattr(result, 'status_code', '?')}"
+    logger.info(f"Attempt {attempt + 1} failed ({reason}), retrying in {delay:.2f}s")
+    return delay
+
+def call_with_retry(func: Callable[[], Any], classify: Callable[[Any, Optional[BaseException]], Outcome],
+                    policy: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                    sleep: Callable[[float], None] = time.sleep) -> Any:
+    """
+    Call ``func`` under a retry policy and circuit breaker.
+
+    Args:
+        func (callable): Zero-argument call to make
+        classify (callable): Maps ``(result, error)`` of an attempt to
+            ``(retryable, retry_after, failure)``; ``failure`` is reported to the breaker,
+            unless it is None (the attempt never reached the dependency)
+        policy (RetryPolicy, optional): Retry policy, defaults to the configured one
+        breaker (CircuitBreaker, optional): Breaker guarding the dependency
+        sleep (callable): Used to wait between attempts
+
+    Returns:
+        The result of the last attempt; retryable results (e.g. a 503 response)
+        are returned once the attempts or the deadline are exhausted
+
+    Raises:
+        CircuitOpenError: If the breaker rejects the call
+        Exception: The error of the last attempt
+    """
+    policy = policy or RetryPolicy()
+    started = time.monotonic()
+
+    for attempt in range(policy.max_attempts):
+        if breaker is not None:
+            breaker.before_call()
+
+        result, error = None, None
+        try:
+            result = func()
+        except Exception as e:
+            error = e
+
+        delay = _retry_delay(attempt, started, result, error, classify, policy, breaker)
+        if delay is None:
+            break
+        # A discarded response would otherwise hold its connection (e.g. with stream=True)
+        close = getattr(result, "close", None)
+        if callable(close):
+            close()
+        sleep(delay)
+
+    if error is not None:
+        raise error
+    return result
+
+async def async_call_with_retry(func: Callable[[], Awaitable[Any]],
+                                classify: Callable[[Any, Optional[BaseException]], Outcome],
+                                policy: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                                sleep: Callable[[float], Awaitable[None]] = asyncio.sleep) -> Any:
+    """
+    Await ``func`` under a retry policy and circuit breaker.
+
+    The coroutine counterpart of ``call_with_retry``: backoff waits yield to
+    the event loop instead of blocking a thread.
+
+    Args:
+        func (callable): Zero-argument coroutine function to await
+        classify (callable): Maps ``(result, error)`` of an attempt to
+            ``(retryable, retry_after, failure)``
+        policy (RetryPolicy, optional): Retry policy, defaults to the configured one
+        breaker (CircuitBreaker, optional): Breaker guarding the dependency
+        sleep (callable): Awaited to wait between attempts
+
+    Returns:
+        The result of the last attempt
+
+    Raises:
+        CircuitOpenError: If the breaker rejects the call
+        Exception: The error of the last attempt
+    """
+    policy = policy or RetryPolicy()
+    started = time.monotonic()
+
+    for attempt in range(policy.max_attempts):
+        if breaker is not None:
+            breaker.before_call()
+
+        result, error = None, None
+        try:
+            result = await func()
+        except Exception as e:
+            error = e
+
+        delay = _retry_delay(attempt, started, result, error, classify, policy, breaker)
+        if delay is None:
+            break
+        await sleep(delay)
+
+    if error is not None:
+        raise error
+    return result
+
+# Status codes worth retrying: throttling and transient server/gateway errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def classify_http(response: Optional[requests.Response], error: Optional[BaseException]) -> Outcome:
+    """Retry connection errors, timeouts, 429 and transient 5xx responses."""
+    if isinstance(error, RateLimitExceeded):
+        # Our own limiter refused the attempt; the host was never contacted
+        return False, None, None
+    if error is not None:
+        transient = isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        return transient, None, transient
+    status = response.status_code
+    if status in RETRY_STATUSES:
+        # Throttling means the dependency is up; it must not trip the breaker
+        return True, parse_retry_after(response.headers), status != 429
+    return False, None, False
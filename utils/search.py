@@ -1,6 +1,6 @@
 import os
-import requests
 from typing import Dict, Any, Optional
+from utils.http import http_get
 
 class SearchClient:
     """Client for making search API requests"""
@@ -27,7 +27,7 @@ class SearchClient:
             **kwargs
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = http_get(self.base_url, params=params)
         response.raise_for_status()
         return response.json()
     
@@ -0,0 +1,75 @@
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+class _Call:
+    """An in-flight call and the outcome its waiters receive."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait for it and receive the same result (or exception)
+    instead of starting a duplicate call.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``func`` unless a call for ``key`` is already in flight.
+
+        Args:
+            key (str): Identity of the call
+            func (callable): Zero-argument function producing the result
+
+        Returns:
+            tuple: ``(result, shared)``; ``shared`` is True when the result came
+                from another caller's in-flight call
+
+        Raises:
+            Exception: Whatever the in-flight call raised
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Number of keys currently being fetched."""
+        with self._lock:
+            return len(self._calls)
+
+    def waiting(self, key: str) -> int:
+        """Number of callers waiting on the in-flight call for ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            return call.waiters if call is not None else 0
@@ -0,0 +1,158 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+class Stage:
+    """A named unit of work and the stages whose outputs it consumes."""
+
+    def __init__(self, name: str, func: Callable[..., Any], inputs: Sequence[str] = ()):
+        """
+        Initialize a stage.
+
+        Args:
+            name (str): Stage name; its result is passed to dependants under this name
+            func (callable): Called with one keyword argument per input stage
+            inputs (list, optional): Names of the stages this stage depends on
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+
+class StageGraph:
+    """
+    Minimal dependency-graph executor.
+
+    Each stage starts as soon as all of its inputs are available, so
+    independent branches run in parallel and total latency follows the
+    critical path rather than the sum of all stages.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize the graph.
+
+        Args:
+            max_workers (int, optional): Thread cap; defaults to one per stage
+        """
+        self.max_workers = max_workers
+        self.stages: Dict[str, Stage] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def add_stage(self, name: str, func: Callable[..., Any], inputs: Sequence[str] = ()) -> "StageGraph":
+        """Register a stage. Returns the graph so calls can be chained."""
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        self.stages[name] = Stage(name, func, inputs)
+        return self
+
+    def _validate(self, completed: Dict[str, Any]) -> None:
+        """Reject unknown inputs and dependency cycles before running anything."""
+        for stage in self.stages.values():
+            for dependency in stage.inputs:
+                if dependency not in self.stages and dependency not in completed:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'")
+
+        resolved = set(completed)
+        remaining = [name for name in self.stages if name not in completed]
+        while remaining:
+            ready = [name for name in remaining if set(self.stages[name].inputs) <= resolved]
+            if not ready:
+                raise ValueError(f"Dependency cycle between stages: {', '.join(remaining)}")
+            resolved.update(ready)
+            remaining = [name for name in remaining if name not in resolved]
+
+    def prune_completed(self, completed: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Drop completed results that depend on a stage which is not completed.
+
+        A stage that is run again may produce a different result, so every
+        stage downstream of it has to run again too.
+
+        Args:
+            completed (dict): Results known up front, keyed by stage name
+
+        Returns:
+            dict: The results whose inputs are all (transitively) completed
+        """
+        kept = {name: result for name, result in completed.items()
+                if name not in self.stages or not self.stages[name].inputs}
+        changed = True
+        while changed:
+            changed = False
+            for name, result in completed.items():
+                if name not in kept and set(self.stages[name].inputs) <= set(kept):
+                    kept[name] = result
+                    changed = True
+        return kept
+
+    def run(self, completed: Optional[Dict[str, Any]] = None,
+            on_complete: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """
+        Execute every stage that is not already completed.
+
+        Args:
+            completed (dict, optional): Results known up front, keyed by stage name;
+                those stages are not run again
+            on_complete (callable, optional): Called with the stage name and result
+                as each stage finishes, e.g. to checkpoint it
+
+        Returns:
+            dict: Results of all stages keyed by stage name
+
+        Raises:
+            Exception: The first exception raised by a stage, once stages that
+                were already running have finished (and been passed to
+                ``on_complete`` if they succeeded); stages not yet started are
+                abandoned
+        """
+        results = dict(completed or {})
+        self._validate(results)
+        self.timings = {}
+
+        pending = {name: stage for name, stage in self.stages.items() if name not in results}
+        if not pending:
+            return results
+
+        run_start = time.time()
+        workers = self.max_workers or len(pending)
+        running = {}
+
+        def execute(stage: Stage) -> Any:
+            started = time.time()
+            try:
+                return stage.func(**{name: results[name] for name in stage.inputs})
+            finally:
+                finished = time.time()
+                self.timings[stage.name] = {
+                    "start": started - run_start,
+                    "duration": finished - started
+                }
+                logger.info(f"Stage {stage.name} finished in {finished - started:.2f}s")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                for name in [n for n, s in pending.items() if all(i in results for i in s.inputs)]:
+                    running[executor.submit(execute, pending.pop(name))] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                errors = [future.exception() for future in done if future.exception() is not None]
+                if errors:
+                    # Let siblings already running finish so their work is kept
+                    for other in running:
+                        other.cancel()
+                    done = wait(running).done
+                for future in done:
+                    name = running.pop(future)
+                    if future.cancelled() or future.exception() is not None:
+                        continue
+                    results[name] = future.result()
+                    if on_complete is not None:
+                        on_complete(name, results[name])
+                if errors:
+                    raise errors[0]
+
+        return results
+